@@ -4,11 +4,17 @@ on waveform data.
 """
 from __future__ import annotations
 
+import io
 import json
 import logging
+import multiprocessing as mp
 import os
+import pickle
 import sys
 import time
+from collections.abc import Iterator
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any
 
 import h5py
 import numpy as np
@@ -36,6 +42,13 @@ def build_dsp(
     buffer_len: int = 3200,
     block_width: int = 16,
     chan_config: dict[str, str] = None,
+    hdf5_settings: dict = None,
+    prefetch: int = 0,
+    n_threads: int = 1,
+    n_processes: int = 1,
+    share_buffers: bool = True,
+    keep: list[str] = None,
+    growth_factor: float = None,
 ) -> None:
     """Convert raw-tier LH5 data into dsp-tier LH5 data by running a sequence
     of processors via the :class:`~.processing_chain.ProcessingChain`.
@@ -73,9 +86,44 @@ def build_dsp(
     chan_config
         contains JSON DSP configuration file names for every table in
         `lh5_tables`.
+    hdf5_settings
+        default HDF5 dataset storage settings (chunk shape, compression
+        filters, etc.) for the output tables, see
+        :meth:`~.lgdo.lh5_store.LH5Store.write_object`. Settings given in
+        `dsp_config` take precedence.
+    prefetch
+        number of blocks of `buffer_len` waveforms to read ahead in a
+        background thread while processing, see
+        :class:`~.lgdo.lh5_store.LH5Iterator`. Each block is then copied once
+        more, from the read-ahead buffer to the input buffer of the processing
+        chain: only useful if reading (e.g. decompressing) the waveforms takes
+        a large fraction of the time. Disabled if zero.
+    n_threads
+        number of threads processing blocks of `block_width` waveforms
+        concurrently, see :meth:`~.processing_chain.ProcessingChain.execute`.
+    n_processes
+        number of worker processes. If larger than one, tables are split in
+        blocks of `buffer_len` rows that are processed by a pool of processes,
+        each one reading its input with its own
+        :class:`~.lgdo.lh5_store.LH5Iterator`. Useful if processors hold the
+        GIL (e.g. Numba functions compiled in object mode), which limits
+        `n_threads`. Outputs are passed back through shared memory and written
+        in order by the calling process. With `chan_config`, the blocks of all
+        tables are distributed across the workers.
+    share_buffers
+        let intermediate variables share memory, see
+        :func:`~.processing_chain.build_processing_chain`.
+    keep
+        names of variables that do not share memory with others, see
+        :func:`~.processing_chain.build_processing_chain`.
+    growth_factor
+        if not ``None``, over-allocate the output datasets by this factor
+        whenever they need to grow while appending blocks of `buffer_len`
+        rows, and trim them at the end (see
+        :class:`~.lgdo.lh5_store.LH5Store`).
     """
 
-    if chan_config is not None:
+    if chan_config is not None and n_processes <= 1:
         # clear existing output files
         if write_mode == "r":
             if os.path.isfile(f_dsp):
@@ -96,12 +144,88 @@ def build_dsp(
                     write_mode,
                     buffer_len,
                     block_width,
+                    hdf5_settings=hdf5_settings,
+                    prefetch=prefetch,
+                    n_threads=n_threads,
+                    share_buffers=share_buffers,
+                    keep=keep,
+                    growth_factor=growth_factor,
                 )
             except RuntimeError:
                 log.debug(f"table {tb} not found")
         return
 
-    raw_store = lh5.LH5Store()
+    # start the workers before opening any file, such that they don't inherit
+    # open HDF5 files
+    pool = None
+    if n_processes > 1:
+        # shared memory blocks made by the workers are released by this
+        # process: they must be tracked by the same resource tracker
+        resource_tracker.ensure_running()
+        pool = mp.Pool(n_processes)
+
+    try:
+        _build_dsp(
+            f_raw,
+            f_dsp,
+            dsp_config,
+            lh5_tables,
+            database,
+            outputs,
+            n_max,
+            write_mode,
+            buffer_len,
+            block_width,
+            chan_config,
+            hdf5_settings,
+            prefetch,
+            n_threads,
+            share_buffers,
+            keep,
+            growth_factor,
+            pool,
+        )
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def _build_dsp(
+    f_raw: str,
+    f_dsp: str,
+    dsp_config: str | dict,
+    lh5_tables: list[str] | str,
+    database: str | dict,
+    outputs: list[str],
+    n_max: int,
+    write_mode: str,
+    buffer_len: int,
+    block_width: int,
+    chan_config: dict[str, str],
+    hdf5_settings: dict,
+    prefetch: int,
+    n_threads: int,
+    share_buffers: bool,
+    keep: list[str] | None,
+    growth_factor: float | None,
+    pool: mp.pool.Pool | None,
+) -> None:
+    """Run :func:`build_dsp`, in the worker processes of `pool` if not
+    ``None``."""
+    # configuration of each table
+    if chan_config is not None:
+        # clear existing output files
+        if write_mode == "r":
+            if os.path.isfile(f_dsp):
+                os.remove(f_dsp)
+            write_mode = "a"
+        lh5_tables = list(chan_config.keys())
+        dsp_configs = list(chan_config.values())
+
+    raw_store = lh5.LH5Store(growth_factor=growth_factor)
     lh5_file = raw_store.gimme_file(f_raw, "r")
     if lh5_file is None:
         raise ValueError(f"input file not found: {f_raw}")
@@ -118,14 +242,20 @@ def build_dsp(
     ):
         raise RuntimeError("lh5_tables must be None, a string, or a list of strings")
 
+    if chan_config is None:
+        dsp_configs = [dsp_config] * len(lh5_tables)
+
     # check if group points to raw data; sometimes 'raw' is nested, e.g g024/raw
-    for i, tb in enumerate(lh5_tables):
+    tables = []
+    for tb, config in zip(lh5_tables, dsp_configs):
         if "raw" not in tb and lh5.ls(lh5_file, f"{tb}/raw"):
-            lh5_tables[i] = f"{tb}/raw"
-        elif not lh5.ls(lh5_file, tb):
-            del lh5_tables[i]
+            tables.append((f"{tb}/raw", config))
+        elif lh5.ls(lh5_file, tb):
+            tables.append((tb, config))
+        else:
+            log.debug(f"table {tb} not found")
 
-    if len(lh5_tables) == 0:
+    if len(tables) == 0 and chan_config is None:
         raise RuntimeError(f"could not find any valid LH5 table in {f_raw}")
 
     # get the database parameters. For now, this will just be a dict in a json
@@ -157,37 +287,130 @@ def build_dsp(
     dsp_info.add_field("pygama_version", lgdo.Scalar(pygama.__version__))
 
     # loop over tables to run DSP on
-    for tb in lh5_tables:
-        # load primary table and build processing chain and output table
+    n_rows_tables = []
+    write_offsets = []
+    for tb, _ in tables:
         tot_n_rows = raw_store.read_n_rows(tb, f_raw)
         if n_max and n_max < tot_n_rows:
-            tot_n_rows = n_max
+            tot_n_rows = int(n_max)
+        n_rows_tables.append(tot_n_rows)
 
-        chan_name = tb.split("/")[0]
-        db_dict = database.get(chan_name) if database else None
         tb_name = tb.replace("/raw", "/dsp")
-
         write_offset = 0
         raw_store.gimme_file(f_dsp, "a")
         if write_mode == "a" and lh5.ls(f_dsp, tb_name):
             write_offset = raw_store.read_n_rows(tb_name, f_dsp)
+        write_offsets.append(write_offset)
+
+    # arguments of build_processing_chain
+    chain_kwargs = {
+        "block_width": block_width,
+        "n_threads": n_threads,
+        "share_buffers": share_buffers,
+        "keep": keep,
+    }
+    if pool is None:
+        blocks = _iter_dsp_blocks(
+            f_raw,
+            tables,
+            n_rows_tables,
+            database,
+            outputs,
+            buffer_len,
+            prefetch,
+            chain_kwargs,
+        )
+    else:
+        tasks = [
+            (
+                f_raw,
+                tb,
+                config,
+                database.get(tb.split("/")[0]) if database else None,
+                outputs,
+                buffer_len,
+                chain_kwargs,
+                start_row,
+                min(buffer_len, tot_n_rows - start_row),
+            )
+            for (tb, config), tot_n_rows in zip(tables, n_rows_tables)
+            # empty tables are processed once too
+            for start_row in range(0, max(tot_n_rows, 1), buffer_len)
+        ]
+        # imap returns the results in order, while the workers run ahead
+        blocks = _iter_shared_blocks(
+            tasks, pool.imap(_dsp_worker_run, tasks, chunksize=1)
+        )
+
+    i_tables = {tb: i for i, (tb, _) in enumerate(tables)}
+    try:
+        for tb, start_row, n_rows, tb_out in blocks:
+            i_table = i_tables[tb]
+            if start_row == 0 and log.getEffectiveLevel() <= logging.INFO:
+                progress_bar = tqdm(
+                    desc=f"Processing table {tb}",
+                    total=n_rows_tables[i_table],
+                    delay=2,
+                    unit=" rows",
+                )
+
+            raw_store.write_object(
+                obj=tb_out,
+                name=tb.replace("/raw", "/dsp"),
+                lh5_file=f_dsp,
+                n_rows=n_rows,
+                wo_mode="o" if write_mode == "u" else "a",
+                write_start=write_offsets[i_table] + start_row,
+                hdf5_settings=hdf5_settings,
+            )
+            del tb_out
+
+            if log.getEffectiveLevel() <= logging.INFO:
+                progress_bar.update(n_rows)
+                if start_row + n_rows >= n_rows_tables[i_table]:
+                    progress_bar.close()
+    finally:
+        # trims the over-allocated datasets, if any
+        raw_store.close()
+
+    raw_store.write_object(dsp_info, "dsp_info", f_dsp, wo_mode="o")
+
+
+def _iter_dsp_blocks(
+    f_raw: str,
+    tables: list[tuple[str, str | dict]],
+    n_rows_tables: list[int],
+    database: dict,
+    outputs: list[str],
+    buffer_len: int,
+    prefetch: int,
+    chain_kwargs: dict[str, Any],
+) -> Iterator[tuple[str, int, int, lgdo.Table]]:
+    """Run the processing chains of `tables` in this process. Yield the name
+    of the table, the first row and number of rows of each block of at most
+    `buffer_len` rows, and the output table holding them."""
+    for (tb, config), tot_n_rows in zip(tables, n_rows_tables):
+        # load primary table and build processing chain and output table
+        chan_name = tb.split("/")[0]
+        db_dict = database.get(chan_name) if database else None
 
         # Main processing loop
         lh5_it = lh5.LH5Iterator(f_raw, tb, buffer_len=buffer_len)
         proc_chain = None
+        if prefetch > 0:
+            # build the processing chain before reading ahead, such that only
+            # the fields it needs are read
+            lh5_in, _ = lh5_it.read(0)
+            proc_chain, lh5_it.field_mask, tb_out = build_processing_chain(
+                lh5_in, config, db_dict, outputs, **chain_kwargs
+            )
+            lh5_it.prefetch = prefetch
         for lh5_in, start_row, n_rows in lh5_it:
             # Initialize
             if proc_chain is None:
                 proc_chain, lh5_it.field_mask, tb_out = build_processing_chain(
-                    lh5_in, dsp_config, db_dict, outputs, block_width
+                    lh5_in, config, db_dict, outputs, **chain_kwargs
                 )
-                if log.getEffectiveLevel() <= logging.INFO:
-                    progress_bar = tqdm(
-                        desc=f"Processing table {tb}",
-                        total=tot_n_rows,
-                        delay=2,
-                        unit=" rows",
-                    )
 
             n_rows = min(tot_n_rows - start_row, n_rows)
             try:
@@ -197,22 +420,113 @@ def build_dsp(
                 e.wf_range = f"{e.wf_range[0]+start_row}-{e.wf_range[1]+start_row}"
                 raise e
 
-            raw_store.write_object(
-                obj=tb_out,
-                name=tb_name,
-                lh5_file=f_dsp,
-                n_rows=n_rows,
-                wo_mode="o" if write_mode == "u" else "a",
-                write_start=write_offset + start_row,
-            )
-
-            if log.getEffectiveLevel() <= logging.INFO:
-                progress_bar.update(n_rows)
+            yield tb, start_row, n_rows, tb_out
 
             if start_row + n_rows >= tot_n_rows:
                 break
 
-        if log.getEffectiveLevel() <= logging.INFO:
-            progress_bar.close()
 
-    raw_store.write_object(dsp_info, "dsp_info", f_dsp, wo_mode="o")
+# processing chains of the worker process, by table name
+_worker_chains = {}
+
+
+def _dsp_worker_run(task: tuple) -> tuple[str, bytes]:
+    """Process a block of rows of a table in a worker process of
+    :func:`build_dsp`. The output table is returned in shared memory, see
+    :func:`_to_shared_memory`."""
+    (
+        f_raw,
+        tb,
+        config,
+        db_dict,
+        outputs,
+        buffer_len,
+        chain_kwargs,
+        start_row,
+        n_rows,
+    ) = task
+
+    if tb in _worker_chains:
+        lh5_it, proc_chain, tb_out = _worker_chains[tb]
+        lh5_it.read(start_row)
+    else:
+        lh5_it = lh5.LH5Iterator(f_raw, tb, buffer_len=buffer_len)
+        lh5_in, _ = lh5_it.read(start_row)
+        proc_chain, lh5_it.field_mask, tb_out = build_processing_chain(
+            lh5_in, config, db_dict, outputs, **chain_kwargs
+        )
+        _worker_chains[tb] = (lh5_it, proc_chain, tb_out)
+
+    try:
+        proc_chain.execute(0, n_rows)
+    except DSPFatal as e:
+        # Update the wf_range to reflect the file position
+        e.wf_range = f"{e.wf_range[0]+start_row}-{e.wf_range[1]+start_row}"
+        raise e
+
+    return _to_shared_memory(tb_out)
+
+
+class _SharedMemoryPickler(pickle.Pickler):
+    """Pickler storing the data of numerical arrays out of band, at 64-byte
+    aligned offsets of a contiguous block of memory."""
+
+    def __init__(self, file: io.BytesIO) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays = []
+        self.size = 0
+
+    def persistent_id(self, obj: Any) -> tuple | None:
+        if type(obj) is not np.ndarray or obj.dtype.hasobject:
+            return None
+        offset = -(-self.size // 64) * 64
+        self.arrays.append((offset, obj))
+        self.size = offset + obj.nbytes
+        return (offset, obj.shape, obj.dtype.str)
+
+
+class _SharedMemoryUnpickler(pickle.Unpickler):
+    """Unpickler of :class:`_SharedMemoryPickler` data, making arrays that
+    view the block of memory `buf`."""
+
+    def __init__(self, file: io.BytesIO, buf: memoryview) -> None:
+        super().__init__(file)
+        self.buf = buf
+
+    def persistent_load(self, pid: tuple) -> np.ndarray:
+        offset, shape, dtype = pid
+        return np.ndarray(shape, dtype, buffer=self.buf, offset=offset)
+
+
+def _iter_shared_blocks(
+    tasks: list[tuple], results: Iterator[tuple[str, bytes]]
+) -> Iterator[tuple[str, int, int, lgdo.Table]]:
+    """Load the outputs of :func:`_dsp_worker_run` for `tasks`, in the same
+    format as :func:`_iter_dsp_blocks`. The output tables view the shared
+    memory blocks, which are released when the next block is requested: the
+    caller must not hold references to them anymore."""
+    for (_, tb, *_, start_row, n_rows), (name, payload) in zip(tasks, results):
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            tb_out = _SharedMemoryUnpickler(io.BytesIO(payload), shm.buf).load()
+            yield tb, start_row, n_rows, tb_out
+            del tb_out
+            shm.close()
+        finally:
+            shm.unlink()
+
+
+def _to_shared_memory(obj: Any) -> tuple[str, bytes]:
+    """Copy `obj` into a new shared memory block. Return the name of the
+    block and the pickled object, to be loaded with
+    :class:`_SharedMemoryUnpickler`. Arrays are copied once, the pickled data only
+    references them."""
+    payload = io.BytesIO()
+    pickler = _SharedMemoryPickler(payload)
+    pickler.dump(obj)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(pickler.size, 1))
+    for offset, nda in pickler.arrays:
+        np.ndarray(nda.shape, nda.dtype, buffer=shm.buf, offset=offset)[...] = nda
+    shm.close()
+    return shm.name, payload.getvalue()
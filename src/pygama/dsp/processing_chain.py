@@ -10,8 +10,12 @@ import itertools as it
 import json
 import logging
 import re
+import threading
 from abc import ABCMeta, abstractmethod
-from copy import deepcopy
+from bisect import bisect_right
+from collections.abc import Collection, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy, deepcopy
 from dataclasses import dataclass
 from typing import Any, Union
 
@@ -247,12 +251,11 @@ class ProcChainVar(ProcChainVarBase):
             if self.is_const
             else (self.proc_chain._block_width,) + self.shape
         )
-        len = np.prod(shape)
-        # Flattened array, with padding to allow memory alignment
-        buf = np.zeros(len + 64 // self.dtype.itemsize, dtype=self.dtype)
-        # offset to ensure memory alignment
-        offset = (64 - buf.ctypes.data) % 64 // self.dtype.itemsize
-        return buf[offset : offset + len].reshape(shape)
+        buf = _aligned_zeros(np.prod(shape), self.dtype)
+        # buffers holding one block need a replica per thread
+        if not self.is_const:
+            self.proc_chain._block_buffers.append(buf)
+        return buf.reshape(shape)
 
     def get_buffer(self, unit: str | Unit = None) -> np.ndarray:
         # If buffer needs to be created, do so now
@@ -294,8 +297,7 @@ class ProcChainVar(ProcChainVarBase):
         # If we get this far, add conversion processor to ProcChain and add new buffer to _buffer
         conversion_manager = UnitConversionManager(self, unit)
         self._buffer.append((conversion_manager.out_buffer, unit))
-        self.proc_chain._proc_managers.append(conversion_manager)
-        log.debug(f"added conversion: {conversion_manager}")
+        self.proc_chain._add_manager(conversion_manager, conversion_manager.is_const)
         return conversion_manager.out_buffer
 
     @property
@@ -389,7 +391,9 @@ class ProcessingChain:
     add_scalar.
     """
 
-    def __init__(self, block_width: int = 8, buffer_len: int = None) -> None:
+    def __init__(
+        self, block_width: int = 8, buffer_len: int = None, n_threads: int = 1
+    ) -> None:
         """
         Parameters
         ----------
@@ -398,6 +402,10 @@ class ProcessingChain:
         buffer_len
             length of input and output buffers. Should be a multiple of
             `block_width`.
+        n_threads
+            number of threads processing blocks of entries concurrently in
+            :meth:`execute`. Each thread works on its own replica of the
+            variable buffers, see :meth:`execute`.
         """
         # Dictionary from name to scratch data buffers as ProcChainVar
         self._vars_dict = {}
@@ -410,6 +418,17 @@ class ProcessingChain:
         self._block_width = block_width
         self._buffer_len = buffer_len
 
+        self._n_threads = n_threads
+        # flat buffers of the variables that hold one block of entries
+        self._block_buffers = []
+        # replicas of the chain used by the other threads
+        self._replicas = []
+        # whether variables share buffers, see share_buffers()
+        self._buffers_shared = False
+        # variable buffers viewing the input/output buffers, see
+        # _get_io_bindings()
+        self._io_bindings = None
+
     def add_variable(
         self,
         name: str,
@@ -527,6 +546,8 @@ class ProcessingChain:
         buffer
             `buff` or newly allocated input buffer.
         """
+        self._check_not_shared()
+        self._reset_io_bindings()
         self._validate_name(varname, raise_exception=True)
         var = self.get_variable(varname, expr_only=True)
         if var is None:
@@ -607,6 +628,8 @@ class ProcessingChain:
         buffer
             `buff` or newly allocated output buffer.
         """
+        self._check_not_shared()
+        self._reset_io_bindings()
         self._validate_name(varname, raise_exception=True)
         var = self.get_variable(varname, expr_only=True)
         if var is None:
@@ -678,6 +701,8 @@ class ProcessingChain:
         """Make a list of parameters from `*args`. Replace any strings in the
         list with NumPy objects from `vars_dict`, where able.
         """
+        self._check_not_shared()
+        self._reset_io_bindings()
         params = []
         kw_params = {}
         for _, param in enumerate(args):
@@ -697,12 +722,379 @@ class ProcessingChain:
         self._proc_managers.append(proc_man)
         log.debug(f"added processor: {proc_man}")
 
+    def _add_manager(self, proc_man: ProcessorManager, is_const: bool) -> None:
+        """Add `proc_man` to the processors executed on each block of entries.
+        If its outputs are constants (i.e. all its inputs are), execute it
+        once now instead."""
+        if is_const:
+            proc_man.execute()
+            log.debug(f"evaluated constant: {proc_man}")
+        else:
+            self._check_not_shared()
+            self._reset_io_bindings()
+            self._proc_managers.append(proc_man)
+            log.debug(f"added processor: {proc_man}")
+
     def execute(self, start: int = 0, stop: int = None) -> None:
-        """Execute the dsp chain on the entire input/output buffers."""
+        """Execute the dsp chain on the entire input/output buffers.
+
+        If the chain was created with ``n_threads > 1``, blocks of entries are
+        dispatched to a pool of threads. Each thread runs its own replica of
+        the chain, in which the buffers holding one block of a variable are
+        duplicated while constants and the input/output buffers are shared.
+        Processors compiled with Numba (:func:`numba.guvectorize`) release the
+        GIL while looping over the entries, so that threads run in parallel.
+        The output is identical to the one of the serial execution, as long
+        as processors do not share state between entries. Processors built
+        from ``init_args`` in :func:`build_processing_chain` are built again
+        for each replica, since they may hold references to the variable
+        buffers.
+
+        Variables linked to input/output buffers with the same data type and
+        memory layout are not copied: for each full block of entries, the
+        processors work directly on the rows of the input/output buffers.
+        Their values are then not kept in the variable buffers.
+        """
         if stop is None:
             stop = self._buffer_len
-        for i in range(start, stop, self._block_width):
-            self._execute_procs(i, min(i + self._block_width, self._buffer_len))
+        blocks = range(start, stop, self._block_width)
+        if self._n_threads <= 1 or len(blocks) <= 1:
+            for i in blocks:
+                self._execute_procs(i, min(i + self._block_width, self._buffer_len))
+            return
+
+        chains = [self] + self._get_replicas(self._n_threads - 1)
+        ordered = any(out_man.ordered_write for out_man in self._output_managers)
+        next_block = iter(range(len(blocks)))
+        lock = threading.Lock()
+        turn = threading.Condition()
+        state = {"written": 0, "errors": {}}
+
+        def run(chain: ProcessingChain) -> None:
+            while True:
+                with lock:
+                    ib = next(next_block, None)
+                if ib is None or state["errors"]:
+                    return
+                begin = blocks[ib]
+                end = min(begin + self._block_width, self._buffer_len)
+                try:
+                    chain._execute_procs(begin, end, write=not ordered)
+                except Exception as e:
+                    with turn:
+                        state["errors"][ib] = e
+                        turn.notify_all()
+                    return
+                if not ordered:
+                    continue
+
+                # some outputs (vectors of vectors) must be written in order
+                with turn:
+                    turn.wait_for(
+                        lambda ib=ib: state["written"] == ib or state["errors"]
+                    )
+                    if state["errors"]:
+                        return
+                    for out_man in chain._output_managers:
+                        out_man.write(begin, end)
+                    state["written"] += 1
+                    turn.notify_all()
+
+        with ThreadPoolExecutor(len(chains)) as executor:
+            for future in [executor.submit(run, chain) for chain in chains]:
+                future.result()
+
+        # raise the error of the first failing block, as the serial execution
+        if state["errors"]:
+            raise state["errors"][min(state["errors"])]
+
+    def share_buffers(self, keep: Collection[str] = ()) -> None:
+        """Let variables whose values are not needed at the same time share
+        memory.
+
+        Intermediate variables are often needed only by the next few
+        processors. The steps of the chain (reading the inputs, each
+        processor, writing the outputs) at which the buffer of each variable
+        is used are collected, and buffers with the same shape and data type
+        whose uses do not overlap are merged into one, such that the working
+        set of a block of entries is smaller. Buffers linked to output
+        buffers and the variables in `keep` are never shared. The chain must
+        be complete: no processors nor input/output buffers can be added
+        afterwards.
+
+        Parameters
+        ----------
+        keep
+            names of variables whose values must still be available after
+            executing the chain.
+        """
+        self._reset_io_bindings()
+        bufs = self._block_buffers
+        remap = _BufferRemapper(bufs, bufs)
+        first = {}
+        last = {}
+
+        def use(step: int, arrays: Iterable[Any]) -> None:
+            for a in arrays:
+                i = remap.find(a)
+                if i is not None:
+                    first.setdefault(i, step)
+                    last[i] = step
+
+        for in_man in self._input_managers:
+            use(0, vars(in_man).values())
+        for step, proc_man in enumerate(self._proc_managers, 1):
+            use(step, proc_man.args)
+            use(step, proc_man.kwargs.values())
+            # processors built from init_args may hold on to these buffers
+            factory = getattr(proc_man, "factory", None)
+            if factory is not None:
+                for var in factory[1]:
+                    use(step, _var_buffers(var))
+        for out_man in self._output_managers:
+            use(np.inf, vars(out_man).values())
+        # inputs may view the input buffers, which must not be overwritten
+        for in_man in self._input_managers:
+            use(np.inf, [getattr(in_man, k) for k in in_man.zero_copy_buffers()])
+        for name in keep:
+            use(np.inf, _var_buffers(self.get_variable(name)))
+
+        # assign the buffers, in order of first use, to the first buffer of
+        # the same kind that is not used anymore
+        new_bufs = list(bufs)
+        pool = {}
+        for i in sorted(first, key=lambda i: (first[i], last[i])):
+            slots = pool.setdefault((bufs[i].dtype, bufs[i].size), [])
+            for slot in slots:
+                if slot[0] < first[i]:
+                    slot[0] = last[i]
+                    new_bufs[i] = slot[1]
+                    break
+            else:
+                slots.append([last[i], bufs[i]])
+
+        remap = _BufferRemapper(bufs, new_bufs)
+        rebuild = [
+            proc_man
+            for proc_man in self._proc_managers
+            if getattr(proc_man, "factory", None) is not None
+            and any(
+                remap(b) is not b
+                for var in proc_man.factory[1]
+                for b in _var_buffers(var)
+            )
+        ]
+        for proc_man in self._proc_managers:
+            proc_man.args = [remap(a) for a in proc_man.args]
+            proc_man.kwargs = {k: remap(v) for k, v in proc_man.kwargs.items()}
+        for io_man in self._input_managers + self._output_managers:
+            for k, v in vars(io_man).items():
+                setattr(io_man, k, remap(v))
+        for var in self._all_variables():
+            if isinstance(var._buffer, list):
+                var._buffer = [(remap(b), u) for b, u in var._buffer]
+            else:
+                var._buffer = remap(var._buffer)
+        for proc_man in rebuild:
+            factory, init_args = proc_man.factory
+            proc_man.processor = factory(*init_args)
+
+        kept = {id(b): b for b in new_bufs}
+        log.debug(
+            f"shared buffers: {len(bufs)} buffers "
+            f"({sum(b.nbytes for b in bufs)} bytes) merged into {len(kept)} "
+            f"({sum(b.nbytes for b in kept.values())} bytes)"
+        )
+        self._block_buffers = list(kept.values())
+        self._replicas = []
+        self._buffers_shared = True
+
+    def _check_not_shared(self) -> None:
+        if self._buffers_shared:
+            raise ProcessingChainError(
+                "cannot modify the chain after its buffers were shared"
+            )
+
+    def _all_variables(self) -> list[ProcChainVar]:
+        """Collect the variables of the chain, including unnamed ones (e.g.
+        slices of other variables) used by processors or I/O managers."""
+        found = {}
+        todo = list(self._vars_dict.values())
+        for proc_man in self._proc_managers:
+            todo += proc_man.params + list(proc_man.kw_params.values())
+            if getattr(proc_man, "factory", None) is not None:
+                todo += proc_man.factory[1]
+        for io_man in self._input_managers + self._output_managers:
+            todo.append(io_man.var)
+        while todo:
+            var = todo.pop()
+            if not isinstance(var, ProcChainVar) or id(var) in found:
+                continue
+            found[id(var)] = var
+            todo.append(var.vector_len)
+            if isinstance(var.grid, CoordinateGrid):
+                todo.append(var.grid.offset)
+        return list(found.values())
+
+    def _get_replicas(self, n: int) -> list[ProcessingChain]:
+        """Get `n` replicas of this chain for use by other threads. Replicas
+        are made again if the chain was modified since they were made."""
+        n_mans = (
+            len(self._proc_managers),
+            len(self._input_managers),
+            len(self._output_managers),
+        )
+        if self._replicas and self._replicas[0][0] != n_mans:
+            self._replicas = []
+        while len(self._replicas) < n:
+            self._replicas.append((n_mans, self._make_replica()))
+        return [replica for _, replica in self._replicas[:n]]
+
+    def _make_replica(self) -> ProcessingChain:
+        """Make a copy of this chain with its own buffers for the variables
+        holding one block of entries. Arrays viewing these buffers (processor
+        arguments, I/O manager buffers) are replaced with the same views of
+        the new buffers."""
+        self._reset_io_bindings()
+        bufs = self._block_buffers
+        new_bufs = []
+        for buf in bufs:
+            new_buf = _aligned_zeros(buf.size, buf.dtype)
+            np.copyto(new_buf, buf)
+            new_bufs.append(new_buf)
+        remap = _BufferRemapper(bufs, new_bufs)
+
+        replica_vars = {}
+
+        def remap_var(var: Any) -> Any:
+            if not isinstance(var, ProcChainVar):
+                return remap(var)
+            if id(var) not in replica_vars:
+                new_var = copy(var)
+                if isinstance(var._buffer, list):
+                    new_var._buffer = [(remap(b), u) for b, u in var._buffer]
+                else:
+                    new_var._buffer = remap(var._buffer)
+                replica_vars[id(var)] = new_var
+            return replica_vars[id(var)]
+
+        replica = copy(self)
+        replica._replicas = []
+        replica._proc_managers = []
+        for proc_man in self._proc_managers:
+            new_man = copy(proc_man)
+            new_man.args = [remap(a) for a in proc_man.args]
+            new_man.kwargs = {k: remap(v) for k, v in proc_man.kwargs.items()}
+            if getattr(proc_man, "factory", None) is not None:
+                factory, init_args = proc_man.factory
+                new_man.processor = factory(*[remap_var(a) for a in init_args])
+            replica._proc_managers.append(new_man)
+
+        for mans in ("_input_managers", "_output_managers"):
+            new_mans = []
+            for io_man in getattr(self, mans):
+                new_man = copy(io_man)
+                for k, v in vars(io_man).items():
+                    setattr(new_man, k, remap(v))
+                new_man.bindings = {}
+                new_mans.append(new_man)
+            setattr(replica, mans, new_mans)
+
+        return replica
+
+    def _get_io_bindings(self) -> list[_IOBinding]:
+        """Find the variable buffers that can view the rows of the
+        input/output buffers, instead of being copied to/from them for each
+        block of entries.
+
+        The buffer of a variable can be bound if the I/O manager allows it
+        (same data type and memory layout, no unit conversion of an input),
+        if it is linked to a single input/output buffer, if no processor
+        built from ``init_args`` holds on to it and, for inputs, if no
+        processor may write to it. All the arrays viewing it
+        (processor arguments, I/O manager buffers) are then replaced with the
+        same views of the rows of the input/output buffer by
+        :meth:`_IOBinding.bind`, for each block of entries. The bindings are
+        found again after the chain is modified.
+        """
+        if self._io_bindings is not None:
+            return self._io_bindings
+
+        bufs = self._block_buffers
+        remap = _BufferRemapper(bufs, bufs)
+        io_mans = self._input_managers + self._output_managers
+        # inputs in another unit are converted from the native buffer
+        converted = {
+            proc_man.args[-1].ctypes.data
+            for proc_man in self._proc_managers
+            if isinstance(proc_man, UnitConversionManager)
+        }
+        candidates = {}
+        for io_man in io_mans:
+            io_man.bindings = {}
+            for name, io_buf in io_man.zero_copy_buffers().items():
+                var_buf = getattr(io_man, name)
+                i = remap.find(var_buf)
+                if (
+                    i is None
+                    or io_man in self._input_managers
+                    and var_buf.ctypes.data in converted
+                    or var_buf.shape[0] != self._block_width
+                    or var_buf.ctypes.data != bufs[i].ctypes.data
+                    or var_buf.nbytes != bufs[i].nbytes
+                ):
+                    continue
+                # a variable linked to several buffers is copied to each
+                candidates[i] = None if i in candidates else (io_man, name, io_buf)
+        candidates = [c for i, c in sorted(candidates.items()) if c is not None]
+
+        var_bufs = [getattr(io_man, name) for io_man, name, _ in candidates]
+        remap = _BufferRemapper(var_bufs, var_bufs)
+        refs = [[] for _ in candidates]
+        excluded = set()
+        for proc_man in self._proc_managers:
+            # an input written by a processor must not overwrite the input
+            # buffer. Processors write their outputs, or any of their
+            # arguments if they declare none (e.g. gufuncs returning void)
+            params = proc_man.args + list(proc_man.kwargs.values())
+            nout = getattr(proc_man.processor, "nout", 0)
+            for a in params[-nout:] if nout > 0 else params:
+                i = remap.find(a)
+                if i is not None and candidates[i][0] in self._input_managers:
+                    excluded.add(i)
+            for container, keys in (
+                (proc_man.args, range(len(proc_man.args))),
+                (proc_man.kwargs, list(proc_man.kwargs)),
+            ):
+                for key in keys:
+                    i = remap.find(container[key])
+                    if i is not None:
+                        refs[i].append((container, key, container[key]))
+            factory = getattr(proc_man, "factory", None)
+            if factory is not None:
+                for var in factory[1]:
+                    excluded.update(remap.find(b) for b in _var_buffers(var))
+        for io_man in io_mans:
+            attrs = vars(io_man)
+            for key, value in attrs.items():
+                i = remap.find(value)
+                if i is not None and candidates[i][:2] != (io_man, key):
+                    refs[i].append((attrs, key, value))
+
+        self._io_bindings = []
+        for i, (io_man, name, io_buf) in enumerate(candidates):
+            if i not in excluded:
+                io_man.bindings[name] = _IOBinding(io_buf, var_bufs[i], refs[i])
+                self._io_bindings.append(io_man.bindings[name])
+        log.debug(f"bound {len(self._io_bindings)} variables to input/output buffers")
+        return self._io_bindings
+
+    def _reset_io_bindings(self) -> None:
+        """Restore the arrays viewing the input/output buffers and forget the
+        bindings, before the chain is modified or replicated."""
+        for binding in self._io_bindings or []:
+            binding.bind(0, 0)
+        self._io_bindings = None
 
     def get_variable(
         self, expr: str, get_names_only: bool = False, expr_only: bool = False
@@ -828,6 +1220,7 @@ class ProcessingChain:
                 return ret
 
             name = "(" + op_form.format(str(lhs), str(rhs)) + ")"
+            is_const = _is_const(lhs) and _is_const(rhs)
             if isinstance(lhs, ProcChainVar) and isinstance(rhs, ProcChainVar):
                 if is_in_pint(lhs.unit) and is_in_pint(rhs.unit):
                     unit = op(Quantity(lhs.unit), Quantity(rhs.unit)).u
@@ -849,6 +1242,7 @@ class ProcessingChain:
                         False if lhs.is_coord is True and rhs.is_coord is True else auto
                     ),
                     unit=unit,
+                    is_const=is_const,
                 )
             elif isinstance(lhs, ProcChainVar):
                 out = ProcChainVar(
@@ -856,6 +1250,7 @@ class ProcessingChain:
                     name,
                     unit=lhs.unit,
                     is_coord=lhs.is_coord,
+                    is_const=is_const,
                 )
             else:
                 out = ProcChainVar(
@@ -863,11 +1258,10 @@ class ProcessingChain:
                     name,
                     unit=rhs.unit,
                     is_coord=rhs.is_coord,
+                    is_const=is_const,
                 )
 
-            proc_man = ProcessorManager(self, op, [lhs, rhs, out])
-            self._proc_managers.append(proc_man)
-            log.debug(f"added processor: {proc_man}")
+            self._add_manager(ProcessorManager(self, op, [lhs, rhs, out]), is_const)
             return out
 
         # define unary operators (-)
@@ -887,10 +1281,11 @@ class ProcessingChain:
                     operand.grid,
                     operand.unit,
                     operand.is_coord,
+                    is_const=operand.is_const,
+                )
+                self._add_manager(
+                    ProcessorManager(self, op, [operand, out]), operand.is_const
                 )
-                proc_man = ProcessorManager(self, op, [operand, out])
-                self._proc_managers.append(proc_man)
-                log.debug(f"added processor: {proc_man}")
             else:
                 out = op(operand)
 
@@ -1042,10 +1437,15 @@ class ProcessingChain:
             raise ProcessingChainError(f"{name} is not a valid variable name")
         return isgood
 
-    def _execute_procs(self, begin: int, end: int) -> str:
+    def _execute_procs(self, begin: int, end: int, write: bool = True) -> str:
         """Copy from input buffers to variables, call all the processors on
-        their paired arg tuples, copy from variables to list of output buffers.
+        their paired arg tuples, copy from variables to list of output buffers
+        (if `write`). Variables bound to the input/output buffers (see
+        :meth:`_get_io_bindings`) view their rows instead, for full blocks.
         """
+        for binding in self._get_io_bindings():
+            binding.bind(begin, end)
+
         # Copy input buffers into proc chain buffers
         for in_man in self._input_managers:
             in_man.read(begin, end)
@@ -1060,8 +1460,9 @@ class ProcessingChain:
                 raise e
 
         # copy from processing chain buffers into output buffers
-        for out_man in self._output_managers:
-            out_man.write(begin, end)
+        if write:
+            for out_man in self._output_managers:
+                out_man.write(begin, end)
 
     def __str__(self) -> str:
         return (
@@ -1120,6 +1521,7 @@ class ProcessingChain:
                 else:
                     grid = to_nearest
 
+                conversion_manager = UnitConversionManager(var, grid, round=True)
                 out = ProcChainVar(
                     var.proc_chain,
                     name,
@@ -1128,11 +1530,12 @@ class ProcessingChain:
                     grid,
                     var.unit,
                     var.is_coord,
+                    is_const=conversion_manager.is_const,
                 )
-                conversion_manager = UnitConversionManager(var, grid, round=True)
                 out._buffer = conversion_manager.out_buffer
-                var.proc_chain._proc_managers.append(conversion_manager)
-                log.debug(f"added conversion: {conversion_manager}")
+                var.proc_chain._add_manager(
+                    conversion_manager, conversion_manager.is_const
+                )
             else:
                 out = ProcChainVar(
                     var.proc_chain,
@@ -1142,9 +1545,14 @@ class ProcessingChain:
                     var.grid,
                     var.unit,
                     var.is_coord,
+                    is_const=var.is_const,
+                )
+                var.proc_chain._add_manager(
+                    ProcessorManager(
+                        var.proc_chain, round_to_nearest, [var, to_nearest, out]
+                    ),
+                    var.is_const,
                 )
-
-                var.proc_chain.add_processor(round_to_nearest, var, to_nearest, out)
 
             return out
 
@@ -1165,6 +1573,7 @@ class ProcessingChain:
                 var.grid,
                 var.unit,
                 var.is_coord,
+                is_const=var.is_const,
             )
             proc_man = ProcessorManager(
                 var.proc_chain,
@@ -1174,8 +1583,7 @@ class ProcessingChain:
                 signature="(),(),()",
                 types=f"{dtype.char}{var.dtype.char}",
             )
-            var.proc_chain._proc_managers.append(proc_man)
-            log.debug(f"added processor: {proc_man}")
+            var.proc_chain._add_manager(proc_man, var.is_const)
             return out
 
     def _loadlh5(path_to_file, path_in_file: str) -> np.array:  # noqa: N805
@@ -1560,6 +1968,7 @@ class UnitConversionManager(ProcessorManager):
             self.processor = UnitConversionManager.convert_int
 
         to_offset = 0
+        to_grid = unit
         if isinstance(unit, CoordinateGrid):
             to_offset = unit.get_offset()
             unit = unit.period
@@ -1572,6 +1981,14 @@ class UnitConversionManager(ProcessorManager):
             if isinstance(from_unit, str) and from_unit in ureg:
                 from_unit = ureg.Quantity(from_unit)
 
+        # the conversion of a constant is constant, unless it depends on a
+        # varying offset
+        self.is_const = var.is_const and all(
+            _is_const(grid.offset)
+            for grid in (from_unit, to_grid)
+            if isinstance(grid, CoordinateGrid)
+        )
+
         # list of parameters prior to converting to internal representation
         self.params = [var]
         self.kw_params = {"from": from_unit, "to": unit}
@@ -1601,6 +2018,8 @@ class UnitConversionManager(ProcessorManager):
             )
 
         self.out_buffer = np.zeros_like(from_buffer, dtype=var.dtype)
+        if not self.is_const:
+            self.proc_chain._block_buffers.append(self.out_buffer)
         self.args = [
             from_buffer,
             from_offset,
@@ -1610,6 +2029,103 @@ class UnitConversionManager(ProcessorManager):
         ]
         self.kwargs = {}
 
+def _aligned_zeros(size: int, dtype: np.dtype) -> np.ndarray:
+    """Allocate a flat array of zeros aligned to 64 bytes."""
+    dtype = np.dtype(dtype)
+    # Flattened array, with padding to allow memory alignment
+    buf = np.zeros(size + 64 // dtype.itemsize, dtype=dtype)
+    # offset to ensure memory alignment
+    offset = (64 - buf.ctypes.data) % 64 // dtype.itemsize
+    return buf[offset : offset + size]
+
+
+class _BufferRemapper:
+    """Replace arrays viewing one of the flat buffers `bufs` with the same
+    view of the corresponding buffer in `new_bufs`. Other objects are
+    returned unchanged."""
+
+    def __init__(self, bufs: list[np.ndarray], new_bufs: list[np.ndarray]) -> None:
+        self.order = sorted(range(len(bufs)), key=lambda i: bufs[i].ctypes.data)
+        self.starts = [bufs[i].ctypes.data for i in self.order]
+        self.bufs = bufs
+        self.new_bufs = new_bufs
+
+    def find(self, a: Any) -> int | None:
+        """Index of the buffer viewed by `a`, ``None`` if there is none."""
+        if not isinstance(a, np.ndarray) or a.size == 0:
+            return None
+        i = bisect_right(self.starts, a.ctypes.data) - 1
+        if i < 0:
+            return None
+        i = self.order[i]
+        if a.ctypes.data >= self.bufs[i].ctypes.data + self.bufs[i].nbytes:
+            return None
+        return i
+
+    def __call__(self, a: Any) -> Any:
+        i = self.find(a)
+        if i is None or self.new_bufs[i] is self.bufs[i]:
+            return a
+        return np.ndarray(
+            a.shape,
+            a.dtype,
+            buffer=self.new_bufs[i],
+            offset=a.ctypes.data - self.bufs[i].ctypes.data,
+            strides=a.strides,
+        )
+
+
+class _IOBinding:
+    """Replace the arrays viewing variable buffer `var_buf`, listed in `refs`
+    as ``(container, key, array)``, with the same views of rows of the
+    input/output buffer `io_buf`."""
+
+    def __init__(
+        self,
+        io_buf: np.ndarray,
+        var_buf: np.ndarray,
+        refs: list[tuple[Any, Any, np.ndarray]],
+    ) -> None:
+        self.io_buf = io_buf
+        self.var_buf = var_buf
+        self.refs = refs
+        self.bound = False
+
+    def bind(self, start: int, end: int) -> None:
+        """View rows `start` to `end` of the input/output buffer if they fill
+        the variable buffer, else restore the arrays viewing the variable
+        buffer (which is then copied to/from the input/output buffer)."""
+        if end - start == len(self.var_buf) and end <= len(self.io_buf):
+            offset = start * self.io_buf.strides[0] - self.var_buf.ctypes.data
+            for container, key, a in self.refs:
+                container[key] = np.ndarray(
+                    a.shape,
+                    a.dtype,
+                    buffer=self.io_buf,
+                    offset=offset + a.ctypes.data,
+                    strides=a.strides,
+                )
+            self.bound = True
+        elif self.bound:
+            for container, key, a in self.refs:
+                container[key] = a
+            self.bound = False
+
+
+def _can_view(var_buf: Any, io_buf: np.ndarray) -> bool:
+    """Whether variable buffer `var_buf` can view rows of the input/output
+    buffer `io_buf`, i.e. they have the same data type and memory layout."""
+    return (
+        isinstance(var_buf, np.ndarray)
+        and var_buf.ndim > 0
+        and var_buf.dtype == io_buf.dtype
+        and var_buf.shape[1:] == io_buf.shape[1:]
+        and var_buf.strides == io_buf.strides
+        and io_buf.flags.c_contiguous
+        and io_buf.flags.writeable
+    )
+
+
 class IOManager(metaclass=ABCMeta):
     r"""Base class.
 
@@ -1619,6 +2135,32 @@ class IOManager(metaclass=ABCMeta):
     that buffer and variable are compatible.
     """
 
+    #: whether :meth:`write` depends on the previous entries being written
+    #: already, i.e. blocks must be written in order
+    ordered_write = False
+
+    def __init__(self) -> None:
+        #: bindings of the variable buffers to the input/output buffer, by
+        #: name of attribute, see :meth:`zero_copy_buffers`
+        self.bindings = {}
+
+    def zero_copy_buffers(self) -> dict[str, np.ndarray]:
+        """Find the variable buffers that can view the rows of the
+        input/output buffer, such that :meth:`read` and :meth:`write` need
+        not copy them when bound by the processing chain.
+
+        Returns
+        -------
+        buffers
+            maps the name of the attribute holding the variable buffer to the
+            input/output buffer.
+        """
+        return {}
+
+    def _is_bound(self, name: str) -> bool:
+        binding = self.bindings.get(name)
+        return binding is not None and binding.bound
+
     @abstractmethod
     def read(self, start: int, end: int) -> None:
         pass
@@ -1637,6 +2179,7 @@ class NumpyIOManager(IOManager):
     r""":class:`IOManager` for buffers that are :class:`numpy.ndarray`\ s."""
 
     def __init__(self, io_buf: np.ndarray, var: ProcChainVar) -> None:
+        super().__init__()
         assert isinstance(io_buf, np.ndarray) and isinstance(var, ProcChainVar)
 
         var.update_auto(dtype=io_buf.dtype, shape=io_buf.shape[1:])
@@ -1651,12 +2194,21 @@ class NumpyIOManager(IOManager):
         self.var = var
         self.raw_var = var.buffer
 
+    def zero_copy_buffers(self) -> dict[str, np.ndarray]:
+        if _can_view(self.raw_var, self.io_buf):
+            return {"raw_var": self.io_buf}
+        return {}
+
     def read(self, start: int, end: int) -> None:
+        if self._is_bound("raw_var"):
+            return
         np.copyto(
             self.raw_var[0 : end - start, ...], self.io_buf[start:end, ...], "unsafe"
         )
 
     def write(self, start: int, end: int) -> None:
+        if self._is_bound("raw_var"):
+            return
         np.copyto(
             self.io_buf[start:end, ...], self.raw_var[0 : end - start, ...], "unsafe"
         )
@@ -1671,6 +2223,7 @@ class LGDOArrayIOManager(IOManager):
     r"""IO Manager for buffers that are :class:`lgdo.Array`\ s."""
 
     def __init__(self, io_array: lgdo.Array, var: ProcChainVar) -> None:
+        super().__init__()
         assert isinstance(io_array, lgdo.Array) and isinstance(var, ProcChainVar)
 
         unit = io_array.attrs.get("units", None)
@@ -1714,12 +2267,21 @@ class LGDOArrayIOManager(IOManager):
                 f"incompatible with {str(self.var)}"
             )
 
+    def zero_copy_buffers(self) -> dict[str, np.ndarray]:
+        if _can_view(self.raw_var, self.raw_buf):
+            return {"raw_var": self.raw_buf}
+        return {}
+
     def read(self, start: int, end: int) -> None:
+        if self._is_bound("raw_var"):
+            return
         np.copyto(
             self.raw_var[0 : end - start, ...], self.raw_buf[start:end, ...], "unsafe"
         )
 
     def write(self, start: int, end: int) -> None:
+        if self._is_bound("raw_var"):
+            return
         np.copyto(
             self.raw_buf[start:end, ...], self.raw_var[0 : end - start, ...], "unsafe"
         )
@@ -1733,6 +2295,7 @@ class LGDOArrayOfEqualSizedArraysIOManager(IOManager):
     r""":class:`IOManager` for buffers that are :class:`lgdo.ArrayOfEqualSizedArray`\ s."""
 
     def __init__(self, io_array: np.ArrayOfEqualSizedArrays, var: ProcChainVar) -> None:
+        super().__init__()
         assert isinstance(io_array, lgdo.ArrayOfEqualSizedArrays) and isinstance(
             var, ProcChainVar
         )
@@ -1778,12 +2341,21 @@ class LGDOArrayOfEqualSizedArraysIOManager(IOManager):
                 f"incompatible with {str(self.var)}"
             )
 
+    def zero_copy_buffers(self) -> dict[str, np.ndarray]:
+        if _can_view(self.raw_var, self.raw_buf):
+            return {"raw_var": self.raw_buf}
+        return {}
+
     def read(self, start: int, end: int) -> None:
+        if self._is_bound("raw_var"):
+            return
         np.copyto(
             self.raw_var[0 : end - start, ...], self.raw_buf[start:end, ...], "unsafe"
         )
 
     def write(self, start: int, end: int) -> None:
+        if self._is_bound("raw_var"):
+            return
         np.copyto(
             self.raw_buf[start:end, ...], self.raw_var[0 : end - start, ...], "unsafe"
         )
@@ -1795,7 +2367,11 @@ class LGDOArrayOfEqualSizedArraysIOManager(IOManager):
 class LGDOVectorOfVectorsIOManager(IOManager):
     r""":class:`IOManager` for buffers that are :class:`lgdo.VectorOfVectors`\ s."""
 
+    # vectors are written after the previous ones in the flattened data
+    ordered_write = True
+
     def __init__(self, io_vov: lgdo.VectorOfVectors, var: ProcChainVar) -> None:
+        super().__init__()
         assert (
             isinstance(io_vov, lgdo.VectorOfVectors)
             and isinstance(var, ProcChainVar)
@@ -1902,6 +2478,7 @@ class LGDOVectorOfVectorsIOManager(IOManager):
 
 class LGDOWaveformIOManager(IOManager):
     def __init__(self, wf_table: lgdo.WaveformTable, variable: ProcChainVar) -> None:
+        super().__init__()
         assert isinstance(wf_table, lgdo.WaveformTable) and isinstance(
             variable, ProcChainVar
         )
@@ -1965,13 +2542,24 @@ class LGDOWaveformIOManager(IOManager):
         self.dt_buf[:] = self.var.grid.get_period(dt_units)
         self.wf_table.dt_units = dt_units
 
+    def zero_copy_buffers(self) -> dict[str, np.ndarray]:
+        buffers = {}
+        if _can_view(self.wf_var, self.wf_buf):
+            buffers["wf_var"] = self.wf_buf
+        if self.variable_t0 and _can_view(self.t0_var, self.t0_buf):
+            buffers["t0_var"] = self.t0_buf
+        return buffers
+
     def read(self, start: int, end: int) -> None:
-        self.wf_var[0 : end - start, ...] = self.wf_buf[start:end, ...]
-        self.t0_var[0 : end - start, ...] = self.t0_buf[start:end, ...]
+        if not self._is_bound("wf_var"):
+            self.wf_var[0 : end - start, ...] = self.wf_buf[start:end, ...]
+        if not self._is_bound("t0_var"):
+            self.t0_var[0 : end - start, ...] = self.t0_buf[start:end, ...]
 
     def write(self, start: int, end: int) -> None:
-        self.wf_buf[start:end, ...] = self.wf_var[0 : end - start, ...]
-        if self.variable_t0:
+        if not self._is_bound("wf_var"):
+            self.wf_buf[start:end, ...] = self.wf_var[0 : end - start, ...]
+        if self.variable_t0 and not self._is_bound("t0_var"):
             self.t0_buf[start:end, ...] = self.t0_var[0 : end - start, ...]
 
     def __str__(self) -> str:
@@ -1989,6 +2577,9 @@ def build_processing_chain(
     db_dict: dict = None,
     outputs: list[str] = None,
     block_width: int = 16,
+    n_threads: int = 1,
+    share_buffers: bool = True,
+    keep: list[str] = None,
 ) -> tuple[ProcessingChain, list[str], lgdo.Table]:
     """Produces a :class:`ProcessingChain` object and an LH5
     :class:`~lgdo.types.table.Table` for output parameters from an input LH5
@@ -2017,12 +2608,19 @@ def build_processing_chain(
                     "init_args" : ["arg1", 3, "arg2"]
                     "unit" : ["u1", "u2"]
                     "defaults" : {"arg1": "defval1"}
+                    "lh5_attrs" : {"key1": "val1"}
+                    "hdf5_settings" : {"compression": "gzip"}
                   }
                }
+               "hdf5_settings" : {"shuffle": true, "par1": {"chunks": [100]}}
             }
 
         - ``outputs`` -- list of output parameters (strings) to compute by
           default. See `outputs` argument
+        - ``hdf5_settings`` -- optional dictionary. HDF5 dataset storage
+          settings (chunking, compression filters, etc.) for the output
+          table, globally or per output parameter. See
+          :meth:`~.lgdo.lh5_store.LH5Store.write_object` for the format
         - ``processors`` -- configuration dictionary
 
           - ``name1, name2`` -- dictionary. key contains comma-separated
@@ -2047,6 +2645,11 @@ def build_processing_chain(
             - ``unit`` -- list of strings. Units for parameters
             - ``defaults`` -- dictionary. Default value to be used for
               arguments read from the database
+            - ``lh5_attrs`` -- dictionary. Attributes attached to the output
+              LGDO
+            - ``hdf5_settings`` -- dictionary. HDF5 dataset storage settings
+              for the output parameter(s), take precedence over the global
+              ones
 
     db_dict
         A nested :class:`dict` pointing to values for database arguments. As
@@ -2063,15 +2666,33 @@ def build_processing_chain(
         a multiple of 16 is preferred, but if performance is not an issue
         any value can be used.
 
+    n_threads
+        number of threads executing the processing chain, see
+        :meth:`ProcessingChain.execute`.
+
+    share_buffers
+        if ``True``, intermediate variables whose values are not needed at
+        the same time share memory, see :meth:`ProcessingChain.share_buffers`.
+        No processors nor input/output buffers can then be added to the
+        chain. Set to ``False`` to inspect the intermediate variables after
+        execution or to extend the chain.
+
+    keep
+        names of variables that hold their values after execution, even if
+        `share_buffers` is ``True``.
+
     Returns
     -------
     (proc_chain, field_mask, lh5_out)
-        - `proc_chain` -- :class:`ProcessingChain` object that is executed
+        - `proc_chain` -- :class:`ProcessingChain` object that is executed.
+          If `share_buffers`, intermediate variables share memory and only
+          the outputs and the variables in `keep` hold their values after
+          execution
         - `field_mask` -- list of input fields that are used
         - `lh5_out` -- output :class:`~lgdo.table.Table` containing processed
           values
     """
-    proc_chain = ProcessingChain(block_width, lh5_in.size)
+    proc_chain = ProcessingChain(block_width, lh5_in.size, n_threads)
 
     if isinstance(dsp_config, str):
         with open(expand_path(dsp_config)) as f:
@@ -2328,9 +2949,10 @@ def build_processing_chain(
                     + [f"{k}={v}" for k, v in init_kwargs.items()]
                 )
                 log.debug(f"building function from init_args: {func.__name__}({expr})")
+                factory = (func, init_args)
                 func = func(*init_args)
             except KeyError:
-                pass
+                factory = None
 
             # Check if new variables should be treated as constants
             params = []
@@ -2381,6 +3003,8 @@ def build_processing_chain(
 
             else:
                 proc_chain.add_processor(func, *params, kw_params, **kwargs)
+                # replicas of the chain need their own instance of the function
+                proc_chain._proc_managers[-1].factory = factory
 
         except Exception as e:
             raise ProcessingChainError(
@@ -2389,6 +3013,8 @@ def build_processing_chain(
 
     # build the output buffers
     lh5_out = lgdo.Table(size=proc_chain._buffer_len)
+    if "hdf5_settings" in dsp_config:
+        lh5_out.attrs["hdf5_settings"] = dsp_config["hdf5_settings"]
 
     # add inputs that are directly copied
     for copy_par in copy_par_list:
@@ -2408,11 +3034,31 @@ def build_processing_chain(
             if isinstance(recipe, str):
                 recipe = processors[recipe]
             buf_out.attrs.update(recipe.get("lh5_attrs", {}))
+            if "hdf5_settings" in recipe:
+                buf_out.attrs["hdf5_settings"] = recipe["hdf5_settings"]
             lh5_out.add_field(out_par, buf_out)
         except Exception as e:
             raise ProcessingChainError(
                 f"Exception raised while linking output buffer {out_par}."
             ) from e
 
+    if share_buffers:
+        proc_chain.share_buffers(keep=keep if keep is not None else ())
+
     field_mask = input_par_list + copy_par_list
-    return (proc_chain, field_mask, lh5_out)
\ No newline at end of file
+    return (proc_chain, field_mask, lh5_out)
+
+
+def _is_const(param: Any) -> bool:
+    """Whether `param` is a value or a constant variable, i.e. does not
+    depend on the entry being processed."""
+    return not isinstance(param, ProcChainVar) or param.is_const
+
+
+def _var_buffers(var: Any) -> list[np.ndarray]:
+    """Buffers of variable `var` (in all unit systems)."""
+    if not isinstance(var, ProcChainVar) or var._buffer is None:
+        return []
+    if isinstance(var._buffer, list):
+        return [b for b, _ in var._buffer]
+    return [var._buffer]
@@ -24,6 +24,7 @@ from pygama.lgdo import (
     Table,
     WaveformTable,
 )
+from pygama.lgdo.lh5_zonemap import rows_may_match
 from pygama.lgdo.vovutils import build_cl, explode_arrays, explode_cl
 
 log = logging.getLogger(__name__)
@@ -124,6 +125,7 @@ class DataLoader:
         self.merge_files = True
         self.output_format = "lgdo.Table"
         self.output_columns = None
+        self.n_threads = 1
         self.data = None
 
         if isinstance(filedb, FileDB):
@@ -323,7 +325,11 @@ class DataLoader:
             # TODO Parse strings to match column names so you don't have to specify which level it is
 
     def set_output(
-        self, fmt: str = None, merge_files: bool = None, columns: list = None
+        self,
+        fmt: str = None,
+        merge_files: bool = None,
+        columns: list = None,
+        n_threads: int = None,
     ) -> None:
         """
         Set the parameters for the output format of load
@@ -337,6 +343,9 @@ class DataLoader:
             one table.
         columns
             The columns that should be copied into the output.
+        n_threads
+            number of threads used to read data from multiple files at once
+            when merging files (see :meth:`.LH5Store.read_object`).
 
         Example
         -------
@@ -351,6 +360,8 @@ class DataLoader:
             self.merge_files = merge_files
         if columns is not None:
             self.output_columns = columns
+        if n_threads is not None:
+            self.n_threads = n_threads
 
     def reset(self):
         """Resets all fields to their default values, as if this is a newly
@@ -362,6 +373,7 @@ class DataLoader:
         self.merge_files = True
         self.output_format = "lgdo.Table"
         self.output_columns = None
+        self.n_threads = 1
         self.data = None
 
     # ------------- Applying Cuts/Loading Data --------------#
@@ -735,6 +747,7 @@ class DataLoader:
                         tb_df["file"] = file
                 else:
                     # loop over tiers in the lowest level
+                    tier_tables = []
                     for tier in self.tiers[low_level]:
                         # is the tier involved, considered the columns on which cuts are applied?
                         if (
@@ -747,22 +760,41 @@ class DataLoader:
                                 self.filedb.tier_dirs[tier].lstrip("/"),
                                 self.filedb.df.iloc[file][f"{tier}_file"].lstrip("/"),
                             )
-
-                            # load the data from the tier file, just the columns needed for the cut
                             table_name = self.get_table_name(tier, tb)
-                            tier_tb, _ = sto.read_object(
-                                table_name, tier_path, field_mask=cut_cols
-                            )
-                            # join eveything in one table
-                            if tb_table is None:
-                                tb_table = tier_tb
-                            else:
-                                tb_table.join(tier_tb)
+                            tier_tables.append((tier_path, table_name))
 
-                    if tb_table is None:
+                    if len(tier_tables) == 0:
                         continue
+
+                    # skip the blocks of rows that can't pass the cut according
+                    # to the zone maps of the columns (if any)
+                    n_rows = sto.read_n_rows(tier_tables[0][1], tier_tables[0][0])
+                    rows = np.arange(n_rows)
+                    for tier_path, table_name in tier_tables:
+                        may_match = rows_may_match(
+                            cut, sto.gimme_file(tier_path, "r")[table_name], rows
+                        )
+                        if may_match is not None:
+                            rows = rows[may_match]
+                    if len(rows) == 0:
+                        continue
+                    idx = rows if len(rows) < n_rows else None
+
+                    for tier_path, table_name in tier_tables:
+                        # load the data from the tier file, just the columns needed for the cut
+                        tier_tb, _ = sto.read_object(
+                            table_name, tier_path, field_mask=cut_cols, idx=idx
+                        )
+                        # join eveything in one table
+                        if tb_table is None:
+                            tb_table = tier_tb
+                        else:
+                            tb_table.join(tier_tb)
+
                     # convert to DataFrame and apply cuts
                     tb_df = tb_table.get_dataframe()
+                    if idx is not None:
+                        tb_df.index = idx
                     tb_df.query(cut, inplace=True)
                     tb_df[f"{low_level}_table"] = tb
                     tb_df[f"{low_level}_idx"] = tb_df.index
@@ -974,6 +1006,7 @@ class DataLoader:
                         lh5_file=tier_paths,
                         idx=idx_mask,
                         field_mask=field_mask,
+                        n_threads=self.n_threads,
                     )
 
                     if level == child:
@@ -16,8 +16,7 @@ import numpy as np
 import pandas as pd
 from parse import parse
 
-from pygama.lgdo import Array, LH5Store, Scalar, VectorOfVectors
-from pygama.lgdo.lh5_store import ls
+from pygama.lgdo import Array, LH5Store, Scalar, VectorOfVectors, lh5_layout
 
 log = logging.getLogger(__name__)
 
@@ -337,11 +336,13 @@ class FileDB:
 
             log.debug(f"Reading column names for tier '{tier}' from {fpath}")
 
-            if os.path.exists(fpath):
-                f = h5py.File(fpath)
-            else:
+            if not os.path.exists(fpath):
                 return pd.Series({f"{tier}_tables": None, f"{tier}_col_idx": None})
 
+            # the file layout is cached, so that scanning the same files again
+            # does not need to walk the HDF5 metadata
+            layout = lh5_layout.default_cache.get(fpath)
+
             # Get tables in each tier
             tier_tables = []
             template = self.table_format[tier]
@@ -363,8 +364,7 @@ class FileDB:
                     + template[braces[1].span()[1] :]
                 )
 
-                # TODO this call here is really expensive!
-                groups = ls(f, wildcard)
+                groups = layout.ls(wildcard)
                 tier_tables = [
                     list(parse(template, g).named.values())[0] for g in groups
                 ]
@@ -384,7 +384,7 @@ class FileDB:
                 else:
                     table_name = template
 
-                col = ls(f[table_name])
+                col = [c.split("/")[-1] for c in layout.ls(f"{table_name}/")]
                 if col not in columns:
                     columns.append(col)
                     col_idx.append(len(columns) - 1)
@@ -10,7 +10,7 @@ from collections import OrderedDict
 
 import numpy as np
 
-from pygama.lgdo import LH5Iterator, LH5Store, ls
+from pygama.lgdo import LH5Iterator, LH5Store, Table, TableEvaluator, ls
 
 log = logging.getLogger(__name__)
 
@@ -24,6 +24,7 @@ def build_hit(
     n_max: int = np.inf,
     wo_mode: str = "write_safe",
     buffer_len: int = 3200,
+    hdf5_settings: dict = None,
 ) -> None:
     """
     Transform a :class:`~.lgdo.Table` into a new :class:`~.lgdo.Table` by
@@ -52,12 +53,16 @@ def build_hit(
                         "parameters": {"a": "1.23", "b": "42.69"},
                     },
                     "AoE": {"expression": "A_max/calE"},
-                }
+                },
+                "hdf5_settings": {"compression": "gzip", "calE": {"shuffle": true}}
             }
 
         The ``outputs`` array lists columns that will be effectively written in
         the output LH5 file. Add here columns that will be simply forwarded as
-        they are from the DSP tier.
+        they are from the DSP tier. The optional ``hdf5_settings`` block sets
+        the HDF5 storage layout (chunking, compression filters) of the output
+        table, globally or per column (see
+        :meth:`~.lgdo.lh5_store.LH5Store.write_object`).
 
     lh5_tables
         tables to consider in the input file. if ``None``, tables with name
@@ -71,6 +76,12 @@ def build_hit(
         maximum number of rows to process
     wo_mode
         forwarded to :meth:`~.lgdo.lh5_store.write_object`.
+    buffer_len
+        number of rows to read/write from/to disk at a time.
+    hdf5_settings
+        default HDF5 dataset storage settings for the output tables, forwarded
+        to :meth:`~.lgdo.lh5_store.write_object`. Settings found in the hit
+        configuration take precedence.
     """
     store = LH5Store()
 
@@ -122,30 +133,35 @@ def build_hit(
     first_done = False
     for (tbl, cfg) in lh5_tables_config.items():
         lh5_it = LH5Iterator(infile, tbl, buffer_len=buffer_len)
+        # parse the operations once, output buffers are reused across chunks
+        evaluator = TableEvaluator(cfg["operations"])
         tot_n_rows = store.read_n_rows(tbl, infile)
         write_offset = 0
 
+        # storage settings from the configuration take precedence
+        tbl_hdf5_settings = {
+            **({} if hdf5_settings is None else hdf5_settings),
+            **cfg.get("hdf5_settings", {}),
+        }
+
         log.info(f"Processing table '{tbl}' in file {infile}")
 
         for tbl_obj, start_row, n_rows in lh5_it:
             n_rows = min(tot_n_rows - start_row, n_rows)
 
-            outtbl_obj = tbl_obj.eval(cfg["operations"])
+            evaluated = evaluator.eval(tbl_obj)
 
-            # remove or add columns according to "outputs" in the configuration
-            # dictionary
-            if "outputs" in cfg:
-                if isinstance(cfg["outputs"], list):
-                    # add missing columns (forwarding)
-                    for out in cfg["outputs"]:
-                        if out not in outtbl_obj.keys():
-                            outtbl_obj.add_column(out, tbl_obj[out])
-
-                    # remove non-required columns
-                    existing_cols = list(outtbl_obj.keys())
-                    for col in existing_cols:
-                        if col not in cfg["outputs"]:
-                            outtbl_obj.remove_column(col, delete=True)
+            # select columns according to "outputs" in the configuration
+            # dictionary. Columns not evaluated are forwarded from the input
+            # table. The evaluator buffers are referenced, not copied
+            if isinstance(cfg.get("outputs"), list):
+                col_dict = {
+                    out: evaluated[out] if out in evaluated else tbl_obj[out]
+                    for out in cfg["outputs"]
+                }
+            else:
+                col_dict = dict(evaluated)
+            outtbl_obj = Table(size=len(evaluated), col_dict=col_dict)
 
             store.write_object(
                 obj=outtbl_obj,
@@ -154,6 +170,7 @@ def build_hit(
                 n_rows=n_rows,
                 wo_mode=wo_mode if first_done is False else "append",
                 write_start=write_offset + start_row,
+                hdf5_settings=tbl_hdf5_settings,
             )
 
             first_done = True
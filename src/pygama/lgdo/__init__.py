@@ -31,12 +31,13 @@ browsed easily in python like any `HDF5 <https://www.hdfgroup.org>`_ file using
 
 from pygama.lgdo.array import Array
 from pygama.lgdo.arrayofequalsizedarrays import ArrayOfEqualSizedArrays
+from pygama.lgdo.concat import concat
 from pygama.lgdo.fixedsizearray import FixedSizeArray
 from pygama.lgdo.encoded import ArrayOfEncodedEqualSizedArrays, VectorOfEncodedVectors
 from pygama.lgdo.lh5_store import LH5Iterator, LH5Store, load_dfs, load_nda, ls, show
 from pygama.lgdo.scalar import Scalar
 from pygama.lgdo.struct import Struct
-from pygama.lgdo.table import Table
+from pygama.lgdo.table import LazyTable, Table, TableEvaluator
 from pygama.lgdo.vectorofvectors import (
     VectorOfVectors
 )
@@ -49,7 +50,9 @@ __all__ = [
     "FixedSizeArray",
     "Scalar",
     "Struct",
+    "LazyTable",
     "Table",
+    "TableEvaluator",
     "VectorOfVectors",
     "WaveformTable",
     "LH5Iterator",
@@ -59,6 +62,7 @@ __all__ = [
     "ls",
     "show",
     "build_cl",
+    "concat",
     "explode",
     "explode_arrays",
     "explode_cl",
@@ -36,6 +36,12 @@ class Array(LGDO):
       standard, reusable, and (we expect) performant Python.
     - It allows the first axis of the `nda` to be treated as "special" for storage
       in :class:`.Table`\ s.
+
+    The internal buffer can be larger than the array: its length along the
+    first axis (the *capacity*, see :meth:`get_capacity`) grows geometrically
+    when needed by :meth:`resize`, :meth:`append` and :meth:`extend`, such that
+    filling an array row by row has an amortized constant cost. `nda` is
+    always a view of the first :func:`len` rows only.
     """
 
     def __init__(
@@ -82,10 +88,25 @@ class Array(LGDO):
             nda = np.array(nda)
 
         self.nda = nda
-        self.dtype = self.nda.dtype
 
         super().__init__(attrs)
 
+    @property
+    def nda(self) -> np.ndarray:
+        """The array data, i.e. the first :func:`len` rows of the internal
+        buffer."""
+        if self._size == self._capacity:
+            return self._nda
+        return self._nda[: self._size]
+
+    @nda.setter
+    def nda(self, value: np.ndarray) -> None:
+        if not isinstance(value, np.ndarray):
+            value = np.array(value)
+        self._nda = value
+        self._size = self._capacity = len(value) if value.ndim > 0 else None
+        self.dtype = value.dtype
+
     def datatype_name(self) -> str:
         return "array"
 
@@ -98,16 +119,76 @@ class Array(LGDO):
     def __len__(self) -> int:
         return len(self.nda)
 
-    def resize(self, new_size: int) -> None:
-        new_shape = (new_size,) + self.nda.shape[1:]
-        return self.nda.resize(new_shape, refcheck=True)
+    def get_capacity(self) -> int:
+        """Return the number of rows that fit in the internal buffer."""
+        return self._capacity
+
+    def set_capacity(self, capacity: int) -> None:
+        """Reallocate the internal buffer to hold `capacity` rows.
+
+        Rows beyond `capacity` are dropped. Note that views of `nda` taken
+        before the call do not point to the new buffer.
+        """
+        if capacity == self._capacity:
+            return
+        nda = self._alloc(capacity)
+        n = min(self._size, capacity)
+        nda[:n] = self._nda[:n]
+        self._nda = nda
+        self._capacity = capacity
+        self._size = n
+
+    def _alloc(self, capacity: int) -> np.ndarray:
+        """Allocate an uninitialized buffer for `capacity` rows."""
+        return np.empty((capacity,) + self._nda.shape[1:], dtype=self._nda.dtype)
+
+    def trim_capacity(self) -> None:
+        """Shrink the internal buffer to the length of the array."""
+        self.set_capacity(self._size)
+
+    def resize(self, new_size: int, trim: bool = False, zero_fill: bool = True) -> None:
+        """Set the number of rows of the array.
+
+        The internal buffer is reallocated only if `new_size` exceeds its
+        capacity, in which case the capacity is at least doubled. New rows are
+        set to zero, unless `zero_fill` is ``False`` (e.g. if they are
+        overwritten right away). If `trim` is ``True``, the capacity is set to
+        `new_size`.
+        """
+        old_size = self._size
+        if trim:
+            self.set_capacity(new_size)
+        elif new_size > self._capacity:
+            self.set_capacity(max(new_size, 2 * self._capacity))
+        self._size = new_size
+        if zero_fill and new_size > old_size:
+            self._nda[old_size:new_size] = 0
 
     def append(self, value: np.ndarray) -> None:
-        self.resize(len(self) + 1)
+        self.resize(len(self) + 1, zero_fill=False)
         self.nda[-1] = value
 
-    def insert(self, i: int, value: int | float) -> None:
-        self.nda = np.insert(self.nda, i, value)
+    def extend(self, values: np.ndarray) -> None:
+        """Append the rows of `values` at the end."""
+        values = np.asarray(values)
+        n = len(self)
+        self.resize(n + len(values), zero_fill=False)
+        self._nda[n : self._size] = values
+
+    def insert(self, i: int, value: int | float | np.ndarray) -> None:
+        """Insert `value` before index `i`.
+
+        `value` is either a single row or an array of rows, which are all
+        inserted.
+        """
+        value = np.asarray(value, dtype=self.dtype)
+        n_new = len(value) if value.ndim == self._nda.ndim else 1
+        n = len(self)
+        if i < 0:
+            i += n
+        self.resize(n + n_new, zero_fill=False)
+        self._nda[i + n_new : n + n_new] = self._nda[i:n]
+        self._nda[i : i + n_new] = value
 
     def __getitem__(self, key):
         return self.nda[key]
@@ -155,6 +236,10 @@ class Array(LGDO):
         - ``pd``: returns a :class:`pandas.Series`
         - ``np``: returns the internal `nda` attribute (:class:`numpy.ndarray`)
         - ``ak``: returns an :class:`ak.Array` initialized with `self.nda`
+        - ``arrow``: returns a :class:`pyarrow.Array` (requires the
+          :mod:`pyarrow` package). Multi-dimensional arrays are viewed as
+          (nested) fixed-size lists. Boolean arrays are copied, since Arrow
+          stores them as bits.
 
         Parameters
         ----------
@@ -200,5 +285,31 @@ class Array(LGDO):
             # NOTE: this is zero-copy!
             return ak.Array(self.nda)
 
+        if library == "arrow":
+            if attach_units:
+                msg = "Arrow arrays can't hold units, you must view the data with_units=False"
+                raise ValueError(msg)
+
+            return _nda_to_arrow(self.nda)
+
         msg = f"{library} is not a supported third-party format."
-        raise ValueError(msg)
\ No newline at end of file
+        raise ValueError(msg)
+
+
+def _nda_to_arrow(nda: np.ndarray):
+    """View a NumPy array as a :class:`pyarrow.Array`, without copy if
+    possible."""
+    # optional dependency
+    import pyarrow as pa
+
+    if nda.ndim > 1:
+        nda = np.ascontiguousarray(nda)
+        values = _nda_to_arrow(nda.reshape((-1,) + nda.shape[2:]))
+        return pa.FixedSizeListArray.from_arrays(values, nda.shape[1])
+
+    if nda.dtype.kind not in "iuf" or not nda.flags.c_contiguous:
+        return pa.array(nda)
+
+    return pa.Array.from_buffers(
+        pa.from_numpy_dtype(nda.dtype), len(nda), [None, pa.py_buffer(nda)]
+    )
@@ -0,0 +1,44 @@
+r"""Data compression utilities.
+
+This subpackage collects all LEGEND custom data compression (encoding) and
+decompression (decoding) algorithms.
+
+Available lossless waveform compression algorithms:
+
+* :class:`.RadwareSigcompress`, a Python port of the C algorithm
+  `radware-sigcompress` by D. Radford.
+* :class:`.ULEB128ZigZagDiff` variable-length base-128 encoding of waveform
+  differences.
+
+All waveform compression algorithms inherit from the :class:`.WaveformCodec`
+abstract class.
+
+:func:`~.generic.encode` and :func:`~.generic.decode` provide a high-level
+interface for encoding/decoding :class:`~.lgdo.LGDO`\ s.
+
+>>> from pygama.lgdo import WaveformTable, compression
+>>> wftbl = WaveformTable(...)
+>>> codec = compression.RadwareSigcompress(codec_shift=-32768)
+>>> enc_wft = compression.encode(wftbl.values, codec=codec)
+>>> compression.decode(enc_wft) # == wftbl.values
+
+Waveform values are encoded automatically on write by
+:meth:`~.lgdo.lh5_store.LH5Store.write_object` if a codec is found in their
+``compression`` attribute and decoded transparently by
+:meth:`~.lgdo.lh5_store.LH5Store.read_object`.
+"""
+
+from .base import WaveformCodec
+from .generic import decode, encode
+from .radware import RadwareSigcompress
+from .utils import str2wfcodec
+from .varlen import ULEB128ZigZagDiff
+
+__all__ = [
+    "WaveformCodec",
+    "encode",
+    "decode",
+    "RadwareSigcompress",
+    "ULEB128ZigZagDiff",
+    "str2wfcodec",
+]
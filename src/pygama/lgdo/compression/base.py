@@ -0,0 +1,31 @@
+"""Base class for waveform compression algorithms."""
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class WaveformCodec:
+    """Base class identifying a waveform compression algorithm.
+
+    Codec parameters are dataclass fields, whose name should be prefixed with
+    ``codec_``. They are stored as attributes of the encoded LGDO, together
+    with the codec name (see :meth:`asattrs`), so that the codec can be
+    reconstructed at decoding time.
+    """
+
+    @classmethod
+    def codec_name(cls) -> str:
+        """Name of the codec, i.e. the snake-case class name.
+
+        Examples
+        --------
+        >>> RadwareSigcompress.codec_name()
+        'radware_sigcompress'
+        """
+        return re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", cls.__name__).lower()
+
+    def asattrs(self) -> dict[str, str | int | float]:
+        """Return the codec name and parameters as LGDO attributes."""
+        return {"codec": self.codec_name(), **asdict(self)}
@@ -0,0 +1,195 @@
+"""High-level encoding/decoding of LGDOs with waveform codecs."""
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+
+from pygama.lgdo.array import Array
+from pygama.lgdo.arrayofequalsizedarrays import ArrayOfEqualSizedArrays
+from pygama.lgdo.encoded import ArrayOfEncodedEqualSizedArrays, VectorOfEncodedVectors
+from pygama.lgdo.vectorofvectors import VectorOfVectors
+
+from . import radware, varlen
+from .base import WaveformCodec
+from .radware import RadwareSigcompress
+from .utils import str2wfcodec
+from .varlen import ULEB128ZigZagDiff
+
+log = logging.getLogger(__name__)
+
+# attributes added to the encoded LGDO, which must not end up in the decoded one
+_CODEC_ATTRS = ("codec", "decoded_dtype")
+
+_codecs = {
+    codec.codec_name(): codec for codec in (RadwareSigcompress, ULEB128ZigZagDiff)
+}
+
+
+def encode(
+    obj: ArrayOfEqualSizedArrays | VectorOfVectors,
+    codec: WaveformCodec | str = None,
+) -> ArrayOfEncodedEqualSizedArrays | VectorOfEncodedVectors:
+    """Encode LGDOs with a waveform codec.
+
+    Defines behaviors for each implemented waveform encoding algorithm.
+
+    Parameters
+    ----------
+    obj
+        LGDO array type.
+    codec
+        algorithm to be used for encoding, as a :class:`.WaveformCodec`
+        instance or as a string (see :func:`.str2wfcodec`). If ``None``, the
+        codec stored in the ``compression`` attribute of `obj` is used.
+
+    Returns
+    -------
+    encoded
+        an :class:`.ArrayOfEncodedEqualSizedArrays` if `obj` is an
+        :class:`.ArrayOfEqualSizedArrays`, a :class:`.VectorOfEncodedVectors`
+        if `obj` is a :class:`.VectorOfVectors`.
+    """
+    if codec is None:
+        codec = obj.attrs.get("compression")
+    if isinstance(codec, str):
+        codec = str2wfcodec(codec)
+    if not isinstance(codec, WaveformCodec):
+        raise ValueError(f"'{codec}' is not a valid waveform codec")
+
+    if isinstance(obj, ArrayOfEqualSizedArrays):
+        if obj.nda.ndim != 2:
+            raise ValueError("only 2D arrays of equal-sized arrays can be encoded")
+        n_rows, n_cols = obj.nda.shape
+        flat = np.ascontiguousarray(obj.nda).reshape(-1)
+        cl_in = np.arange(1, n_rows + 1, dtype="uint64") * n_cols
+    elif isinstance(obj, VectorOfVectors):
+        if obj.ndim != 2:
+            raise ValueError("only 2D vectors of vectors can be encoded")
+        cl_in = obj.cumulative_length.nda
+        flat = obj.flattened_data.nda[: cl_in[-1] if len(cl_in) > 0 else 0]
+    else:
+        raise ValueError(f"cannot encode objects of type {type(obj).__name__}")
+
+    if isinstance(codec, RadwareSigcompress):
+        enc, cl_out = radware.encode(flat, cl_in, shift=codec.codec_shift)
+    elif isinstance(codec, ULEB128ZigZagDiff):
+        enc, cl_out = varlen.encode(flat, cl_in)
+    else:
+        raise ValueError(f"{type(codec).__name__} encoding is not implemented")
+
+    attrs = {k: v for k, v in obj.attrs.items() if k not in ("compression", "datatype")}
+    attrs |= codec.asattrs()
+    attrs["decoded_dtype"] = str(flat.dtype)
+
+    encoded_data = VectorOfVectors(flattened_data=Array(enc), cumulative_length=cl_out)
+
+    if isinstance(obj, ArrayOfEqualSizedArrays):
+        return ArrayOfEncodedEqualSizedArrays(
+            encoded_data=encoded_data, decoded_size=n_cols, attrs=attrs
+        )
+
+    return VectorOfEncodedVectors(
+        encoded_data=encoded_data,
+        decoded_size=Array(np.diff(cl_in, prepend=0).astype("uint32")),
+        attrs=attrs,
+    )
+
+
+def decode(
+    obj: ArrayOfEncodedEqualSizedArrays | VectorOfEncodedVectors,
+    out_buf: ArrayOfEqualSizedArrays | VectorOfVectors = None,
+    out_start: int = 0,
+) -> ArrayOfEqualSizedArrays | VectorOfVectors:
+    """Decode encoded LGDOs.
+
+    The codec is reconstructed from the attributes of `obj` (see
+    :meth:`.WaveformCodec.asattrs`).
+
+    Parameters
+    ----------
+    obj
+        LGDO array type.
+    out_buf
+        pre-allocated LGDO for the decoded signals. It is resized if too short.
+    out_start
+        row of `out_buf` at which the decoded signals are written. The rows
+        before and after the decoded ones are left untouched.
+
+    Returns
+    -------
+    decoded
+        an :class:`.ArrayOfEqualSizedArrays` if `obj` is an
+        :class:`.ArrayOfEncodedEqualSizedArrays`, a :class:`.VectorOfVectors`
+        if `obj` is a :class:`.VectorOfEncodedVectors`.
+    """
+    if "codec" not in obj.attrs:
+        raise RuntimeError("object does not carry any 'codec' attribute")
+    codec_name = obj.attrs["codec"]
+    if codec_name not in _codecs:
+        raise ValueError(f"'{codec_name}' decoding is not implemented")
+    codec_cls = _codecs[codec_name]
+    codec = codec_cls(
+        **{
+            k: v
+            for k, v in obj.attrs.items()
+            if k in codec_cls.__dataclass_fields__.keys()
+        }
+    )
+    dtype = np.dtype(obj.attrs.get("decoded_dtype", "int16"))
+    attrs = {
+        k: v
+        for k, v in obj.attrs.items()
+        if k not in (*_CODEC_ATTRS, *codec_cls.__dataclass_fields__.keys(), "datatype")
+    }
+
+    n_rows = len(obj)
+    cl_in = obj.encoded_data.cumulative_length.nda
+    enc = obj.encoded_data.flattened_data.nda
+
+    if isinstance(obj, ArrayOfEncodedEqualSizedArrays):
+        n_cols = obj.decoded_size.value
+        if out_buf is None:
+            out_buf = ArrayOfEqualSizedArrays(
+                shape=(n_rows, n_cols), dtype=dtype, attrs=attrs
+            )
+        else:
+            if out_buf.nda.shape[1:] != (n_cols,):
+                raise ValueError(
+                    f"out_buf has incompatible shape {out_buf.nda.shape} "
+                    f"(decoded arrays have length {n_cols})"
+                )
+            if len(out_buf) < out_start + n_rows:
+                out_buf.resize(out_start + n_rows)
+        out_flat = out_buf.nda[out_start : out_start + n_rows].reshape(-1)
+        cl_out = np.arange(1, n_rows + 1, dtype="uint64") * n_cols
+    elif isinstance(obj, VectorOfEncodedVectors):
+        cl_out = np.cumsum(obj.decoded_size.nda[:n_rows], dtype="uint64")
+        n_samples = int(cl_out[-1]) if n_rows > 0 else 0
+        if out_buf is None:
+            out_buf = VectorOfVectors(
+                flattened_data=Array(shape=(n_samples,), dtype=dtype),
+                cumulative_length=Array(cl_out.astype("uint32")),
+                attrs=attrs,
+            )
+            out_flat = out_buf.flattened_data.nda
+        else:
+            # the rows are sized from the decoded sizes, then decoded in place
+            cl_buf = out_buf.cumulative_length
+            fd_start = int(cl_buf.nda[out_start - 1]) if out_start > 0 else 0
+            if len(cl_buf) < out_start + n_rows:
+                cl_buf.resize(out_start + n_rows, zero_fill=False)
+            cl_buf.nda[out_start : out_start + n_rows] = cl_out + fd_start
+            fd_buf = out_buf.flattened_data
+            if len(fd_buf) < fd_start + n_samples:
+                fd_buf.resize(fd_start + n_samples, zero_fill=False)
+            out_flat = fd_buf.nda[fd_start : fd_start + n_samples]
+    else:
+        raise ValueError(f"cannot decode objects of type {type(obj).__name__}")
+
+    if isinstance(codec, RadwareSigcompress):
+        radware.decode(enc, cl_in, out_flat, cl_out, shift=codec.codec_shift)
+    elif isinstance(codec, ULEB128ZigZagDiff):
+        varlen.decode(enc, cl_in, out_flat, cl_out)
+
+    return out_buf
@@ -0,0 +1,402 @@
+r"""Python port of the `radware-sigcompress` waveform compression algorithm by
+D. Radford.
+
+The original C code can be found in the ``sigcompress.c`` file of the
+`radware` software suite. The waveform is split into sections of (at least)
+48 samples. Each section is encoded either as absolute values or as
+differences between consecutive samples (whatever requires less bits), as
+offset from the section minimum and with the minimum number of bits needed.
+
+Notes
+-----
+The encoded stream is made of 16-bit words (stored in native byte order),
+padded to a multiple of 4 bytes. Unlike the original C implementation, the
+waveform length is stored as a 32-bit integer in the first two words, so
+waveforms longer than 65535 samples are supported. The algorithm operates on
+signed 16-bit integers: use `codec_shift` to map other 16-bit integer types
+(e.g. ``-32768`` for :class:`numpy.uint16` waveforms) to that range.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+import numba
+import numpy as np
+from numpy.typing import NDArray
+
+from pygama.lgdo.utils import numba_defaults_kwargs as nb_kwargs
+
+from .base import WaveformCodec
+
+log = logging.getLogger(__name__)
+
+# fmt: off
+_radware_sigcompress_mask = np.array(
+    [0, 1, 3, 7, 15, 31, 63, 127, 255,
+     511, 1023, 2047, 4095, 8191, 16383, 32767, 65535],
+    dtype="uint32",
+)
+# fmt: on
+
+
+@dataclass(frozen=True)
+class RadwareSigcompress(WaveformCodec):
+    """`radware-sigcompress` array codec.
+
+    Examples
+    --------
+    >>> from pygama.lgdo.compression import RadwareSigcompress
+    >>> codec = RadwareSigcompress(codec_shift=-32768)
+    """
+
+    codec_shift: int = 0
+    """Offset added to the input waveform before encoding.
+
+    The `radware-sigcompress` algorithm is limited to encoding of 16-bit
+    integer values. In certain cases (notably, with *unsigned* 16-bit integer
+    values), shifting incompatible data by a fixed amount circumvents the
+    issue.
+    """
+
+
+def max_encoded_size(n_samples: int, n_arrays: int = 1) -> int:
+    """Upper bound (in bytes) of the size of `n_arrays` encoded arrays with
+    `n_samples` samples in total."""
+    return 2 * (n_samples + 5 * (n_samples // 48) + 9 * n_arrays)
+
+
+def encode(
+    sig_in: NDArray,
+    cumulative_length: NDArray,
+    shift: int = 0,
+) -> tuple[NDArray, NDArray]:
+    """Compress arrays of integers with the `radware-sigcompress` algorithm.
+
+    Parameters
+    ----------
+    sig_in
+        flattened array of 16-bit integer (after `shift`) samples holding the
+        concatenation of the arrays to be encoded.
+    cumulative_length
+        the cumulative length of the arrays in `sig_in` (see
+        :class:`~.lgdo.vectorofvectors.VectorOfVectors`).
+    shift
+        value added to `sig_in` before encoding.
+
+    Returns
+    -------
+    (sig_out, cumulative_length_out)
+        the flattened encoded arrays (bytes) and their cumulative length.
+    """
+    sig_in = np.ascontiguousarray(sig_in)
+    if sig_in.dtype.kind not in ("i", "u"):
+        raise ValueError(f"cannot encode non-integer data of type {sig_in.dtype}")
+
+    sig_out = np.empty(max_encoded_size(len(sig_in), len(cumulative_length)), "ubyte")
+    cl_out = np.empty(len(cumulative_length), dtype="uint32")
+
+    sig_out_words = sig_out.view("uint16")
+    n_words = _radware_sigcompress_encode_arrays(
+        sig_in,
+        np.asarray(cumulative_length, dtype="int64"),
+        sig_out_words,
+        cl_out,
+        shift,
+    )
+    del sig_out_words
+
+    # give unused memory back
+    sig_out.resize(2 * n_words, refcheck=False)
+
+    return sig_out, cl_out
+
+
+def decode(
+    sig_in: NDArray,
+    cumulative_length: NDArray,
+    sig_out: NDArray,
+    cumulative_length_out: NDArray,
+    shift: int = 0,
+) -> NDArray:
+    """Decompress arrays encoded with the `radware-sigcompress` algorithm.
+
+    Parameters
+    ----------
+    sig_in
+        flattened encoded arrays (bytes).
+    cumulative_length
+        cumulative length (in bytes) of the encoded arrays.
+    sig_out
+        pre-allocated flattened array that will hold the decoded arrays.
+    cumulative_length_out
+        cumulative length of the decoded arrays in `sig_out`.
+    shift
+        the value that was added to the samples before encoding.
+
+    Returns
+    -------
+    sig_out
+        the decoded flattened arrays.
+    """
+    if len(cumulative_length) > 0:
+        sig_in = sig_in[: cumulative_length[-1]]
+    else:
+        sig_in = sig_in[:0]
+
+    _radware_sigcompress_decode_arrays(
+        sig_in.view("uint16"),
+        np.asarray(cumulative_length, dtype="int64"),
+        sig_out,
+        np.asarray(cumulative_length_out, dtype="int64"),
+        shift,
+    )
+    return sig_out
+
+
+@numba.njit(**nb_kwargs)
+def _radware_sigcompress_encode_arrays(
+    sig_in: NDArray, cl_in: NDArray, sig_out: NDArray, cl_out: NDArray, shift: int
+) -> int:
+    """Encode all arrays in `sig_in` contiguously into `sig_out` (16-bit
+    words). Fills `cl_out` with the cumulative length in bytes and returns the
+    total number of words written."""
+    start = 0
+    iso = 0
+    for i in range(len(cl_in)):
+        stop = cl_in[i]
+        iso += _radware_sigcompress_encode(sig_in[start:stop], sig_out[iso:], shift)
+        cl_out[i] = 2 * iso
+        start = stop
+    return iso
+
+
+@numba.njit(**nb_kwargs)
+def _radware_sigcompress_decode_arrays(
+    sig_in: NDArray, cl_in: NDArray, sig_out: NDArray, cl_out: NDArray, shift: int
+) -> None:
+    """Decode all arrays in `sig_in` (16-bit words) into `sig_out`, according
+    to the cumulative lengths `cl_in` (bytes) and `cl_out` (samples)."""
+    start = 0
+    start_out = 0
+    for i in range(len(cl_in)):
+        stop = cl_in[i] // 2
+        stop_out = cl_out[i]
+        n = _radware_sigcompress_decode(
+            sig_in[start:stop], sig_out[start_out:stop_out], shift
+        )
+        if n != stop_out - start_out:
+            raise ValueError("decoded array length does not match the expected one")
+        start = stop
+        start_out = stop_out
+
+
+@numba.njit(**nb_kwargs)
+def _to_int16(value: int) -> int:
+    """Interpret the lowest 16 bits of `value` as a signed integer."""
+    return ((value + 32768) & 0xFFFF) - 32768
+
+
+@numba.njit(**nb_kwargs)
+def _radware_sigcompress_encode(sig_in: NDArray, sig_out: NDArray, shift: int) -> int:
+    """Encode a single array. Returns the number of 16-bit words written."""
+    mask = _radware_sigcompress_mask
+    sig_len_in = len(sig_in)
+
+    # the signal length, as a 32-bit integer
+    sig_out[0] = (sig_len_in >> 16) & 0xFFFF
+    sig_out[1] = sig_len_in & 0xFFFF
+    iso = 2
+
+    j = 0
+    bp = 0
+    while j < sig_len_in:
+        # find optimal method and length for compression of next section
+        max1 = min1 = int(sig_in[j]) + shift
+        if max1 < -32768 or max1 > 32767:
+            raise ValueError("value out of range, set an appropriate codec_shift")
+        max2 = -16000
+        min2 = 16000
+        nb1 = nb2 = 2
+        nw = 1
+        i = j + 1
+        while i < sig_len_in and i < j + 48:
+            s = int(sig_in[i]) + shift
+            if s < -32768 or s > 32767:
+                raise ValueError("value out of range, set an appropriate codec_shift")
+            if max1 < s:
+                max1 = s
+            if min1 > s:
+                min1 = s
+            ds = s - (int(sig_in[i - 1]) + shift)
+            if max2 < ds:
+                max2 = ds
+            if min2 > ds:
+                min2 = ds
+            nw += 1
+            i += 1
+
+        if max1 - min1 <= max2 - min2:
+            # use absolute values
+            nb2 = 99
+            while max1 - min1 > mask[nb1]:
+                nb1 += 1
+            while i < sig_len_in and i < j + 128:
+                s = int(sig_in[i]) + shift
+                if s < -32768 or s > 32767:
+                    raise ValueError(
+                        "value out of range, set an appropriate codec_shift"
+                    )
+                if max1 < s:
+                    max1 = s
+                dd1 = max1 - min1
+                if min1 > s:
+                    dd1 = max1 - s
+                if dd1 > mask[nb1]:
+                    break
+                if min1 > s:
+                    min1 = s
+                nw += 1
+                i += 1
+        else:
+            # use difference values
+            nb1 = 99
+            while max2 - min2 > mask[nb2]:
+                nb2 += 1
+            while i < sig_len_in and i < j + 128:
+                s = int(sig_in[i]) + shift
+                if s < -32768 or s > 32767:
+                    raise ValueError(
+                        "value out of range, set an appropriate codec_shift"
+                    )
+                ds = s - (int(sig_in[i - 1]) + shift)
+                if max2 < ds:
+                    max2 = ds
+                dd2 = max2 - min2
+                if min2 > ds:
+                    dd2 = max2 - ds
+                if dd2 > mask[nb2]:
+                    break
+                if min2 > ds:
+                    min2 = ds
+                nw += 1
+                i += 1
+
+        if bp > 0:
+            iso += 1
+
+        # do actual compression
+        sig_out[iso] = nw  # number of samples in the section
+        iso += 1
+        bp = 0  # bit pointer
+        if nb1 <= nb2:
+            # encode absolute values
+            sig_out[iso] = nb1  # number of bits used for encoding
+            sig_out[iso + 1] = min1 & 0xFFFF  # min value used for encoding
+            iso += 2
+            sig_out[iso] = 0
+            for i in range(j, j + nw):
+                dd = ((int(sig_in[i]) + shift - min1) << (32 - bp - nb1)) & 0xFFFFFFFF
+                sig_out[iso] |= dd >> 16
+                bp += nb1
+                if bp > 15:
+                    iso += 1
+                    sig_out[iso] = dd & 0xFFFF
+                    bp -= 16
+        else:
+            # encode derivative / difference values
+            sig_out[iso] = nb2 + 32  # number of bits used for encoding, plus flag
+            sig_out[iso + 1] = (int(sig_in[j]) + shift) & 0xFFFF  # starting value
+            sig_out[iso + 2] = min2 & 0xFFFF  # min value used for encoding
+            iso += 3
+            sig_out[iso] = 0
+            for i in range(j + 1, j + nw):
+                dd = (
+                    (int(sig_in[i]) - int(sig_in[i - 1]) - min2) << (32 - bp - nb2)
+                ) & 0xFFFFFFFF
+                sig_out[iso] |= dd >> 16
+                bp += nb2
+                if bp > 15:
+                    iso += 1
+                    sig_out[iso] = dd & 0xFFFF
+                    bp -= 16
+
+        j += nw
+
+    if bp > 0:
+        iso += 1
+    # make sure iso is even for 4-byte padding
+    if iso % 2:
+        sig_out[iso] = 0
+        iso += 1
+
+    return iso
+
+
+@numba.njit(**nb_kwargs)
+def _read_bits(sig_in: NDArray, isi: int, bp: int, nb: int) -> tuple[int, int, int]:
+    """Read the `nb` bits following the first `bp` bits of word `isi`.
+
+    Returns the value and the updated word index and bit pointer.
+    """
+    dd = int(sig_in[isi]) << 16
+    if bp + nb > 16 and isi + 1 < len(sig_in):
+        dd |= int(sig_in[isi + 1])
+    value = (dd >> (32 - bp - nb)) & _radware_sigcompress_mask[nb]
+    bp += nb
+    if bp >= 16:
+        isi += 1
+        bp -= 16
+    return value, isi, bp
+
+
+@numba.njit(**nb_kwargs)
+def _radware_sigcompress_decode(sig_in: NDArray, sig_out: NDArray, shift: int) -> int:
+    """Decode a single array. Returns the number of samples decoded."""
+    sig_len_in = len(sig_in)
+    if sig_len_in < 2:
+        return 0
+
+    siglen = (int(sig_in[0]) << 16) | int(sig_in[1])
+    if siglen > len(sig_out):
+        raise ValueError("output array too short")
+    isi = 2
+
+    j = 0
+    while isi + 2 < sig_len_in and j < siglen:
+        nw = int(sig_in[isi])  # number of samples encoded
+        nb = int(sig_in[isi + 1])  # number of bits used in compression
+        isi += 2
+        bp = 0  # bit pointer
+
+        if nb < 32:
+            # decode absolute values
+            min_val = _to_int16(int(sig_in[isi]))  # min value used for encoding
+            isi += 1
+            i = 0
+            while i < nw and j < siglen:
+                value, isi, bp = _read_bits(sig_in, isi, bp, nb)
+                sig_out[j] = _to_int16(value + min_val) - shift
+                j += 1
+                i += 1
+        else:
+            # decode derivative / difference values
+            nb -= 32
+            last = _to_int16(int(sig_in[isi]))  # starting signal value
+            min_val = _to_int16(int(sig_in[isi + 1]))  # min value used for encoding
+            isi += 2
+            sig_out[j] = last - shift
+            j += 1
+            i = 1
+            while i < nw and j < siglen:
+                value, isi, bp = _read_bits(sig_in, isi, bp, nb)
+                last = _to_int16(last + value + min_val)
+                sig_out[j] = last - shift
+                j += 1
+                i += 1
+
+        # skip partially used word
+        if bp > 0:
+            isi += 1
+
+    return j
@@ -0,0 +1,39 @@
+"""Compression utilities."""
+from __future__ import annotations
+
+import ast
+import re
+
+from .base import WaveformCodec
+
+
+def str2wfcodec(expr: str) -> WaveformCodec:
+    """Parse a string and return the corresponding :class:`.WaveformCodec`.
+
+    The string must be a call to the codec class constructor, with only
+    keyword arguments given as Python literals.
+
+    Examples
+    --------
+    >>> str2wfcodec("RadwareSigcompress(codec_shift=-32768)")
+    RadwareSigcompress(codec_shift=-32768)
+    """
+    from . import radware, varlen
+
+    codecs = {
+        "RadwareSigcompress": radware.RadwareSigcompress,
+        "ULEB128ZigZagDiff": varlen.ULEB128ZigZagDiff,
+    }
+
+    match = re.fullmatch(r"\s*(\w+)\s*(?:\((.*)\))?\s*", expr, re.DOTALL)
+    if match is None or match.group(1) not in codecs:
+        raise ValueError(f"could not parse '{expr}' into a waveform codec")
+
+    kwargs = {}
+    if match.group(2):
+        call = ast.parse(f"f({match.group(2)})", mode="eval").body
+        if call.args:
+            raise ValueError("codec parameters must be given as keyword arguments")
+        kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in call.keywords}
+
+    return codecs[match.group(1)](**kwargs)
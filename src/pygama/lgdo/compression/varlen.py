@@ -0,0 +1,173 @@
+"""Variable-length code compression algorithms.
+
+Waveforms are encoded as differences between consecutive samples, mapped to
+unsigned integers with the zig-zag scheme and stored with the unsigned
+little-endian base-128 (ULEB128) variable-length code. Waveforms with small
+sample-to-sample variations (e.g. baselines) are thus stored with one or two
+bytes per sample.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+import numba
+import numpy as np
+from numpy.typing import NDArray
+
+from pygama.lgdo.utils import numba_defaults_kwargs as nb_kwargs
+
+from .base import WaveformCodec
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ULEB128ZigZagDiff(WaveformCodec):
+    """ZigZag [#WikiZZ]_ encoding followed by Unsigned Little Endian Base 128
+    (ULEB128) [#WikiLEB128]_ encoding of array differences.
+
+    .. [#WikiZZ] https://wikipedia.org/wiki/Variable-length_quantity#Zigzag_encoding
+    .. [#WikiLEB128] https://wikipedia.org/wiki/LEB128
+    """
+
+
+def max_encoded_size(n_samples: int, itemsize: int) -> int:
+    """Upper bound (in bytes) of the size of `n_samples` encoded samples of
+    `itemsize` bytes."""
+    # differences need one more bit, zig-zag does not change the size
+    return n_samples * -(-(8 * itemsize + 1) // 7)
+
+
+def encode(sig_in: NDArray, cumulative_length: NDArray) -> tuple[NDArray, NDArray]:
+    """Encode arrays of integers as ULEB128 zig-zag differences.
+
+    Parameters
+    ----------
+    sig_in
+        flattened array of integer samples holding the concatenation of the
+        arrays to be encoded.
+    cumulative_length
+        the cumulative length of the arrays in `sig_in` (see
+        :class:`~.lgdo.vectorofvectors.VectorOfVectors`).
+
+    Returns
+    -------
+    (sig_out, cumulative_length_out)
+        the flattened encoded arrays (bytes) and their cumulative length.
+    """
+    sig_in = np.ascontiguousarray(sig_in)
+    if sig_in.dtype.kind not in ("i", "u"):
+        raise ValueError(f"cannot encode non-integer data of type {sig_in.dtype}")
+    if sig_in.dtype.itemsize > 4:
+        raise ValueError("cannot encode 64-bit integers")
+
+    sig_out = np.empty(max_encoded_size(len(sig_in), sig_in.dtype.itemsize), "ubyte")
+    cl_out = np.empty(len(cumulative_length), dtype="uint32")
+
+    nbytes = _uleb128_zigzag_diff_encode_arrays(
+        sig_in, np.asarray(cumulative_length, dtype="int64"), sig_out, cl_out
+    )
+
+    # give unused memory back
+    sig_out.resize(nbytes, refcheck=False)
+
+    return sig_out, cl_out
+
+
+def decode(
+    sig_in: NDArray,
+    cumulative_length: NDArray,
+    sig_out: NDArray,
+    cumulative_length_out: NDArray,
+) -> NDArray:
+    """Decode arrays encoded as ULEB128 zig-zag differences.
+
+    Parameters
+    ----------
+    sig_in
+        flattened encoded arrays (bytes).
+    cumulative_length
+        cumulative length (in bytes) of the encoded arrays.
+    sig_out
+        pre-allocated flattened array that will hold the decoded arrays.
+    cumulative_length_out
+        cumulative length of the decoded arrays in `sig_out`.
+
+    Returns
+    -------
+    sig_out
+        the decoded flattened arrays.
+    """
+    _uleb128_zigzag_diff_decode_arrays(
+        sig_in,
+        np.asarray(cumulative_length, dtype="int64"),
+        sig_out,
+        np.asarray(cumulative_length_out, dtype="int64"),
+    )
+    return sig_out
+
+
+@numba.njit(**nb_kwargs)
+def _uleb128_zigzag_diff_encode_arrays(
+    sig_in: NDArray, cl_in: NDArray, sig_out: NDArray, cl_out: NDArray
+) -> int:
+    """Encode all arrays in `sig_in` contiguously into `sig_out`. Fills
+    `cl_out` with the cumulative length in bytes and returns the total number
+    of bytes written."""
+    start = 0
+    pos = 0
+    for i in range(len(cl_in)):
+        stop = cl_in[i]
+        last = 0
+        for j in range(start, stop):
+            diff = int(sig_in[j]) - last
+            last = int(sig_in[j])
+            # zig-zag: map signed to unsigned integers
+            zz = (diff << 1) ^ (diff >> 63)
+            # ULEB128: 7 bits per byte, most significant bit is continuation
+            while True:
+                byte = zz & 0x7F
+                zz >>= 7
+                if zz:
+                    sig_out[pos] = byte | 0x80
+                    pos += 1
+                else:
+                    sig_out[pos] = byte
+                    pos += 1
+                    break
+        cl_out[i] = pos
+        start = stop
+    return pos
+
+
+@numba.njit(**nb_kwargs)
+def _uleb128_zigzag_diff_decode_arrays(
+    sig_in: NDArray, cl_in: NDArray, sig_out: NDArray, cl_out: NDArray
+) -> None:
+    """Decode all arrays in `sig_in` into `sig_out`, according to the
+    cumulative lengths `cl_in` (bytes) and `cl_out` (samples)."""
+    start = 0
+    j = 0
+    for i in range(len(cl_in)):
+        stop = cl_in[i]
+        last = 0
+        pos = start
+        while pos < stop:
+            zz = 0
+            shift = 0
+            while True:
+                byte = int(sig_in[pos])
+                pos += 1
+                zz |= (byte & 0x7F) << shift
+                shift += 7
+                if not byte & 0x80:
+                    break
+            last += (zz >> 1) ^ -(zz & 1)
+            if j >= cl_out[i]:
+                raise ValueError("decoded array longer than expected")
+            sig_out[j] = last
+            j += 1
+        if j != cl_out[i]:
+            raise ValueError("decoded array length does not match the expected one")
+        start = stop
@@ -0,0 +1,178 @@
+"""Concatenation of array-like LGDOs."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+
+import numpy as np
+
+from pygama.lgdo.array import Array
+from pygama.lgdo.lgdo import LGDO
+from pygama.lgdo.lh5_store import LH5Store
+from pygama.lgdo.table import Table
+from pygama.lgdo.vectorofvectors import CumulativeLengthArray, VectorOfVectors
+from pygama.lgdo.vovutils import _nb_shift_cl
+from pygama.lgdo.waveform_table import WaveformTable
+
+log = logging.getLogger(__name__)
+
+
+def concat(
+    objs: Sequence[LGDO],
+    out: LGDO | None = None,
+    lh5_file: str | None = None,
+    name: str | None = None,
+    group: str = "/",
+    wo_mode: str = "append",
+) -> LGDO | None:
+    """Concatenate array-like LGDOs along the first axis.
+
+    Supports :class:`.Array` (and subclasses like
+    :class:`.ArrayOfEqualSizedArrays`), :class:`.VectorOfVectors` and
+    (nested) :class:`.Table`, including :class:`.WaveformTable`. All objects
+    must have the same structure as the first one.
+
+    The size of the output (and of the flattened data of vectors of vectors,
+    at all levels) is computed first, then memory is allocated once and
+    filled with the rows of each object. Cumulative lengths are shifted with
+    a :mod:`numba` kernel.
+
+    Examples
+    --------
+    >>> tbl = concat([tbl1, tbl2, tbl3])
+    >>> len(tbl) == len(tbl1) + len(tbl2) + len(tbl3)
+    True
+
+    Parameters
+    ----------
+    objs
+        the objects to be concatenated.
+    out
+        if not ``None``, an object with the same structure as the elements of
+        `objs` to be filled (and resized as needed) instead of allocating a
+        new one. Its internal buffers are reallocated only if their capacity
+        is not sufficient.
+    lh5_file
+        if not ``None``, the objects are instead written one after the other
+        to `name` in `lh5_file` (see :meth:`.LH5Store.write_object`) and
+        nothing is allocated in memory.
+    name
+        name of the output object in `lh5_file`.
+    group
+        group of the output object in `lh5_file`.
+    wo_mode
+        write mode for the first object (see :meth:`.LH5Store.write_object`),
+        the following ones are always appended.
+
+    Returns
+    -------
+    out
+        the concatenated object, or ``None`` if it was written to
+        `lh5_file`.
+    """
+    objs = list(objs)
+    if len(objs) == 0:
+        raise ValueError("nothing to concatenate")
+
+    if lh5_file is not None:
+        if name is None:
+            raise ValueError("name is required to write to lh5_file")
+        store = LH5Store()
+        for i, obj in enumerate(objs):
+            store.write_object(
+                obj,
+                name,
+                lh5_file,
+                group=group,
+                wo_mode=wo_mode if i == 0 else "append",
+            )
+        return None
+
+    return _concat(objs, [len(obj) for obj in objs], out)
+
+
+def _concat(objs: list[LGDO], lens: list[int], out: LGDO | None) -> LGDO:
+    """Concatenate the first ``lens[i]`` rows of each ``objs[i]``."""
+    ref = objs[0]
+    for obj in objs[1:]:
+        if type(obj) is not type(ref):
+            raise TypeError(
+                f"cannot concatenate {type(obj).__name__} to {type(ref).__name__}"
+            )
+    if out is not None and not isinstance(out, type(ref)):
+        raise TypeError(f"out must be a {type(ref).__name__}")
+
+    n_rows = sum(lens)
+
+    if isinstance(ref, Table):
+        cols = {}
+        for key in ref.keys():
+            if any(key not in obj for obj in objs):
+                raise ValueError(f"column '{key}' is missing in some of the tables")
+            cols[key] = _concat(
+                [obj[key] for obj in objs],
+                lens,
+                out[key] if out is not None else None,
+            )
+
+        if out is not None:
+            out.size = out.loc = n_rows
+            return out
+        if isinstance(ref, WaveformTable):
+            out = WaveformTable(
+                t0=cols["t0"],
+                dt=cols["dt"],
+                values=cols["values"],
+                attrs=ref.getattrs(),
+            )
+        else:
+            out = Table(size=n_rows, col_dict=cols, attrs=ref.getattrs())
+        out.loc = n_rows
+        return out
+
+    if isinstance(ref, VectorOfVectors):
+        cls = [obj.cumulative_length.nda for obj in objs]
+        fd_lens = [int(cl[n - 1]) if n > 0 else 0 for cl, n in zip(cls, lens)]
+
+        if out is None:
+            dtype = np.result_type(*cls)
+            out_cl = CumulativeLengthArray(
+                shape=(n_rows,), dtype=dtype, attrs=ref.cumulative_length.getattrs()
+            )
+        else:
+            out_cl = out.cumulative_length
+            out_cl.resize(n_rows)
+
+        start = offset = 0
+        for cl, n, fd_len in zip(cls, lens, fd_lens):
+            _nb_shift_cl(cl[:n], offset, out_cl.nda[start : start + n])
+            start += n
+            offset += fd_len
+
+        out_fd = _concat(
+            [obj.flattened_data for obj in objs],
+            fd_lens,
+            out.flattened_data if out is not None else None,
+        )
+        if out is None:
+            out = VectorOfVectors(
+                flattened_data=out_fd, cumulative_length=out_cl, attrs=ref.getattrs()
+            )
+        return out
+
+    if isinstance(ref, Array):
+        if out is None:
+            dtype = np.result_type(*[obj.nda for obj in objs])
+            nda = np.empty((n_rows,) + ref.nda.shape[1:], dtype=dtype)
+            out = type(ref)(nda=nda, attrs=ref.getattrs())
+        else:
+            out.resize(n_rows)
+
+        start = 0
+        for obj, n in zip(objs, lens):
+            out.nda[start : start + n] = obj.nda[:n]
+            start += n
+        return out
+
+    raise TypeError(f"cannot concatenate objects of type {type(ref).__name__}")
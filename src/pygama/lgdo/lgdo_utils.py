@@ -6,6 +6,7 @@ from __future__ import annotations
 import glob
 import logging
 import os
+from functools import lru_cache
 
 import numpy as np
 
@@ -59,6 +60,9 @@ def get_element_type(obj: object) -> str:
 def parse_datatype(datatype: str) -> tuple[str, tuple[int, ...], str | list[str]]:
     """Parse datatype string and return type, dimensions and elements.
 
+    Results are cached, since the same few datatype strings are parsed over
+    and over when reading LH5 files.
+
     Parameters
     ----------
     datatype
@@ -75,6 +79,15 @@ def parse_datatype(datatype: str) -> tuple[str, tuple[int, ...], str | list[str]
         numeric objects, the element type for struct-like  objects, the list of
         fields in the struct.
     """
+    datatype, dims, elements = _parse_datatype(datatype)
+    # return a fresh list of fields, callers might modify it
+    if isinstance(elements, tuple):
+        elements = list(elements)
+    return datatype, dims, elements
+
+
+@lru_cache(maxsize=1024)
+def _parse_datatype(datatype: str) -> tuple[str, tuple[int, ...], str | tuple[str]]:
     if "{" not in datatype:
         return "scalar", None, datatype
 
@@ -87,7 +100,7 @@ def parse_datatype(datatype: str) -> tuple[str, tuple[int, ...], str | list[str]
         dims = [int(i) for i in dims.split(",")]
         return datatype, tuple(dims), element_description
     else:
-        return datatype, None, element_description.split(",")
+        return datatype, None, tuple(element_description.split(","))
 
 
 def expand_path(path: str, list: bool = False) -> str | list:
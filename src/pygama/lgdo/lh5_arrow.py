@@ -0,0 +1,112 @@
+"""
+This module implements the export of LH5 tables to the Apache Arrow IPC and
+Parquet file formats (requires the :mod:`pyarrow` package).
+"""
+from __future__ import annotations
+
+import logging
+import os
+
+from pygama.lgdo.lh5_store import LH5Iterator
+
+log = logging.getLogger(__name__)
+
+
+def lh5_to_arrow(
+    lh5_files: str | list[str],
+    group: str,
+    out_file: str,
+    file_format: str | None = None,
+    field_mask: dict[str, bool] | list[str] | tuple[str] = None,
+    where: str | None = None,
+    buffer_len: int = 100_000,
+    prefetch: int = 1,
+    with_units: bool = True,
+) -> int:
+    """Stream LH5 table `group` to an Arrow IPC or Parquet file.
+
+    The table is read in blocks with :class:`.LH5Iterator`, each block is
+    viewed as a :class:`pyarrow.Table` without copying (see
+    :meth:`.Table.view_as`) and written out as a record batch (IPC) or row
+    group (Parquet). :class:`.VectorOfVectors` columns become list columns,
+    :class:`.ArrayOfEqualSizedArrays` columns fixed-size list columns and
+    nested tables struct columns.
+
+    Examples
+    --------
+    >>> lh5_to_arrow("hit/*.lh5", "geds/hit", "hit.parquet", where="energy > 25")
+
+    Parameters
+    ----------
+    lh5_files
+        the file(s) to read from. May include wildcards and environment
+        variables.
+    group
+        the table to be exported.
+    out_file
+        the output file.
+    file_format
+        ``parquet`` or ``ipc``. If ``None``, deduced from the extension of
+        `out_file` (``.parquet``/``.pq`` or ``.arrow``/``.feather``/``.ipc``).
+    field_mask, where, buffer_len, prefetch
+        forwarded to :class:`.LH5Iterator`.
+    with_units
+        store the units of the columns in the ``units`` field metadata.
+
+    Returns
+    -------
+    n_rows
+        the number of rows written.
+    """
+    # optional dependency
+    import pyarrow as pa
+
+    if file_format is None:
+        ext = os.path.splitext(out_file)[1].lower()
+        if ext in (".parquet", ".pq"):
+            file_format = "parquet"
+        elif ext in (".arrow", ".feather", ".ipc"):
+            file_format = "ipc"
+        else:
+            raise ValueError(f"cannot deduce the file format of {out_file}")
+    if file_format not in ("parquet", "ipc"):
+        raise ValueError(f"unknown file format '{file_format}'")
+
+    it = LH5Iterator(
+        lh5_files,
+        group,
+        field_mask=field_mask,
+        buffer_len=buffer_len,
+        prefetch=prefetch,
+        where=where,
+    )
+
+    def open_writer(schema: pa.Schema):
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(out_file, schema)
+        return pa.ipc.new_file(out_file, schema)
+
+    writer = None
+    n_rows_tot = 0
+    try:
+        for buf, _, n_rows in it:
+            table = buf.view_as("arrow", with_units=with_units)
+            if n_rows < len(table):
+                table = table.slice(0, n_rows)
+            if writer is None:
+                writer = open_writer(table.schema)
+            writer.write_table(table)
+            n_rows_tot += n_rows
+
+        if writer is None:
+            table = it.lh5_buffer.view_as("arrow", with_units=with_units)
+            writer = open_writer(table.schema)
+            writer.write_table(table.slice(0, 0))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    log.info(f"wrote {n_rows_tot} rows of {group} to {out_file}")
+    return n_rows_tot
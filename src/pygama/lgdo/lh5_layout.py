@@ -0,0 +1,293 @@
+"""
+This module implements a cache of the layout (object tree, datatypes, shapes,
+number of rows and attributes) of LH5 files, to avoid walking HDF5 metadata
+over and over again when dealing with large numbers of files.
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import h5py
+import numpy as np
+
+from pygama.lgdo.lgdo_utils import parse_datatype
+
+log = logging.getLogger(__name__)
+
+#: Name of the HDF5 dataset attribute holding the number of rows actually
+#: written to an over-allocated dataset (see :class:`.lh5_store.LH5Store`).
+LOGICAL_LENGTH_ATTR = "logical_length"
+
+
+class LH5Layout:
+    """Layout of an LH5 file.
+
+    Holds, for each HDF5 object in the file (keyed by its path, without
+    leading ``/``, the root group being ``""``), a dictionary with the
+    following keys:
+
+    - ``kind``: ``"group"`` or ``"dataset"``.
+    - ``attrs``: the HDF5 attributes (converted to Python types).
+    - ``keys``: (groups only) the names of the group members.
+    - ``shape``, ``dtype``: (datasets only) the dataset shape and type.
+    - ``n_rows``: (datasets only) the number of rows in the dataset,
+      honoring the :data:`LOGICAL_LENGTH_ATTR` attribute.
+    """
+
+    def __init__(self, objects: dict[str, dict[str, Any]]) -> None:
+        self.objects = objects
+
+    @classmethod
+    def from_file(cls, lh5_file: str | h5py.File) -> LH5Layout:
+        """Walk the HDF5 metadata of `lh5_file` and build its layout."""
+        if not isinstance(lh5_file, h5py.File):
+            with h5py.File(lh5_file, "r") as f:
+                return cls.from_file(f)
+
+        objects = {"": _object_info(lh5_file)}
+
+        def visit(name: str, obj: h5py.HLObject) -> None:
+            objects[name] = _object_info(obj)
+
+        lh5_file.visititems(visit)
+        return cls(objects)
+
+    def __contains__(self, name: str) -> bool:
+        return name.strip("/") in self.objects
+
+    def __getitem__(self, name: str) -> dict[str, Any]:
+        return self.objects[name.strip("/")]
+
+    def datatype(self, name: str) -> str:
+        """Return the LGDO datatype of object `name`."""
+        info = self[name]
+        if "datatype" not in info["attrs"]:
+            raise RuntimeError(f"'{name}' is missing the datatype attribute")
+        return info["attrs"]["datatype"]
+
+    def n_rows(self, name: str) -> int | None:
+        """Look up the number of rows in an Array-like object called `name`.
+
+        See Also
+        --------
+        .lh5_store.LH5Store.read_n_rows
+        """
+        name = name.strip("/")
+        if name not in self.objects:
+            raise KeyError(f"'{name}' not in layout")
+
+        datatype, shape, elements = parse_datatype(self.datatype(name))
+
+        # scalars and structs don't have rows
+        if datatype == "scalar" or datatype == "struct":
+            return None
+
+        # tables should have elements with all the same length
+        if datatype == "table":
+            rows_read = None
+            for field in elements:
+                n_rows_read = self.n_rows(f"{name}/{field}")
+                if not rows_read:
+                    rows_read = n_rows_read
+                elif rows_read != n_rows_read:
+                    log.warning(
+                        f"table '{name}' got strange n_rows_read = {rows_read}, "
+                        f"{n_rows_read} was expected"
+                    )
+            return rows_read
+
+        # length of encoded arrays is the length of the encoded data
+        if datatype == "array_of_encoded_equalsized_arrays" or elements.startswith(
+            "encoded_array"
+        ):
+            return self.n_rows(f"{name}/encoded_data")
+
+        # length of vector of vectors is the length of its cumulative_length
+        if elements.startswith("array"):
+            return self.n_rows(f"{name}/cumulative_length")
+
+        if "array" in datatype:
+            return self.objects[name]["n_rows"]
+
+        raise RuntimeError(f"don't know how to read datatype '{datatype}'")
+
+    def ls(self, lh5_group: str = "") -> list[str]:
+        """Return a list of objects in the file and group, supporting
+        wildcards.
+
+        See Also
+        --------
+        .lh5_store.ls
+        """
+        lh5_group = lh5_group.lstrip("/")
+        if lh5_group == "":
+            lh5_group = "*"
+        return self._ls("", lh5_group)
+
+    def _ls(self, base: str, lh5_group: str) -> list[str]:
+        splitpath = lh5_group.split("/", 1)
+        matchingkeys = fnmatch.filter(self.objects[base].get("keys", []), splitpath[0])
+
+        if len(splitpath) == 1:
+            return matchingkeys
+
+        ret = []
+        for key in matchingkeys:
+            path = key if base == "" else f"{base}/{key}"
+            if self.objects[path]["kind"] != "group":
+                continue
+            ret.extend([f"{key}/{p}" for p in self._ls(path, splitpath[1] or "*")])
+        return ret
+
+
+class LH5LayoutCache:
+    """An LRU cache of :class:`LH5Layout`\\ s.
+
+    Entries are keyed by file path, modification time and size, such that a
+    modified file is scanned again. The cache can be optionally persisted to
+    a JSON sidecar index file, to be shared among processes and sessions. It
+    can be used from several threads.
+
+    Examples
+    --------
+    >>> from pygama.lgdo.lh5_layout import LH5LayoutCache
+    >>> cache = LH5LayoutCache(index_file="layouts.json")
+    >>> cache.get("file.lh5").n_rows("geds/raw")
+    >>> cache.save()
+    """
+
+    def __init__(self, maxsize: int = 1024, index_file: str = None) -> None:
+        """
+        Parameters
+        ----------
+        maxsize
+            maximum number of file layouts kept in memory.
+        index_file
+            path to a JSON sidecar index file from which layouts are loaded
+            (if existing) and to which they are written by :meth:`save`.
+        """
+        self.maxsize = maxsize
+        self.index_file = index_file
+        self._layouts = OrderedDict()
+        self._index = None
+        # guards _layouts and _index
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+    def __contains__(self, lh5_file: str) -> bool:
+        return os.path.abspath(lh5_file) in self._layouts
+
+    def get(self, lh5_file: str) -> LH5Layout:
+        """Return the layout of `lh5_file`, scanning the file if needed."""
+        path = os.path.abspath(lh5_file)
+        stat = os.stat(path)
+        key = [stat.st_mtime_ns, stat.st_size]
+
+        with self._lock:
+            if path in self._layouts:
+                entry_key, layout = self._layouts[path]
+                if entry_key == key:
+                    self._layouts.move_to_end(path)
+                    return layout
+            index = self._load_index()
+            entry = index.get(path)
+
+        # the file is scanned without holding the lock
+        if entry is not None and entry["key"] == key:
+            layout = LH5Layout(entry["objects"])
+        else:
+            log.debug(f"scanning layout of {path}")
+            layout = LH5Layout.from_file(path)
+
+        with self._lock:
+            self._layouts[path] = (key, layout)
+            self._layouts.move_to_end(path)
+            while len(self._layouts) > self.maxsize:
+                self._layouts.popitem(last=False)
+
+        return layout
+
+    def invalidate(self, lh5_file: str = None) -> None:
+        """Drop `lh5_file` (or all files, if ``None``) from the in-memory
+        cache."""
+        with self._lock:
+            if lh5_file is None:
+                self._layouts.clear()
+            else:
+                self._layouts.pop(os.path.abspath(lh5_file), None)
+
+    def save(self, index_file: str = None) -> None:
+        """Write the cached layouts to the sidecar index file.
+
+        Entries already in the index file and not in memory are preserved.
+        """
+        index_file = self.index_file if index_file is None else index_file
+        if index_file is None:
+            raise ValueError("no index file specified")
+
+        with self._lock:
+            index = dict(self._load_index(index_file))
+            for path, (key, layout) in self._layouts.items():
+                index[path] = {"key": key, "objects": layout.objects}
+
+        tmp_file = f"{index_file}.tmp{os.getpid()}"
+        with open(tmp_file, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_file, index_file)
+
+        if index_file == self.index_file:
+            with self._lock:
+                self._index = index
+
+    def _load_index(self, index_file: str = None) -> dict[str, Any]:
+        if index_file is None or index_file == self.index_file:
+            if self._index is None:
+                self._index = _read_index(self.index_file)
+            return self._index
+        return _read_index(index_file)
+
+
+def _read_index(index_file: str | None) -> dict[str, Any]:
+    if index_file is None or not os.path.exists(index_file):
+        return {}
+    with open(index_file) as f:
+        return json.load(f)
+
+
+def _object_info(obj: h5py.HLObject) -> dict[str, Any]:
+    info = {"attrs": {k: _to_builtin(v) for k, v in obj.attrs.items()}}
+    if isinstance(obj, h5py.Dataset):
+        info["kind"] = "dataset"
+        info["shape"] = list(obj.shape)
+        info["dtype"] = str(obj.dtype)
+        if LOGICAL_LENGTH_ATTR in obj.attrs:
+            info["n_rows"] = int(obj.attrs[LOGICAL_LENGTH_ATTR])
+        else:
+            info["n_rows"] = obj.shape[0] if len(obj.shape) > 0 else None
+    else:
+        info["kind"] = "group"
+        info["keys"] = list(obj.keys())
+    return info
+
+
+def _to_builtin(value: Any) -> Any:
+    """Convert HDF5 attribute values to JSON-serializable Python types."""
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, np.ndarray):
+        return [_to_builtin(v) for v in value.tolist()]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+#: Layout cache shared by default by all :class:`.lh5_store.LH5Store`\ s.
+default_cache = LH5LayoutCache()
@@ -8,30 +8,70 @@ import fnmatch
 import glob
 import logging
 import os
+import queue
 import sys
-from bisect import bisect_left, bisect_right
-from collections import defaultdict
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from typing import Any, Union
 
 import h5py
-import numba as nb
 import numpy as np
 import pandas as pd
 
+from pygama.lgdo import compression
 from pygama.lgdo.array import Array
 from pygama.lgdo.arrayofequalsizedarrays import ArrayOfEqualSizedArrays
+from pygama.lgdo.encoded import ArrayOfEncodedEqualSizedArrays, VectorOfEncodedVectors
 from pygama.lgdo.fixedsizearray import FixedSizeArray
 from pygama.lgdo.lgdo_utils import expand_path, parse_datatype
+from pygama.lgdo.lh5_layout import LOGICAL_LENGTH_ATTR, LH5LayoutCache, default_cache
+from pygama.lgdo.lh5_zonemap import (
+    ZONE_MAP_SUFFIX,
+    has_zone_map,
+    read_time_index,
+    read_zone_map,
+    remove_zone_map,
+    rows_may_match,
+    time_index_files,
+    update_zone_map,
+)
 from pygama.lgdo.scalar import Scalar
 from pygama.lgdo.struct import Struct
-from pygama.lgdo.table import Table
-from pygama.lgdo.vectorofvectors import VectorOfVectors
+from pygama.lgdo.table import LazyTable, Table
+from pygama.lgdo.vectorofvectors import CumulativeLengthArray, VectorOfVectors
+from pygama.lgdo.vovutils import copy_segments, merge_segments
 from pygama.lgdo.waveform_table import WaveformTable
 
 LGDO = Union[Array, Scalar, Struct, VectorOfVectors]
 
 log = logging.getLogger(__name__)
 
+#: Approximate size (in bytes) of the blocks in which contiguous datasets are
+#: split when reading sparse row selections (see :meth:`LH5Store.read_object`).
+SPARSE_READ_BLOCK_SIZE = 2**16
+#: Maximum number of contiguous runs of rows read with one HDF5 call when
+#: reading sparse row selections.
+SPARSE_READ_MAX_RUNS = 256
+#: Fraction of the range of a sparse row selection above which, once the
+#: selection is coalesced into runs, the whole range is read at once.
+SPARSE_READ_MAX_DENSITY = 0.5
+
+#: Dataset storage options of :meth:`h5py.Group.create_dataset` that can be
+#: set through the `hdf5_settings` argument of :meth:`LH5Store.write_object`
+#: or the ``hdf5_settings`` attribute of an LGDO.
+HDF5_SETTINGS_KEYS = (
+    "chunks",
+    "compression",
+    "compression_opts",
+    "shuffle",
+    "fletcher32",
+    "scaleoffset",
+)
+
 
 class LH5Store:
     """
@@ -47,7 +87,14 @@ class LH5Store:
     pygama.lgdo.waveform_table.WaveformTable
     """
 
-    def __init__(self, base_path: str = "", keep_open: bool = False) -> None:
+    def __init__(
+        self,
+        base_path: str = "",
+        keep_open: bool = False,
+        growth_factor: float = None,
+        layout_cache: LH5LayoutCache | None = default_cache,
+        max_open_files: int = None,
+    ) -> None:
         """
         Parameters
         ----------
@@ -56,14 +103,57 @@ class LH5Store:
         keep_open
             whether to keep files open by storing the :mod:`h5py` objects as
             class attributes.
+        growth_factor
+            if not ``None``, datasets appended to with :meth:`write_object`
+            (``wo_mode="append"``) are over-allocated by this factor whenever
+            they need to grow, instead of being resized at every call. This
+            amortizes the cost of HDF5 extent changes when appending many
+            small chunks. The number of rows actually written is tracked in
+            the :data:`LOGICAL_LENGTH_ATTR` dataset attribute, which is
+            honored by :meth:`read_object` and :meth:`read_n_rows`. Call
+            :meth:`finalize` or :meth:`close` after the last write to trim the
+            datasets to their logical length. Files closed by the store are
+            trimmed too.
+        layout_cache
+            cache of LH5 file layouts consulted by :meth:`read_n_rows` for
+            files not opened for writing by this store. Defaults to the cache
+            shared by all stores, set to ``None`` to always read metadata from
+            disk.
+        max_open_files
+            if `keep_open` is ``True``, maximum number of files kept open. When
+            the limit is reached, the least recently used file is flushed and
+            closed (and transparently reopened if needed later). Handles
+            returned by :meth:`gimme_file` should therefore not be held on to
+            while opening other files. ``None`` means no limit.
         """
+        if growth_factor is not None and growth_factor <= 1:
+            raise ValueError(f"growth_factor must be > 1, got {growth_factor}")
+        if max_open_files is not None and max_open_files < 1:
+            raise ValueError(f"max_open_files must be >= 1, got {max_open_files}")
+
         self.base_path = "" if base_path == "" else expand_path(base_path)
         self.keep_open = keep_open
-        self.files = {}
+        self.growth_factor = growth_factor
+        self.layout_cache = layout_cache
+        self.max_open_files = max_open_files
+        # open files, from least to most recently used
+        self.files = OrderedDict()
+        # number of ongoing reads using each file, these are never evicted
+        self._files_in_use = defaultdict(int)
+        self._files_lock = threading.RLock()
+        # files containing over-allocated datasets, to be finalized
+        self._overallocated_files = set()
+        # buffers for the encoded data read by each thread, by object name
+        self._encoded_bufs = threading.local()
 
     def gimme_file(self, lh5_file: str | h5py.File, mode: str = "r") -> h5py.File:
         """Returns a :mod:`h5py` file object from the store or creates a new one.
 
+        If `keep_open` is set, a file already open in read-only mode is
+        reopened if requested in a writing mode, and the least recently used
+        file is closed if more than `max_open_files` are open (see
+        :class:`LH5Store`). This method is thread-safe.
+
         Parameters
         ----------
         lh5_file
@@ -73,27 +163,93 @@ class LH5Store:
         """
         if isinstance(lh5_file, h5py.File):
             return lh5_file
-        if mode == "r":
-            lh5_file = expand_path(lh5_file)
-        if lh5_file in self.files.keys():
-            return self.files[lh5_file]
-        if self.base_path != "":
-            full_path = os.path.join(self.base_path, lh5_file)
-        else:
-            full_path = lh5_file
-        if mode != "r":
-            directory = os.path.dirname(full_path)
-            if directory != "" and not os.path.exists(directory):
-                log.debug(f"making path {directory}")
-                os.makedirs(directory)
-        if mode == "r" and not os.path.exists(full_path):
-            raise FileNotFoundError(f"file {full_path} not found")
-        if mode != "r" and os.path.exists(full_path):
-            log.debug(f"opening existing file {full_path} in mode '{mode}'")
-        h5f = h5py.File(full_path, mode)
-        if self.keep_open:
-            self.files[lh5_file] = h5f
-        return h5f
+
+        with self._files_lock:
+            if mode == "r":
+                lh5_file = expand_path(lh5_file)
+            elif lh5_file not in self.files:
+                # the file might be already open for reading
+                paths = expand_path(lh5_file, list=True)
+                if len(paths) == 1 and paths[0] in self.files:
+                    lh5_file = paths[0]
+
+            if lh5_file in self.files:
+                h5f = self.files[lh5_file]
+                if h5f and (mode == "r" or h5f.mode != "r"):
+                    self.files.move_to_end(lh5_file)
+                    return h5f
+                # the file was closed or is needed for writing now
+                if self._files_in_use[lh5_file] > 0:
+                    raise RuntimeError(
+                        f"cannot reopen {lh5_file} in mode '{mode}', it is in use"
+                    )
+                self._close_file(lh5_file)
+
+            if self.base_path != "":
+                full_path = os.path.join(self.base_path, lh5_file)
+            else:
+                full_path = lh5_file
+            if mode != "r":
+                directory = os.path.dirname(full_path)
+                if directory != "" and not os.path.exists(directory):
+                    log.debug(f"making path {directory}")
+                    os.makedirs(directory)
+            if mode == "r" and not os.path.exists(full_path):
+                raise FileNotFoundError(f"file {full_path} not found")
+            if mode != "r" and os.path.exists(full_path):
+                log.debug(f"opening existing file {full_path} in mode '{mode}'")
+
+            if self.keep_open and self.max_open_files is not None:
+                # make room for the new file
+                for key in list(self.files.keys()):
+                    if len(self.files) < self.max_open_files:
+                        break
+                    if self._files_in_use[key] == 0:
+                        self._close_file(key)
+
+            h5f = h5py.File(full_path, mode)
+            if self.keep_open:
+                self.files[lh5_file] = h5f
+            return h5f
+
+    def _close_file(self, key: str) -> None:
+        """Trim (see :meth:`finalize`), flush, close and forget the file
+        stored under `key`."""
+        h5f = self.files.pop(key)
+        self._files_in_use.pop(key, None)
+        if h5f:
+            log.debug(f"closing {h5f.filename}")
+            if h5f.mode != "r":
+                if os.path.abspath(h5f.filename) in self._overallocated_files:
+                    self._trim_file(h5f)
+                h5f.flush()
+            h5f.close()
+
+    def close(self) -> None:
+        """Trim the over-allocated datasets of all the files written to (see
+        :meth:`finalize`) and close the files kept open. The store can still
+        be used afterwards."""
+        with self._files_lock:
+            self.finalize()
+            for key in list(self.files.keys()):
+                self._close_file(key)
+
+    @contextmanager
+    def _use_file(self, lh5_file: str | h5py.File, mode: str = "r") -> h5py.File:
+        """Get a file with :meth:`gimme_file` and prevent it from being closed
+        by other threads while in the context."""
+        with self._files_lock:
+            h5f = self.gimme_file(lh5_file, mode)
+            key = next((k for k, f in self.files.items() if f is h5f), None)
+            if key is not None:
+                self._files_in_use[key] += 1
+        try:
+            yield h5f
+        finally:
+            if key is not None:
+                with self._files_lock:
+                    if key in self._files_in_use:
+                        self._files_in_use[key] -= 1
 
     def gimme_group(
         self,
@@ -165,6 +321,10 @@ class LH5Store:
         field_mask: dict[str, bool] | list[str] | tuple[str] = None,
         obj_buf: LGDO = None,
         obj_buf_start: int = 0,
+        decompress: bool = True,
+        n_threads: int = 1,
+        memmap: bool = False,
+        lazy: bool = False,
     ) -> tuple[LGDO, int]:
         """Read LH5 object data from a file.
 
@@ -229,6 +389,34 @@ class LH5Store:
         obj_buf_start
             Start location in ``obj_buf`` for read. For concatenating data to
             array-like objects.
+        decompress
+            Decode encoded waveform data (see :mod:`.lgdo.compression`) on the
+            fly. If ``False``, :class:`.ArrayOfEncodedEqualSizedArrays` and
+            :class:`.VectorOfEncodedVectors` objects are returned as they are
+            stored on disk.
+        n_threads
+            number of threads used to read array-like objects from a list of
+            files. If larger than one, the number of rows to be read from
+            each file is determined first (see :meth:`read_n_rows`), the
+            output buffer is allocated once and the files are read
+            concurrently into disjoint slices of it. Note that :mod:`h5py`
+            serializes calls to the HDF5 library, the gain comes from
+            overlapping decoding, indexing and copies with I/O.
+        memmap
+            if ``True`` and `obj_buf` is ``None``, arrays stored in contiguous,
+            unfiltered datasets are memory-mapped instead of being read: the
+            returned arrays (:class:`.Array` or :class:`.ArrayOfEqualSizedArrays`)
+            hold read-only :class:`numpy.memmap` objects and only the pages actually
+            accessed are read from disk. With `idx`, only the selected rows
+            are copied out of the map. Other datasets (chunked, compressed,
+            etc.) and lists of more than one file are read as usual. Note that
+            the maps become invalid if the file is modified.
+        lazy
+            if ``True`` and `obj_buf` is ``None``, tables are returned as
+            :class:`.LazyTable` objects: only the number of rows to be read is
+            determined, each column is read (with the same `start_row`,
+            `n_rows`, `idx`, etc.) the first time it is accessed. Nested
+            tables are lazy too, waveform tables are read as a whole.
 
         Returns
         -------
@@ -239,17 +427,42 @@ class LH5Store:
             `n_rows_read` will be``1``. For tables it is redundant with
             ``table.loc``.
         """
+        if lazy and obj_buf is None:
+            lazy_tbl = self._read_table_lazy(
+                name,
+                lh5_file,
+                start_row=start_row,
+                n_rows=n_rows,
+                idx=idx,
+                use_h5idx=use_h5idx,
+                field_mask=field_mask,
+                decompress=decompress,
+                n_threads=n_threads,
+                memmap=memmap,
+            )
+            if lazy_tbl is not None:
+                return lazy_tbl, lazy_tbl.size
+
         # Handle list-of-files recursively
         if not isinstance(lh5_file, (str, h5py._hl.files.File)):
             lh5_file = list(lh5_file)
             n_rows_read = 0
 
-            # to know whether we are reading in a list of files.
-            # this is part of the fix for reading data by idx
-            # (see https://github.com/legend-exp/legend-pydataobj/issues/29)
-            # so that we only make a copy of the data if absolutely necessary
-            # or if we can read the data from file without having to make a copy
-            self.in_file_loop = True
+            if n_threads > 1 and len(lh5_file) > 1 and decompress:
+                # only array-like objects have rows to be distributed
+                if self.read_n_rows(name, lh5_file[0]) is not None:
+                    return self._read_files_parallel(
+                        name,
+                        lh5_file,
+                        start_row=start_row,
+                        n_rows=n_rows,
+                        idx=idx,
+                        use_h5idx=use_h5idx,
+                        field_mask=field_mask,
+                        obj_buf=obj_buf,
+                        obj_buf_start=obj_buf_start,
+                        n_threads=n_threads,
+                    )
 
             for i, h5f in enumerate(lh5_file):
                 if isinstance(idx, list) and len(idx) > 0 and not np.isscalar(idx[0]):
@@ -271,10 +484,6 @@ class LH5Store:
                     idx_i = None
                 n_rows_i = n_rows - n_rows_read
 
-                # maybe someone passed in a list of len==1?
-                if i == (len(lh5_file) - 1):
-                    self.in_file_loop = False
-
                 obj_buf, n_rows_read_i = self.read_object(
                     name,
                     lh5_file[i],
@@ -285,6 +494,8 @@ class LH5Store:
                     field_mask=field_mask,
                     obj_buf=obj_buf,
                     obj_buf_start=obj_buf_start,
+                    decompress=decompress,
+                    memmap=memmap and len(lh5_file) == 1,
                 )
 
                 n_rows_read += n_rows_read_i
@@ -293,8 +504,6 @@ class LH5Store:
                 start_row = 0
                 obj_buf_start += n_rows_read_i
 
-                self.in_file_loop = False
-
             return obj_buf, n_rows_read
 
         # start read from single file. fail if the object is not found
@@ -324,19 +533,7 @@ class LH5Store:
 
         # check field_mask and make it a default dict
         if datatype == "struct" or datatype == "table":
-            if field_mask is None:
-                field_mask = defaultdict(lambda: True)
-            elif isinstance(field_mask, dict):
-                default = True
-                if len(field_mask) > 0:
-                    default = not field_mask[list(field_mask.keys())[0]]
-                field_mask = defaultdict(lambda: default, field_mask)
-            elif isinstance(field_mask, (list, tuple)):
-                field_mask = defaultdict(
-                    lambda: False, {field: True for field in field_mask}
-                )
-            elif not isinstance(field_mask, defaultdict):
-                raise RuntimeError("bad field_mask of type", type(field_mask).__name__)
+            field_mask = _make_field_mask(field_mask)
         elif field_mask is not None:
             raise RuntimeError(f"datatype {datatype} does not accept a field_mask")
 
@@ -345,7 +542,7 @@ class LH5Store:
         if datatype == "scalar":
             value = h5f[name][()]
             if elements == "bool":
-                value = np.bool(value)
+                value = np.bool_(value)
             if obj_buf is not None:
                 obj_buf.value = value
                 obj_buf.attrs.update(h5f[name].attrs)
@@ -374,7 +571,13 @@ class LH5Store:
                 # table... Maybe should emit a warning? Or allow them to be
                 # dicts keyed by field name?
                 obj_dict[field], _ = self.read_object(
-                    name + "/" + field, h5f, start_row=start_row, n_rows=n_rows, idx=idx
+                    name + "/" + field,
+                    h5f,
+                    start_row=start_row,
+                    n_rows=n_rows,
+                    idx=idx,
+                    decompress=decompress,
+                    memmap=memmap,
                 )
             # modify datatype in attrs if a field_mask was used
             attrs = dict(h5f[name].attrs)
@@ -421,6 +624,8 @@ class LH5Store:
                     use_h5idx=use_h5idx,
                     obj_buf=fld_buf,
                     obj_buf_start=obj_buf_start,
+                    decompress=decompress,
+                    memmap=memmap,
                 )
                 if obj_buf is not None and obj_buf_start + n_rows_read > len(obj_buf):
                     obj_buf.resize(obj_buf_start + n_rows_read)
@@ -480,70 +685,163 @@ class LH5Store:
                     )
                 return obj_buf, n_rows_read
 
-        # VectorOfVectors
-        # read out vector of vectors of different size
-        if elements.startswith("array"):
-            if obj_buf is not None and not isinstance(obj_buf, VectorOfVectors):
-                raise ValueError(f"obj_buf for '{name}' not a LGDO VectorOfVectors")
+        # ArrayOfEncodedEqualSizedArrays and VectorOfEncodedVectors
+        if datatype == "array_of_encoded_equalsized_arrays" or elements.startswith(
+            "encoded_array"
+        ):
+            is_aoeesa = datatype == "array_of_encoded_equalsized_arrays"
+            encoded_type = (
+                ArrayOfEncodedEqualSizedArrays if is_aoeesa else VectorOfEncodedVectors
+            )
+
+            # if not decompressing, read directly into the encoded buffer
+            enc_buf = None
+            if not decompress and obj_buf is not None:
+                if not isinstance(obj_buf, encoded_type):
+                    raise ValueError(
+                        f"obj_buf for '{name}' not a LGDO {encoded_type.__name__}"
+                    )
+                enc_buf = obj_buf
 
-            # read out cumulative_length
-            cumulen_buf = None if obj_buf is None else obj_buf.cumulative_length
-            cumulative_length, n_rows_read = self.read_object(
-                f"{name}/cumulative_length",
+            # when decoding into a buffer, the encoded data is only needed
+            # until it is decoded: reuse a buffer of this thread
+            ed_buf = None if enc_buf is None else enc_buf.encoded_data
+            ed_bufs = self._encoded_bufs.__dict__
+            if decompress and obj_buf is not None:
+                ed_buf = ed_bufs.get(name)
+
+            encoded_data, n_rows_read = self.read_object(
+                f"{name}/encoded_data",
                 h5f,
                 start_row=start_row,
                 n_rows=n_rows,
                 idx=idx,
                 use_h5idx=use_h5idx,
-                obj_buf=cumulen_buf,
-                obj_buf_start=obj_buf_start,
+                obj_buf=ed_buf,
+                obj_buf_start=0 if enc_buf is None else obj_buf_start,
             )
-            # get a view of just what was read out for cleaner code below
-            this_cumulen_nda = cumulative_length.nda[
-                obj_buf_start : obj_buf_start + n_rows_read
-            ]
+            if decompress and obj_buf is not None:
+                encoded_data.resize(n_rows_read)
+                ed_bufs[name] = encoded_data
 
-            if idx is not None and n_rows_read > 0:
-                # get the starting indices for each array in flattended data:
-                # the starting index for array[i] is cumulative_length[i-1]
-                idx2 = (np.asarray(idx[0]).copy() - 1,)
-                # re-read cumulative_length with these indices
-                # note this will allocate memory for fd_starts!
-                fd_start = None
-                if idx2[0][0] == -1:
-                    idx2 = (idx2[0][1:],)
-                    fd_start = 0  # this variable avoids an ndarray append
-                fd_starts, fds_n_rows_read = self.read_object(
-                    f"{name}/cumulative_length",
+            # the decoded size is a scalar for arrays of equal-sized arrays
+            if is_aoeesa:
+                decoded_size, _ = self.read_object(f"{name}/decoded_size", h5f)
+            else:
+                decoded_size, _ = self.read_object(
+                    f"{name}/decoded_size",
                     h5f,
                     start_row=start_row,
                     n_rows=n_rows,
-                    idx=idx2,
+                    idx=idx,
                     use_h5idx=use_h5idx,
+                    obj_buf=None if enc_buf is None else enc_buf.decoded_size,
+                    obj_buf_start=0 if enc_buf is None else obj_buf_start,
                 )
-                fd_starts = fd_starts.nda  # we just need the nda
-                if fd_start is None:
-                    fd_start = fd_starts[0]
 
-                # compute the length that flattened_data will have after the
-                # fancy-indexed read
-                fd_n_rows = np.sum(this_cumulen_nda[-len(fd_starts) :] - fd_starts)
-                if fd_start == 0:
-                    fd_n_rows += this_cumulen_nda[0]
+            if enc_buf is not None:
+                if is_aoeesa:
+                    enc_buf.decoded_size = decoded_size
+                return enc_buf, n_rows_read
 
-                # now make fd_idx
-                fd_idx = np.empty(fd_n_rows, dtype="uint32")
-                fd_idx = _make_fd_idx(fd_starts, this_cumulen_nda, fd_idx)
+            encoded = encoded_type(
+                encoded_data=encoded_data,
+                decoded_size=decoded_size,
+                attrs=dict(h5f[name].attrs),
+            )
 
-                # Now clean up this_cumulen_nda, to be ready
-                # to match the in-memory version of flattened_data. Note: these
-                # operations on the view change the original array because they are
-                # numpy arrays, not lists.
-                this_cumulen_nda[-len(fd_starts) :] -= fd_starts
-                np.cumsum(this_cumulen_nda, out=this_cumulen_nda)
+            if not decompress:
+                return encoded, n_rows_read
+
+            if obj_buf is None:
+                return compression.decode(encoded), n_rows_read
 
+            # decode straight into the object buffer, from obj_buf_start on
+            decoded_type = ArrayOfEqualSizedArrays if is_aoeesa else VectorOfVectors
+            if not isinstance(obj_buf, decoded_type):
+                raise ValueError(
+                    f"obj_buf for '{name}' not a LGDO {decoded_type.__name__}"
+                )
+            compression.decode(encoded, obj_buf, out_start=obj_buf_start)
+            return obj_buf, n_rows_read
+
+        # VectorOfVectors
+        # read out vector of vectors of different size
+        if elements.startswith("array"):
+            if obj_buf is not None and not isinstance(obj_buf, VectorOfVectors):
+                raise ValueError(f"obj_buf for '{name}' not a LGDO VectorOfVectors")
+
+            # read out cumulative_length. Without a buffer, read it straight
+            # into a CumulativeLengthArray, such that the returned vector can
+            # be viewed as an Awkward array without copy
+            cl_ds = h5f[f"{name}/cumulative_length"]
+            if obj_buf is None:
+                cl_attrs = dict(cl_ds.attrs)
+                cl_attrs.pop(LOGICAL_LENGTH_ATTR, None)
+                cl_settings = _get_hdf5_settings(cl_ds)
+                if cl_settings:
+                    cl_attrs["hdf5_settings"] = cl_settings
+                cumulen_buf = CumulativeLengthArray(
+                    shape=(0,), dtype=cl_ds.dtype, attrs=cl_attrs
+                )
             else:
-                fd_idx = None
+                cumulen_buf = obj_buf.cumulative_length
+
+            fd_segments = None
+            if idx is not None:
+                # the vectors to be read are the segments
+                # [cumulative_length[i-1], cumulative_length[i]) of
+                # flattened_data: read the cumulative lengths of the selected
+                # rows and of the preceding ones at once
+                rows = np.asarray(idx[0], dtype="int64")
+                ds_n_rows = _get_dataset_n_rows(cl_ds)
+                if len(rows) > 0 and rows[-1] >= ds_n_rows:
+                    log.warning(
+                        "idx indexed past the end of the array in the file. Culling..."
+                    )
+                    rows = rows[: bisect_left(rows, ds_n_rows)]
+                rows = rows[:n_rows]
+                n_rows_read = len(rows)
+
+                cl_rows = np.union1d(rows[rows > 0] - 1, rows)
+                cl_vals = _read_rows(cl_ds, cl_rows).astype("int64")
+                seg_stops = cl_vals[np.searchsorted(cl_rows, rows)]
+                seg_starts = np.zeros(n_rows_read, dtype="int64")
+                seg_starts[rows > 0] = cl_vals[
+                    np.searchsorted(cl_rows, rows[rows > 0] - 1)
+                ]
+                if np.any(seg_stops < seg_starts):
+                    raise RuntimeError(
+                        f"cumulative_length of '{name}' non-increasing at the "
+                        "requested entries ??"
+                    )
+
+                buf_size = obj_buf_start + n_rows_read
+                if len(cumulen_buf) < buf_size:
+                    cumulen_buf.resize(buf_size)
+                cumulative_length = cumulen_buf
+                this_cumulen_nda = cumulative_length.nda[obj_buf_start:buf_size]
+                this_cumulen_nda[:] = np.cumsum(seg_stops - seg_starts)
+
+                # vectors that follow each other in the file are read at once
+                fd_segments = merge_segments(seg_starts, seg_stops)
+                fd_start = 0
+                fd_n_rows = int(this_cumulen_nda[-1]) if n_rows_read > 0 else 0
+
+            else:
+                cumulative_length, n_rows_read = self.read_object(
+                    f"{name}/cumulative_length",
+                    h5f,
+                    start_row=start_row,
+                    n_rows=n_rows,
+                    use_h5idx=use_h5idx,
+                    obj_buf=cumulen_buf,
+                    obj_buf_start=obj_buf_start,
+                )
+                # get a view of just what was read out for cleaner code below
+                this_cumulen_nda = cumulative_length.nda[
+                    obj_buf_start : obj_buf_start + n_rows_read
+                ]
 
                 # determine the start_row and n_rows for the flattened_data readout
                 fd_start = 0
@@ -551,7 +849,7 @@ class LH5Store:
                     # need to read out the cumulen sample -before- the first sample
                     # read above in order to get the starting row of the first
                     # vector to read out in flattened_data
-                    fd_start = h5f[f"{name}/cumulative_length"][start_row - 1]
+                    fd_start = cl_ds[start_row - 1]
 
                     # check limits for values that will be used subsequently
                     if this_cumulen_nda[-1] < fd_start:
@@ -596,16 +894,46 @@ class LH5Store:
                     fd_buf.resize(fdb_size)
 
             # now read
-            flattened_data, dummy_rows_read = self.read_object(
-                f"{name}/flattened_data",
-                h5f,
-                start_row=fd_start,
-                n_rows=fd_n_rows,
-                idx=fd_idx,
-                use_h5idx=use_h5idx,
-                obj_buf=fd_buf,
-                obj_buf_start=fd_buf_start,
-            )
+            fd_ds = h5f[f"{name}/flattened_data"]
+            if fd_segments is not None and isinstance(fd_ds, h5py.Dataset):
+                # copy the segments straight into the buffer
+                if fd_buf is None:
+                    fd_attrs = dict(fd_ds.attrs)
+                    fd_attrs.pop(LOGICAL_LENGTH_ATTR, None)
+                    fd_settings = _get_hdf5_settings(fd_ds)
+                    if fd_settings:
+                        fd_attrs["hdf5_settings"] = fd_settings
+                    fd_elements = parse_datatype(fd_attrs["datatype"])[2]
+                    fd_buf = Array(
+                        shape=(fd_n_rows,),
+                        dtype=bool if fd_elements == "bool" else fd_ds.dtype,
+                        attrs=fd_attrs,
+                    )
+                fd_nda = fd_buf.nda[fd_buf_start : fd_buf_start + fd_n_rows]
+                # bools are stored as uint8
+                if fd_nda.dtype == bool:
+                    fd_nda = fd_nda.view("uint8")
+                _read_segments(fd_ds, *fd_segments, fd_nda)
+                flattened_data = fd_buf
+            else:
+                fd_idx = None
+                if fd_segments is not None:
+                    # nested vectors: index the rows of the segments
+                    seg_lengths = fd_segments[1] - fd_segments[0]
+                    fd_idx = np.arange(fd_n_rows) + np.repeat(
+                        fd_segments[0] - (np.cumsum(seg_lengths) - seg_lengths),
+                        seg_lengths,
+                    )
+                flattened_data, _ = self.read_object(
+                    f"{name}/flattened_data",
+                    h5f,
+                    start_row=fd_start,
+                    n_rows=fd_n_rows,
+                    idx=fd_idx,
+                    use_h5idx=use_h5idx,
+                    obj_buf=fd_buf,
+                    obj_buf_start=fd_buf_start,
+                )
             if obj_buf is not None:
                 return obj_buf, n_rows_read
             return (
@@ -630,7 +958,7 @@ class LH5Store:
             # compute the number of rows to read
             # we culled idx above for start_row and n_rows, now we have to apply
             # the constraint of the length of the dataset
-            ds_n_rows = h5f[name].shape[0]
+            ds_n_rows = _get_dataset_n_rows(h5f[name])
             if idx is not None:
                 if len(idx[0]) > 0 and idx[0][-1] >= ds_n_rows:
                     log.warning(
@@ -665,8 +993,17 @@ class LH5Store:
             else:
                 source_sel = np.s_[start_row : start_row + n_rows_to_read]
 
+            # memory-map the dataset, if requested and possible
+            mm = None
+            if memmap and obj_buf is None and n_rows_to_read > 0:
+                mm = _memmap_dataset(h5f[name])
+                if mm is None:
+                    log.debug(f"cannot memory-map '{name}', reading it instead")
+
             # Now read the array
-            if obj_buf is not None and n_rows_to_read > 0:
+            if mm is not None:
+                nda = mm[source_sel]
+            elif obj_buf is not None and n_rows_to_read > 0:
                 buf_size = obj_buf_start + n_rows_to_read
                 if len(obj_buf) < buf_size:
                     obj_buf.resize(buf_size)
@@ -681,8 +1018,7 @@ class LH5Store:
                     # fixed): https://github.com/h5py/h5py/issues/1792
                     h5f[name].read_direct(obj_buf.nda, source_sel, dest_sel)
                 else:
-                    # it is faster to read the whole object and then do fancy indexing
-                    obj_buf.nda[dest_sel] = h5f[name][...][source_sel]
+                    _read_rows(h5f[name], idx[0], out=obj_buf.nda[dest_sel])
 
                 nda = obj_buf.nda
             else:
@@ -693,24 +1029,21 @@ class LH5Store:
                     if change_idx_to_slice or idx is None or use_h5idx:
                         nda = h5f[name][source_sel]
                     else:
-                        # it is faster to read the whole object and then do fancy indexing
-                        nda = h5f[name][...][source_sel]
-
-                        # if reading a list of files recursively, this is given to obj_buf on                        
-                        # the first file read. obj_buf needs to be resized and therefore
-                        # it needs to hold the data itself (not a view of the data).
-                        # a view is returned by the source_sel indexing, which cannot be resized
-                        # by ndarray.resize().
-                        if hasattr(self, "in_file_loop") and self.in_file_loop:
-                            nda = np.copy(nda)
-                            
+                        nda = _read_rows(h5f[name], idx[0])
+
             # special handling for bools
             # (c and Julia store as uint8 so cast to bool)
             if elements == "bool":
-                nda = nda.astype(np.bool)
+                nda = nda.view(bool) if mm is not None else nda.astype(bool)
 
-            # Finally, set attributes and return objects
-            attrs = h5f[name].attrs
+            # Finally, set attributes and return objects. Storage filters are
+            # exposed as the "hdf5_settings" attribute, such that they are
+            # preserved if the object is written out again
+            attrs = dict(h5f[name].attrs)
+            attrs.pop(LOGICAL_LENGTH_ATTR, None)
+            hdf5_settings = _get_hdf5_settings(h5f[name])
+            if hdf5_settings:
+                attrs["hdf5_settings"] = hdf5_settings
             if obj_buf is None:
                 if datatype == "array":
                     return Array(nda=nda, attrs=attrs), n_rows_to_read
@@ -722,7 +1055,9 @@ class LH5Store:
                         n_rows_to_read,
                     )
             else:
-                if set(obj_buf.attrs.keys()) != set(attrs.keys()):
+                if set(obj_buf.attrs.keys()) - {"hdf5_settings"} != set(
+                    attrs.keys()
+                ) - {"hdf5_settings"}:
                     raise RuntimeError(
                         f"attrs mismatch. "
                         f"obj_buf.attrs: {obj_buf.attrs}, "
@@ -732,6 +1067,367 @@ class LH5Store:
 
         raise RuntimeError("don't know how to read datatype {datatype}")
 
+    def read_time_range(
+        self,
+        name: str,
+        lh5_file: str | h5py.File | list[str | h5py.File],
+        t0: float | None,
+        t1: float | None,
+        time_col: str = "timestamp",
+        field_mask: dict[str, bool] | list[str] | tuple[str] = None,
+        obj_buf: LGDO = None,
+        obj_buf_start: int = 0,
+        decompress: bool = True,
+        n_threads: int = 1,
+        time_index: str = None,
+    ) -> tuple[LGDO, int]:
+        """Read the rows of table `name` with a time in the range [`t0`, `t1`).
+
+        The time of the rows is given by the `time_col` column of the table.
+        If the column has a zone map (see :mod:`.lh5_zonemap`), it is used as
+        a time index: files and blocks of rows whose time range does not
+        overlap the requested one are skipped, without reading anything else
+        than the (small) zone map. If the zone map is sorted (e.g. for
+        increasing timestamps), the blocks are found by binary search.
+        Otherwise the whole time column is read. Only the selected rows of
+        the other columns are then read (see :meth:`read_object`). With a
+        `time_index` sidecar file, files whose time range does not overlap
+        the requested one are not opened at all.
+
+        Examples
+        --------
+        >>> tbl, n_rows = store.read_time_range(
+        ...     "geds/hit", files, t0=1.6e9, t1=1.6e9 + 3600
+        ... )
+
+        Parameters
+        ----------
+        name
+            name of the table to be read.
+        lh5_file
+            the file(s) containing the table.
+        t0, t1
+            start (inclusive) and end (exclusive) of the time range. ``None``
+            leaves the range open.
+        time_col
+            name of the column holding the time of the rows.
+        field_mask, obj_buf, obj_buf_start, decompress, n_threads
+            see :meth:`read_object`.
+        time_index
+            HDF5 file holding the time range of each file, written by
+            :func:`.lh5_zonemap.build_time_index`. Files missing from it are
+            opened as usual.
+
+        Returns
+        -------
+        (object, n_rows_read)
+            see :meth:`read_object`.
+        """
+        t0 = -np.inf if t0 is None else t0
+        t1 = np.inf if t1 is None else t1
+        lh5_files = (
+            [lh5_file] if isinstance(lh5_file, (str, h5py.File)) else list(lh5_file)
+        )
+
+        # skip the files known not to overlap the time range
+        index = None
+        if time_index is not None:
+            index = read_time_index(time_index, name, time_col)
+        if index is not None:
+            indexed = set(index[0])
+            overlapping = time_index_files(index, t0, t1)
+
+            def may_overlap(f: str | h5py.File) -> bool:
+                if isinstance(f, h5py.File):
+                    path = f.filename
+                else:
+                    path = expand_path(f)
+                    if self.base_path != "":
+                        path = os.path.join(self.base_path, path)
+                path = os.path.realpath(path)
+                return path not in indexed or path in overlapping
+
+            candidates = [f for f in lh5_files if may_overlap(f)]
+            log.debug(f"{len(candidates)} of {len(lh5_files)} files in time range")
+        else:
+            candidates = lh5_files
+
+        files = []
+        idx = []
+        for f in candidates:
+            rows = self._time_range_rows(f"{name}/{time_col}", f, t0, t1)
+            if len(rows) > 0:
+                files.append(f)
+                idx.append(rows)
+
+        if len(files) == 0:
+            if obj_buf is None:
+                obj_buf = self.get_buffer(name, lh5_files[0], field_mask=field_mask)
+            return obj_buf, 0
+
+        return self.read_object(
+            name,
+            files,
+            idx=idx,
+            field_mask=field_mask,
+            obj_buf=obj_buf,
+            obj_buf_start=obj_buf_start,
+            decompress=decompress,
+            n_threads=n_threads,
+        )
+
+    def _time_range_rows(
+        self, name: str, lh5_file: str | h5py.File, t0: float, t1: float
+    ) -> np.ndarray:
+        """Return the rows of column `name` with values in [`t0`, `t1`)."""
+        h5f = self.gimme_file(lh5_file, "r")
+        if not h5f or name not in h5f:
+            raise KeyError(f"'{name}' not in {lh5_file}")
+        ds = h5f[name]
+        n_rows = _get_dataset_n_rows(ds)
+
+        # ranges of rows to be looked at, and whether their time needs to be
+        # checked
+        zm = read_zone_map(ds)
+        if zm is None:
+            log.debug(f"no zone map for {name} in {lh5_file}, reading all rows")
+            runs = [(0, n_rows, True)]
+        else:
+            zm, block_size = zm
+            is_sorted = (
+                zm["n_nan"].sum() == 0 and (zm["min"][1:] >= zm["max"][:-1]).all()
+            )
+            if is_sorted:
+                b_start = np.searchsorted(zm["max"], t0, "left")
+                b_stop = np.searchsorted(zm["min"], t1, "left")
+                blocks = [(b_start, b_stop)] if b_start < b_stop else []
+                if b_stop - b_start > 2:
+                    # all the rows of the blocks in between the first and the
+                    # last one are in the range
+                    blocks = [
+                        (b_start, b_start + 1),
+                        (b_start + 1, b_stop - 1),
+                        (b_stop - 1, b_stop),
+                    ]
+            else:
+                blocks = _mask_runs((zm["max"] >= t0) & (zm["min"] < t1))
+            runs = [
+                (a * block_size, min(b * block_size, n_rows), not is_sorted or i != 1)
+                for i, (a, b) in enumerate(blocks)
+            ]
+
+        rows = [np.empty(0, dtype="int64")]
+        for start, stop, check in runs:
+            if check:
+                t = ds[start:stop]
+                rows.append(start + np.nonzero((t >= t0) & (t < t1))[0])
+            else:
+                rows.append(np.arange(start, stop))
+        return np.concatenate(rows)
+
+    def _read_table_lazy(
+        self,
+        name: str,
+        lh5_file: str | h5py.File | list[str | h5py.File],
+        field_mask: dict[str, bool] | list[str] | tuple[str] = None,
+        **kwargs,
+    ) -> LazyTable | None:
+        """Build a :class:`.LazyTable` for table `name`, see :meth:`read_object`.
+
+        Returns ``None`` if `name` is not a table or is a waveform table.
+        """
+        lh5_files = (
+            [lh5_file] if isinstance(lh5_file, (str, h5py.File)) else list(lh5_file)
+        )
+        h5f = self.gimme_file(lh5_files[0], "r")
+        if not h5f or name not in h5f:
+            raise KeyError(f"'{name}' not in {lh5_files[0]}")
+
+        datatype, _, elements = parse_datatype(h5f[name].attrs.get("datatype", ""))
+        if datatype != "table" or set(elements) == {"t0", "dt", "values"}:
+            return None
+
+        idx = kwargs["idx"]
+        if idx is not None and len(lh5_files) == 1:
+            idx = idx if isinstance(idx, tuple) and len(idx) == 1 else (idx,)
+        _, n_rows_read = self._plan_reads(
+            name, lh5_files, kwargs["start_row"], kwargs["n_rows"], idx
+        )
+        return self._make_lazy_table(
+            name, h5f, lh5_file, _make_field_mask(field_mask), n_rows_read, kwargs
+        )
+
+    def _make_lazy_table(
+        self,
+        name: str,
+        h5f: h5py.File,
+        lh5_file: str | h5py.File | list[str | h5py.File],
+        field_mask: dict[str, bool] | None,
+        size: int,
+        kwargs: dict[str, Any],
+    ) -> LazyTable:
+        _, _, elements = parse_datatype(h5f[name].attrs["datatype"])
+
+        col_dict = {}
+        for field in elements:
+            if field_mask is not None and not field_mask[field]:
+                continue
+            path = f"{name}/{field}"
+            f_type, _, f_elements = parse_datatype(h5f[path].attrs["datatype"])
+            if f_type == "table" and set(f_elements) != {"t0", "dt", "values"}:
+                col_dict[field] = self._make_lazy_table(
+                    path, h5f, lh5_file, None, size, kwargs
+                )
+            else:
+                col_dict[field] = partial(self._read_column, path, lh5_file, kwargs)
+
+        attrs = dict(h5f[name].attrs)
+        attrs["datatype"] = "table{" + ",".join(col_dict.keys()) + "}"
+        return LazyTable(size=size, col_dict=col_dict, attrs=attrs)
+
+    def _read_column(
+        self,
+        name: str,
+        lh5_file: str | h5py.File | list[str | h5py.File],
+        kwargs: dict[str, Any],
+    ) -> LGDO:
+        return self.read_object(name, lh5_file, **kwargs)[0]
+
+    def _plan_reads(
+        self,
+        name: str,
+        lh5_files: list[str | h5py.File],
+        start_row: int,
+        n_rows: int,
+        idx: np.ndarray | list | tuple | list[np.ndarray | list | tuple],
+    ) -> tuple[list[tuple], int]:
+        """Determine which rows of array-like object `name` are read from each
+        file by :meth:`read_object`.
+
+        Returns a list of ``(file, start_row, n_rows, idx, offset)`` tuples,
+        where `offset` is the position of the first row in the output, and the
+        total number of rows.
+        """
+        plan = []
+        n_rows_tot = 0
+        for i, h5f in enumerate(lh5_files):
+            if n_rows_tot >= n_rows:
+                break
+            n_rows_file = self.read_n_rows(name, h5f)
+            if isinstance(idx, list) and len(idx) > 0 and not np.isscalar(idx[0]):
+                # a list of lists: must be one per file
+                idx_i = idx[i]
+            elif idx is not None:
+                if not (isinstance(idx, tuple) and len(idx) == 1):
+                    idx = (np.asarray(idx),)
+                # idx is a long continuous array, split it as read_object does
+                n_rows_to_read_i = bisect_left(idx[0], n_rows_file)
+                idx_i = (idx[0][:n_rows_to_read_i],)
+                idx = (idx[0][n_rows_to_read_i:] - n_rows_file,)
+            else:
+                idx_i = None
+
+            if idx_i is None:
+                n_rows_i = max(n_rows_file - start_row, 0)
+            else:
+                if not (isinstance(idx_i, tuple) and len(idx_i) == 1):
+                    idx_i = (idx_i,)
+                n_rows_i = bisect_left(idx_i[0], n_rows_file) - bisect_left(
+                    idx_i[0], start_row
+                )
+            n_rows_i = min(n_rows_i, n_rows - n_rows_tot)
+
+            if n_rows_i > 0:
+                plan.append((h5f, start_row, n_rows_i, idx_i, n_rows_tot))
+            n_rows_tot += n_rows_i
+            start_row = 0
+
+        return plan, n_rows_tot
+
+    def _read_files_parallel(
+        self,
+        name: str,
+        lh5_files: list[str | h5py.File],
+        start_row: int,
+        n_rows: int,
+        idx: np.ndarray | list | tuple | list[np.ndarray | list | tuple],
+        use_h5idx: bool,
+        field_mask: dict[str, bool] | list[str] | tuple[str],
+        obj_buf: LGDO,
+        obj_buf_start: int,
+        n_threads: int,
+    ) -> tuple[LGDO, int]:
+        """Read an array-like object from a list of files with a pool of
+        threads. See :meth:`read_object`."""
+        # first determine what has to be read from each file, and where it
+        # goes in the output buffer
+        plan, n_rows_tot = self._plan_reads(name, lh5_files, start_row, n_rows, idx)
+
+        if obj_buf is None:
+            obj_buf = self.get_buffer(name, lh5_files[0], field_mask=field_mask)
+            obj_buf_start = 0
+
+        # split the buffer into its array-like fields. Variable-length data
+        # can't be placed before knowing the size of what comes before: vectors
+        # of vectors are read into temporary objects and gathered afterwards.
+        # Every other field is read directly in place
+        with self._use_file(lh5_files[0], "r") as h5f:
+            fields = _array_fields(name, h5f, obj_buf, field_mask)
+        direct = [(fld, buf) for fld, buf in fields if not _has_vector_of_vectors(buf)]
+        gathered = [(fld, buf) for fld, buf in fields if _has_vector_of_vectors(buf)]
+        for _, buf in direct:
+            if len(buf) < obj_buf_start + n_rows_tot:
+                buf.resize(obj_buf_start + n_rows_tot)
+
+        def read_field(task: tuple) -> tuple[LGDO, int]:
+            (lh5_file, start_row_i, n_rows_i, idx_i, offset), (fld, buf) = task
+            with self._use_file(lh5_file, "r") as h5f:
+                return self.read_object(
+                    fld,
+                    h5f,
+                    start_row=start_row_i,
+                    n_rows=n_rows_i,
+                    idx=idx_i,
+                    use_h5idx=use_h5idx,
+                    obj_buf=buf,
+                    obj_buf_start=obj_buf_start + offset if buf is not None else 0,
+                )
+
+        tasks = [(item, (fld, buf)) for fld, buf in direct for item in plan]
+        tasks += [(item, (fld, None)) for fld, _ in gathered for item in plan]
+        with ThreadPoolExecutor(max_workers=n_threads) as pool:
+            results = list(pool.map(read_field, tasks))
+
+            n_rows_read = [n for _, n in results]
+            if n_rows_read != [item[2] for item, _ in tasks]:
+                raise RuntimeError(
+                    f"read {n_rows_read} rows of '{name}' from {lh5_files}, "
+                    f"{[item[2] for item, _ in tasks]} were expected"
+                )
+
+            copies = []
+            results = results[len(direct) * len(plan) :]
+            for i, (_, buf) in enumerate(gathered):
+                _gather_rows(
+                    [obj for obj, _ in results[i * len(plan) : (i + 1) * len(plan)]],
+                    [item[2] for item in plan],
+                    buf,
+                    obj_buf_start,
+                    copies,
+                )
+            list(pool.map(lambda copy: copy(), copies))
+
+        def update_tables(obj: LGDO) -> None:
+            if isinstance(obj, Table):
+                for field in obj.keys():
+                    update_tables(obj[field])
+                obj.resize(do_warn=True)
+                obj.loc = obj_buf_start + n_rows_tot
+
+        update_tables(obj_buf)
+
+        return obj_buf, n_rows_tot
+
     def write_object(
         self,
         obj: LGDO,
@@ -742,6 +1438,7 @@ class LH5Store:
         n_rows: int = None,
         wo_mode: str = "append",
         write_start: int = 0,
+        hdf5_settings: dict[str, Any] = None,
     ) -> None:
         """Write an LGDO into an LH5 file.
 
@@ -775,6 +1472,43 @@ class LH5Store:
         write_start
             row in the output file (if already existing) to start overwriting
             from.
+        hdf5_settings
+            storage settings (chunking and filters) for the HDF5 datasets
+            created for `obj`, e.g. ``{"compression": "gzip", "shuffle": True,
+            "chunks": [1000]}``. Keys listed in :data:`HDF5_SETTINGS_KEYS` are
+            forwarded to :meth:`h5py.Group.create_dataset` and are inherited
+            by all fields of `obj`. Any other key is interpreted as the name of
+            a field (of a :class:`.Struct`, :class:`.Table` or
+            :class:`.VectorOfVectors`) and must map to the settings for that
+            field only. A chunk shape with fewer dimensions than the dataset
+            is completed with the full extent of the remaining dimensions.
+            ``"chunks": False`` creates contiguous datasets, which can't be
+            appended to but can be memory-mapped (see :meth:`read_object`).
+            ``"zone_map"`` (a number of rows, or ``True`` for
+            :data:`.lh5_zonemap.DEFAULT_BLOCK_SIZE`) enables zone maps for the
+            numeric columns of tables (see :mod:`.lh5_zonemap`). Existing zone
+            maps are always kept up to date when writing to a column.
+            Settings found in the ``hdf5_settings`` attribute of an LGDO
+            (which is never written to disk) take precedence. Settings only
+            apply when a dataset is created, i.e. not when appending to an
+            existing dataset.
+
+        Examples
+        --------
+        Compress all the columns of a :class:`.Table` with LZF, but use GZIP
+        and a custom chunk shape for the waveform values:
+
+        >>> store.write_object(
+        ...     tbl,
+        ...     "raw",
+        ...     "file.lh5",
+        ...     hdf5_settings={
+        ...         "compression": "lzf",
+        ...         "waveform": {
+        ...             "values": {"compression": "gzip", "chunks": [100]}
+        ...         },
+        ...     },
+        ... )
         """
         if wo_mode == "write_safe":
             wo_mode = "w"
@@ -794,14 +1528,64 @@ class LH5Store:
         # write_object:overwrite.
         mode = "w" if wo_mode == "of" else "a"
         lh5_file = self.gimme_file(lh5_file, mode=mode)
+        if self.layout_cache is not None:
+            self.layout_cache.invalidate(lh5_file.filename)
         group = self.gimme_group(group, lh5_file)
         if wo_mode == "w" and name in group:
             raise RuntimeError(f"can't overwrite '{name}' in wo_mode 'write_safe'")
 
+        # settings for the HDF5 datasets: the ones given by the caller (or
+        # inherited from the parent object) first, then the ones attached to
+        # the object itself
+        ds_settings, field_settings = _split_hdf5_settings(hdf5_settings)
+        if "hdf5_settings" in obj.attrs:
+            obj_ds_settings, obj_field_settings = _split_hdf5_settings(
+                obj.attrs["hdf5_settings"]
+            )
+            ds_settings.update(obj_ds_settings)
+            field_settings.update(obj_field_settings)
+
+        # the settings are not an LH5 attribute
+        attrs = {k: v for k, v in obj.attrs.items() if k != "hdf5_settings"}
+
+        # waveform compression: encode the rows to be written and write out
+        # the encoded object instead
+        if (
+            isinstance(obj, (ArrayOfEqualSizedArrays, VectorOfVectors))
+            and attrs.get("compression") is not None
+        ):
+            if isinstance(obj, ArrayOfEqualSizedArrays):
+                if n_rows is None or n_rows > len(obj) - start_row:
+                    n_rows = len(obj) - start_row
+                to_encode = ArrayOfEqualSizedArrays(
+                    nda=obj.nda[start_row : start_row + n_rows], attrs=attrs
+                )
+            else:
+                cl = obj.cumulative_length.nda
+                if n_rows is None or n_rows > len(cl) - start_row:
+                    n_rows = len(cl) - start_row
+                fd_start = 0 if start_row == 0 else cl[start_row - 1]
+                fd_stop = fd_start if n_rows == 0 else cl[start_row + n_rows - 1]
+                to_encode = VectorOfVectors(
+                    flattened_data=obj.flattened_data.nda[fd_start:fd_stop],
+                    cumulative_length=cl[start_row : start_row + n_rows] - fd_start,
+                    attrs=attrs,
+                )
+            self.write_object(
+                compression.encode(to_encode),
+                name,
+                lh5_file,
+                group=group,
+                wo_mode=wo_mode,
+                write_start=write_start,
+                hdf5_settings={**ds_settings, **field_settings},
+            )
+            return
+
         # struct or table or waveform table
         if isinstance(obj, Struct):
             group = self.gimme_group(
-                name, group, grp_attrs=obj.attrs, overwrite=(wo_mode == "o")
+                name, group, grp_attrs=attrs, overwrite=(wo_mode == "o")
             )
             for field in obj.keys():
                 self.write_object(
@@ -813,6 +1597,7 @@ class LH5Store:
                     n_rows=n_rows,
                     wo_mode=wo_mode,
                     write_start=write_start,
+                    hdf5_settings={**ds_settings, **field_settings.get(field, {})},
                 )
             return
 
@@ -827,13 +1612,55 @@ class LH5Store:
                         f"tried to overwrite {name} in {group} for wo_mode {wo_mode}"
                     )
             ds = group.create_dataset(name, shape=(), data=obj.value)
-            ds.attrs.update(obj.attrs)
+            ds.attrs.update(attrs)
+            return
+
+        # encoded arrays: the encoded data is a vector of vectors, the decoded
+        # size an array or (for arrays of equal-sized arrays) a scalar
+        elif isinstance(obj, (VectorOfEncodedVectors, ArrayOfEncodedEqualSizedArrays)):
+            group = self.gimme_group(
+                name, group, grp_attrs=attrs, overwrite=(wo_mode == "o")
+            )
+            self.write_object(
+                obj.encoded_data,
+                "encoded_data",
+                lh5_file,
+                group=group,
+                start_row=start_row,
+                n_rows=n_rows,
+                wo_mode=wo_mode,
+                write_start=write_start,
+                hdf5_settings={**ds_settings, **field_settings.get("encoded_data", {})},
+            )
+            if isinstance(obj.decoded_size, Scalar):
+                self.write_object(
+                    obj.decoded_size,
+                    "decoded_size",
+                    lh5_file,
+                    group=group,
+                    wo_mode="o" if wo_mode == "a" else wo_mode,
+                )
+            else:
+                self.write_object(
+                    obj.decoded_size,
+                    "decoded_size",
+                    lh5_file,
+                    group=group,
+                    start_row=start_row,
+                    n_rows=n_rows,
+                    wo_mode=wo_mode,
+                    write_start=write_start,
+                    hdf5_settings={
+                        **ds_settings,
+                        **field_settings.get("decoded_size", {}),
+                    },
+                )
             return
 
         # vector of vectors
         elif isinstance(obj, VectorOfVectors):
             group = self.gimme_group(
-                name, group, grp_attrs=obj.attrs, overwrite=(wo_mode == "o")
+                name, group, grp_attrs=attrs, overwrite=(wo_mode == "o")
             )
             if (
                 n_rows is None
@@ -845,7 +1672,7 @@ class LH5Store:
             # cumulative lengths as appropriate for the in-file object
             offset = 0  # declare here because we have to subtract it off at the end
             if (wo_mode == "a" or wo_mode == "o") and "cumulative_length" in group:
-                len_cl = len(group["cumulative_length"])
+                len_cl = _get_dataset_n_rows(group["cumulative_length"])
                 if wo_mode == "a":
                     write_start = len_cl
                 if len_cl > 0:
@@ -863,6 +1690,10 @@ class LH5Store:
                 n_rows=fd_n_rows,
                 wo_mode=wo_mode,
                 write_start=offset,
+                hdf5_settings={
+                    **ds_settings,
+                    **field_settings.get("flattened_data", {}),
+                },
             )
 
             # now offset is used to give appropriate in-file values for
@@ -884,6 +1715,10 @@ class LH5Store:
                 n_rows=n_rows,
                 wo_mode=wo_mode,
                 write_start=write_start,
+                hdf5_settings={
+                    **ds_settings,
+                    **field_settings.get("cumulative_length", {}),
+                },
             )
             obj.cumulative_length.nda -= offset
 
@@ -901,21 +1736,51 @@ class LH5Store:
             # creating an empty dataset and appending to that is super slow!
             if (wo_mode != "a" and write_start == 0) or name not in group:
                 maxshape = (None,) + nda.shape[1:]
+                # contiguous datasets have a fixed size
+                if ds_settings.get("chunks", None) is False:
+                    maxshape = None
                 if wo_mode == "o" and name in group:
                     log.debug(f"overwriting {name} in {group}")
                     del group[name]
-                ds = group.create_dataset(name, data=nda, maxshape=maxshape)
-                ds.attrs.update(obj.attrs)
+                remove_zone_map(group, name)
+                ds = group.create_dataset(
+                    name,
+                    data=nda,
+                    maxshape=maxshape,
+                    **_make_create_dataset_kwargs(ds_settings, nda.shape),
+                )
+                ds.attrs.update(attrs)
+                if ds_settings.get("zone_map") and has_zone_map(ds):
+                    zm = ds_settings["zone_map"]
+                    update_zone_map(ds, None if zm is True else zm)
                 return
 
             # Now append or overwrite
             ds = group[name]
-            old_len = ds.shape[0]
+            old_len = _get_dataset_n_rows(ds)
             if wo_mode == "a":
                 write_start = old_len
-            add_len = write_start + nda.shape[0] - old_len
-            ds.resize(old_len + add_len, axis=0)
-            ds[write_start:] = nda
+            new_len = write_start + nda.shape[0]
+
+            if wo_mode == "a" and self.growth_factor is not None:
+                # grow the dataset geometrically and keep track of the number
+                # of rows actually written
+                if new_len > ds.shape[0]:
+                    ds.resize(
+                        max(new_len, int(ds.shape[0] * self.growth_factor)), axis=0
+                    )
+                ds.attrs[LOGICAL_LENGTH_ATTR] = new_len
+                self._overallocated_files.add(os.path.abspath(ds.file.filename))
+            else:
+                ds.resize(new_len, axis=0)
+                if LOGICAL_LENGTH_ATTR in ds.attrs:
+                    del ds.attrs[LOGICAL_LENGTH_ATTR]
+
+            ds[write_start:new_len] = nda
+            if has_zone_map(ds) and (
+                ds_settings.get("zone_map") or name + ZONE_MAP_SUFFIX in group
+            ):
+                update_zone_map(ds, start_row=write_start)
             return
 
         else:
@@ -927,7 +1792,20 @@ class LH5Store:
         """Look up the number of rows in an Array-like object called `name` in
         `lh5_file`.
 
-        Return ``None`` if it is a :class:`.Scalar` or a :class:`.Struct`."""
+        Return ``None`` if it is a :class:`.Scalar` or a :class:`.Struct`.
+        The layout cache is used, if available (see :class:`LH5Store`)."""
+        if self.layout_cache is not None and isinstance(lh5_file, str):
+            path = expand_path(lh5_file)
+            # files being written to by this store might not be flushed yet
+            h5f = self.files.get(path, self.files.get(lh5_file))
+            if h5f is None or h5f.mode == "r":
+                if self.base_path != "":
+                    path = os.path.join(self.base_path, path)
+                layout = self.layout_cache.get(path)
+                if name not in layout:
+                    raise KeyError(f"'{name}' not in {lh5_file}")
+                return layout.n_rows(name)
+
         # this is basically a stripped down version of read_object
         h5f = self.gimme_file(lh5_file, "r")
         if not h5f or name not in h5f:
@@ -965,6 +1843,12 @@ class LH5Store:
                     )
             return rows_read
 
+        # length of encoded arrays is the length of the encoded data
+        if datatype == "array_of_encoded_equalsized_arrays" or elements.startswith(
+            "encoded_array"
+        ):
+            return self.read_n_rows(f"{name}/encoded_data", h5f)
+
         # length of vector of vectors is the length of its cumulative_length
         if elements.startswith("array"):
             return self.read_n_rows(f"{name}/cumulative_length", h5f)
@@ -972,10 +1856,63 @@ class LH5Store:
         # return array length (without reading the array!)
         if "array" in datatype:
             # compute the number of rows to read
-            return h5f[name].shape[0]
+            return _get_dataset_n_rows(h5f[name])
 
         raise RuntimeError(f"don't know how to read datatype '{datatype}'")
 
+    def finalize(self, lh5_file: str | h5py.File = None) -> None:
+        """Trim over-allocated datasets to their logical length.
+
+        Datasets that have been over-allocated by :meth:`write_object` (see
+        the `growth_factor` argument of :class:`LH5Store`) are resized to the
+        number of rows actually written and the :data:`LOGICAL_LENGTH_ATTR`
+        attribute is removed, leaving a standard LH5 file.
+
+        Parameters
+        ----------
+        lh5_file
+            the file to be finalized. If ``None``, finalize all the files
+            written to by this store since the last call.
+        """
+        if lh5_file is None:
+            files = list(self._overallocated_files)
+        elif isinstance(lh5_file, h5py.File):
+            files = [os.path.abspath(lh5_file.filename)]
+        else:
+            if self.base_path != "":
+                lh5_file = os.path.join(self.base_path, lh5_file)
+            files = [os.path.abspath(expand_path(lh5_file))]
+
+        for filename in files:
+            # use the handle of the store, if any
+            h5f = None
+            for f in self.files.values():
+                if f and os.path.abspath(f.filename) == filename:
+                    h5f = f
+                    break
+
+            if h5f is not None and h5f.mode != "r":
+                self._trim_file(h5f)
+                h5f.flush()
+            else:
+                with h5py.File(filename, "a") as f:
+                    self._trim_file(f)
+
+    def _trim_file(self, h5f: h5py.File) -> None:
+        """Trim the over-allocated datasets of `h5f`, open for writing."""
+
+        def trim(name: str, obj: h5py.HLObject) -> None:
+            if isinstance(obj, h5py.Dataset) and LOGICAL_LENGTH_ATTR in obj.attrs:
+                log.debug(f"trimming {name} to {obj.attrs[LOGICAL_LENGTH_ATTR]} rows")
+                obj.resize(obj.attrs[LOGICAL_LENGTH_ATTR], axis=0)
+                del obj.attrs[LOGICAL_LENGTH_ATTR]
+
+        h5f.visititems(trim)
+        filename = os.path.abspath(h5f.filename)
+        self._overallocated_files.discard(filename)
+        if self.layout_cache is not None:
+            self.layout_cache.invalidate(filename)
+
 
 def ls(lh5_file: str | h5py.Group, lh5_group: str = "") -> list[str]:
     """Return a list of LH5 groups in the input file and group, similar
@@ -985,7 +1922,8 @@ def ls(lh5_file: str | h5py.Group, lh5_group: str = "") -> list[str]:
     Parameters
     ----------
     lh5_file
-        name of file.
+        name of file. If a string, the file layout is looked up in the
+        :data:`.lh5_layout.default_cache`.
     lh5_group
         group to search. add a ``/`` to the end of the group name if you want to
         list all objects inside that group.
@@ -996,12 +1934,9 @@ def ls(lh5_file: str | h5py.Group, lh5_group: str = "") -> list[str]:
         + ("" if lh5_group == "" else f" (and group {lh5_group})")
     )
 
-    lh5_st = LH5Store()
     # To use recursively, make lh5_file a h5group instead of a string
     if isinstance(lh5_file, str):
-        lh5_file = lh5_st.gimme_file(lh5_file, "r")
-        if lh5_group.startswith("/"):
-            lh5_group = lh5_group[1:]
+        return default_cache.get(expand_path(lh5_file)).ls(lh5_group)
 
     if lh5_group == "":
         lh5_group = "*"
@@ -1109,6 +2044,7 @@ def load_nda(
     par_list: list[str],
     lh5_group: str = "",
     idx_list: list[np.ndarray | list | tuple] = None,
+    memmap: bool = False,
 ) -> dict[str, np.ndarray]:
     r"""Build a dictionary of :class:`numpy.ndarray`\ s from LH5 data.
 
@@ -1126,6 +2062,10 @@ def load_nda(
     idx_list
         for fancy-indexed reads. Must be one index array for each file in
         `f_list`.
+    memmap
+        memory-map the data instead of reading it, where possible (see
+        :meth:`LH5Store.read_object`). Only effective for single files, data
+        from multiple files is concatenated in memory.
 
     Returns
     -------
@@ -1155,13 +2095,18 @@ def load_nda(
                 raise RuntimeError(f"'{lh5_group}/{par}' not in file {f_list[ii]}")
 
             if idx_list is None:
-                data, _ = sto.read_object(f"{lh5_group}/{par}", f)
+                data, _ = sto.read_object(f"{lh5_group}/{par}", f, memmap=memmap)
             else:
-                data, _ = sto.read_object(f"{lh5_group}/{par}", f, idx=idx_list[ii])
+                data, _ = sto.read_object(
+                    f"{lh5_group}/{par}", f, idx=idx_list[ii], memmap=memmap
+                )
             if not data:
                 continue
             par_data[par].append(data.nda)
-    par_data = {par: np.concatenate(par_data[par]) for par in par_list}
+    par_data = {
+        par: nda_list[0] if memmap and len(nda_list) == 1 else np.concatenate(nda_list)
+        for par, nda_list in par_data.items()
+    }
     return par_data
 
 
@@ -1217,6 +2162,24 @@ class LH5Iterator:
     The ``lh5_obj`` that is read by this class is reused in order to avoid
     reallocation of memory; this means that if you want to hold on to data
     between reads, you will have to copy it somewhere!
+
+    When iterating, upcoming blocks can be read in a background thread while
+    the current one is being processed (see the `prefetch` argument). Blocks
+    are read into a ring of preallocated buffers and copied into ``lh5_obj``
+    when yielded, such that the same object is still returned at every
+    iteration.
+
+    Rows can also be filtered with an expression evaluated on each block (see
+    the `where` argument). The columns needed to evaluate it are read first,
+    then only the passing rows of the other columns are read. Blocks then span
+    `buffer_len` entries, but only the passing rows are in ``lh5_obj`` (and
+    blocks without any are skipped while iterating). Rows that can't pass the
+    selection according to the zone maps of the columns (see
+    :mod:`.lh5_zonemap`) are not read at all:
+
+    >>> for lh5_obj, entry, n_rows in LH5Iterator(..., where="energy > 1000"):
+    >>>    # lh5_obj holds n_rows passing rows, with entry numbers
+    >>>    # lh5_it.selected_entries
     """
 
     def __init__(
@@ -1228,6 +2191,8 @@ class LH5Iterator:
         entry_mask: list[bool] | list[list[bool]] = None,
         field_mask: dict[str, bool] | list[str] | tuple[str] = None,
         buffer_len: int = 3200,
+        prefetch: int = 0,
+        where: str = None,
     ) -> None:
         """
         Parameters
@@ -1251,6 +2216,17 @@ class LH5Iterator:
             more details.
         buffer_len
             number of entries to read at a time while iterating through files.
+        prefetch
+            number of blocks to read ahead in a background thread while
+            iterating. If zero, blocks are read only when requested. Blocks
+            read ahead are copied into the returned object when yielded, which
+            costs one more copy of the selected fields. Reading ahead starts
+            with the iteration: changes of ``field_mask`` made while iterating
+            only apply to the next iteration.
+        where
+            expression selecting the rows to be read, evaluated on the table
+            with :meth:`.Table.eval` (e.g. ``"(energy > 1000) & ~is_pulser"``).
+            Only the columns appearing in it are read for all entries.
         """
         self.lh5_st = LH5Store(base_path=base_path, keep_open=True)
 
@@ -1273,6 +2249,12 @@ class LH5Iterator:
         ).cumsum()
         self.group = group
         self.buffer_len = buffer_len
+        self.prefetch = prefetch
+        self._prefetch_buffers = []
+        self.where = where
+        # buffers for the columns needed by where, one per read buffer
+        self._where_buffers = {}
+        self.selected_entries = None
 
         if len(self.lh5_files) > 0:
             self.lh5_buffer = self.lh5_st.get_buffer(
@@ -1296,11 +2278,16 @@ class LH5Iterator:
             if isinstance(entry_list[0], int):
                 entry_list.sort()
                 i_start = 0
+                f_start = 0
                 self.entry_list = []
                 for f_end in self.file_map:
-                    i_stop = bisect_right(entry_list, f_end, lo=i_start)
-                    self.entry_list.append(entry_list[i_start:i_stop])
+                    # convert global entries into local ones
+                    i_stop = bisect_left(entry_list, f_end, lo=i_start)
+                    self.entry_list.append(
+                        [i - f_start for i in entry_list[i_start:i_stop]]
+                    )
                     i_start = i_stop
+                    f_start = f_end
 
             else:
                 self.entry_list = [[]] * len(self.file_map)
@@ -1333,34 +2320,155 @@ class LH5Iterator:
 
     def read(self, entry: int) -> tuple[LGDO, int]:
         """Read the next chunk of events, starting at entry. Return the
-        LH5 buffer and number of rows read."""
+        LH5 buffer and number of rows read.
+
+        If `where` is set, only the rows passing the selection among the
+        next `buffer_len` entries are read, and their entry numbers are
+        stored in :attr:`selected_entries`.
+        """
+        self.lh5_buffer, self.n_rows, self.selected_entries = self._read_block(
+            entry, self.lh5_buffer, self.lh5_st
+        )
+        self.current_entry = entry
+        return (self.lh5_buffer, self.n_rows)
+
+    def _read_block(
+        self, entry: int, buf: LGDO, lh5_st: LH5Store
+    ) -> tuple[LGDO, int, np.ndarray | None]:
+        """Read the block of events starting at entry into `buf` with
+        `lh5_st`. Also return the entry numbers of the rows read if `where`
+        is set."""
+        if self.where is not None:
+            return self._read_block_where(entry, buf, lh5_st)
+
         i_file = np.searchsorted(self.entry_map, entry, "right")
         local_entry = entry
         if i_file > 0:
             local_entry -= self.entry_map[i_file - 1]
-        self.n_rows = 0
+        n_rows_tot = 0
 
-        while self.n_rows < self.buffer_len and i_file < len(self.file_map):
+        while n_rows_tot < self.buffer_len and i_file < len(self.file_map):
             # Loop through files
             local_idx = self.entry_list[i_file] if self.entry_list is not None else None
             i_local = local_idx[local_entry] if local_idx is not None else local_entry
-            self.lh5_buffer, n_rows = self.lh5_st.read_object(
+            buf, n_rows = lh5_st.read_object(
                 self.group,
                 self.lh5_files[i_file],
                 start_row=i_local,
-                n_rows=self.buffer_len - self.n_rows,
+                n_rows=self.buffer_len - n_rows_tot,
                 idx=local_idx,
                 field_mask=self.field_mask,
-                obj_buf=self.lh5_buffer,
-                obj_buf_start=self.n_rows,
+                obj_buf=buf,
+                obj_buf_start=n_rows_tot,
             )
 
-            self.n_rows += n_rows
+            n_rows_tot += n_rows
             i_file += 1
             local_entry = 0
 
-        self.current_entry = entry
-        return (self.lh5_buffer, self.n_rows)
+        return (buf, n_rows_tot, None)
+
+    def _read_block_where(
+        self, entry: int, buf: LGDO, lh5_st: LH5Store
+    ) -> tuple[LGDO, int, np.ndarray]:
+        """Read the rows passing `where` among the block of events starting
+        at entry."""
+        if id(buf) not in self._where_buffers:
+            # top-level fields appearing in the expression (nested fields are
+            # accessed as "table__field")
+            names = compile(self.where, "<where>", "eval").co_names
+            fields = lh5_st.get_buffer(self.group, self.lh5_files[0]).keys()
+            where_fields = [f for f in fields if f in {n.split("__")[0] for n in names}]
+            self._where_buffers[id(buf)] = lh5_st.get_buffer(
+                self.group,
+                self.lh5_files[0],
+                size=self.buffer_len,
+                field_mask=where_fields,
+            )
+        where_buf = self._where_buffers[id(buf)]
+
+        # split the block in per-file chunks of local rows
+        i_file = np.searchsorted(self.entry_map, entry, "right")
+        local_entry = entry
+        if i_file > 0:
+            local_entry -= self.entry_map[i_file - 1]
+        chunks = []
+        n_entries = 0
+        while n_entries < self.buffer_len and i_file < len(self.file_map):
+            n_file = self.entry_map[i_file] - (
+                self.entry_map[i_file - 1] if i_file > 0 else 0
+            )
+            n = min(self.buffer_len - n_entries, n_file - local_entry)
+            if n > 0:
+                if self.entry_list is not None:
+                    rows = np.asarray(
+                        self.entry_list[i_file][local_entry : local_entry + n],
+                        dtype="int64",
+                    )
+                else:
+                    rows = np.arange(local_entry, local_entry + n)
+                chunks.append((i_file, rows))
+            n_entries += max(n, 0)
+            i_file += 1
+            local_entry = 0
+
+        # evaluate the selection, skipping the blocks of rows that can't pass
+        # it according to the zone maps of the columns (if any)
+        start = 0
+        pos = 0
+        evaluated = []
+        for i_file, rows in chunks:
+            h5f = lh5_st.gimme_file(self.lh5_files[i_file], "r")
+            may_match = rows_may_match(self.where, h5f[self.group], rows)
+            if may_match is None:
+                may_match = np.ones(len(rows), dtype=bool)
+            if self.entry_list is None:
+                reads = [
+                    (rows[a], b - a, None, np.arange(a, b))
+                    for a, b in _mask_runs(may_match)
+                ]
+            else:
+                sel = np.nonzero(may_match)[0]
+                reads = [(0, len(sel), rows[sel], sel)] if len(sel) > 0 else []
+
+            for start_row, n_rows, idx, positions in reads:
+                where_buf, n_rows = lh5_st.read_object(
+                    self.group,
+                    self.lh5_files[i_file],
+                    start_row=start_row,
+                    n_rows=n_rows,
+                    idx=idx,
+                    field_mask=list(where_buf.keys()),
+                    obj_buf=where_buf,
+                    obj_buf_start=start,
+                )
+                evaluated.append(pos + positions[:n_rows])
+                start += n_rows
+            pos += len(rows)
+
+        mask = np.zeros(n_entries, dtype=bool)
+        if start > 0:
+            mask[np.concatenate(evaluated)] = where_buf.eval(self.where).nda[:start]
+
+        # now read the passing rows only
+        n_rows_tot = 0
+        start = 0
+        for i_file, rows in chunks:
+            selected = rows[mask[start : start + len(rows)]]
+            start += len(rows)
+            if len(selected) == 0:
+                continue
+            buf, n_rows = lh5_st.read_object(
+                self.group,
+                self.lh5_files[i_file],
+                idx=selected,
+                field_mask=self.field_mask,
+                obj_buf=buf,
+                obj_buf_start=n_rows_tot,
+            )
+            n_rows_tot += n_rows
+
+        return (buf, n_rows_tot, entry + np.nonzero(mask)[0])
 
     def __len__(self) -> int:
         """Return the total number of entries."""
@@ -1368,23 +2476,495 @@ class LH5Iterator:
 
     def __iter__(self) -> tuple[LGDO, int, int]:
         """Loop through entries in blocks of size buffer_len."""
+        if self.prefetch > 0:
+            yield from self._iter_prefetch()
+            return
+
         entry = 0
         while entry < len(self):
             buf, n_rows = self.read(entry)
-            yield (buf, entry, n_rows)
-            entry += n_rows
-
-
-@nb.njit(parallel=False, fastmath=True)
-def _make_fd_idx(starts, stops, idx):
-    k = 0
-    if len(starts) < len(stops):
-        for i in range(stops[0]):
-            idx[k] = i
-            k += 1
-        stops = stops[1:]
-    for j in range(len(starts)):
-        for i in range(starts[j], stops[j]):
-            idx[k] = i
-            k += 1
-    return (idx,)
+            if self.where is None:
+                yield (buf, entry, n_rows)
+                entry += n_rows
+            else:
+                if n_rows > 0:
+                    yield (buf, entry, n_rows)
+                entry += self.buffer_len
+
+    def _iter_prefetch(self) -> tuple[LGDO, int, int]:
+        """Loop through entries in blocks of size buffer_len, reading up to
+        `prefetch` blocks ahead in a background thread."""
+        # ring of read buffers, allocated once and reused across iterations
+        while len(self._prefetch_buffers) < self.prefetch:
+            self._prefetch_buffers.append(
+                self.lh5_st.get_buffer(
+                    self.group,
+                    self.lh5_files[0],
+                    size=self.buffer_len,
+                    field_mask=self.field_mask,
+                )
+            )
+
+        free_bufs = queue.Queue()
+        for buf in self._prefetch_buffers[: self.prefetch]:
+            free_bufs.put(buf)
+        read_bufs = queue.Queue()
+        stop = threading.Event()
+
+        def reader() -> None:
+            # h5py file handles are not shared with the consumer thread
+            lh5_st = LH5Store(base_path=self.lh5_st.base_path, keep_open=True)
+            entry = 0
+            try:
+                while entry < len(self):
+                    buf = free_bufs.get()
+                    if stop.is_set():
+                        break
+                    buf, n_rows, entries = self._read_block(entry, buf, lh5_st)
+                    read_bufs.put((buf, entry, n_rows, entries))
+                    if self.where is not None:
+                        entry += self.buffer_len
+                    elif n_rows == 0:
+                        break
+                    else:
+                        entry += n_rows
+            except Exception as e:
+                read_bufs.put(e)
+                return
+            read_bufs.put(None)
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = read_bufs.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                buf, entry, n_rows, entries = item
+                _copy_rows(buf, self.lh5_buffer, n_rows, self.field_mask)
+                # give the buffer back to the reader as soon as possible
+                free_bufs.put(buf)
+
+                self.n_rows = n_rows
+                self.current_entry = entry
+                self.selected_entries = entries
+                if self.where is not None and n_rows == 0:
+                    continue
+                yield (self.lh5_buffer, entry, n_rows)
+        finally:
+            stop.set()
+            free_bufs.put(None)
+            thread.join()
+
+
+def _make_field_mask(
+    field_mask: dict[str, bool] | list[str] | tuple[str] | None,
+) -> defaultdict:
+    """Turn a field mask (see :meth:`LH5Store.read_object`) into a
+    :class:`~collections.defaultdict`."""
+    if field_mask is None:
+        return defaultdict(lambda: True)
+    if isinstance(field_mask, dict):
+        default = True
+        if len(field_mask) > 0:
+            default = not field_mask[list(field_mask.keys())[0]]
+        return defaultdict(lambda: default, field_mask)
+    if isinstance(field_mask, (list, tuple)):
+        return defaultdict(lambda: False, {field: True for field in field_mask})
+    raise RuntimeError("bad field_mask of type", type(field_mask).__name__)
+
+
+def _mask_runs(mask: np.ndarray) -> list[tuple[int, int]]:
+    """Return the ``(start, stop)`` bounds of the runs of ``True`` values in
+    `mask`."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0]))
+
+
+def _copy_rows(src: LGDO, dst: LGDO, n_rows: int, field_mask=None) -> None:
+    """Copy the first `n_rows` rows of `src` into `dst`, which must have the
+    same structure. Arrays in `dst` are resized only if too short. For
+    structs and tables, only fields selected by `field_mask` are copied."""
+    if isinstance(src, Struct):
+        field_mask = _make_field_mask(field_mask)
+        for field, obj in src.items():
+            if field_mask[field] and field in dst:
+                _copy_rows(obj, dst[field], n_rows)
+        if isinstance(src, Table):
+            dst.loc = src.loc
+    elif isinstance(src, VectorOfVectors):
+        _copy_rows(src.cumulative_length, dst.cumulative_length, n_rows)
+        fd_rows = int(src.cumulative_length.nda[n_rows - 1]) if n_rows > 0 else 0
+        _copy_rows(src.flattened_data, dst.flattened_data, fd_rows)
+    elif isinstance(src, Array):
+        if len(dst) < n_rows:
+            dst.resize(n_rows)
+        dst.nda[:n_rows] = src.nda[:n_rows]
+    elif isinstance(src, Scalar):
+        dst.value = src.value
+    else:
+        raise RuntimeError(f"don't know how to copy {type(src).__name__}")
+
+
+def _array_fields(
+    name: str,
+    h5f: h5py.File,
+    obj_buf: LGDO,
+    field_mask: dict[str, bool] | list[str] | tuple[str] | None = None,
+) -> list[tuple[str, LGDO]]:
+    """List the ``(name, buffer)`` pairs of the array-like objects (arrays and
+    vectors of vectors) that :meth:`LH5Store.read_object` reads from `name`
+    into `obj_buf`, descending into (nested) tables."""
+    if not isinstance(obj_buf, Table):
+        return [(name, obj_buf)]
+
+    field_mask = _make_field_mask(field_mask)
+    _, _, elements = parse_datatype(h5f[name].attrs["datatype"])
+    fields = []
+    for field in elements:
+        if not field_mask[field]:
+            continue
+        if field not in obj_buf:
+            raise ValueError(f"obj_buf for LGDO Table '{name}' not formatted correctly")
+        fields += _array_fields(f"{name}/{field}", h5f, obj_buf[field])
+    return fields
+
+
+def _has_vector_of_vectors(obj: LGDO) -> bool:
+    """Whether `obj` is or contains a :class:`.VectorOfVectors`."""
+    if isinstance(obj, Struct):
+        return any(_has_vector_of_vectors(obj[field]) for field in obj.keys())
+    return isinstance(obj, VectorOfVectors)
+
+
+def _gather_rows(
+    srcs: list[LGDO], n_rows: list[int], dst: LGDO, dst_start: int, copies: list
+) -> None:
+    """Prepare the concatenation of the first ``n_rows[i]`` rows of each of
+    `srcs` into `dst`, starting at row `dst_start`.
+
+    `dst` is resized once to its final size and cumulative lengths of vectors
+    of vectors are filled in. Functions copying the array data into disjoint
+    slices of `dst` are appended to `copies`, such that they can be run
+    concurrently.
+    """
+    n_rows_tot = sum(n_rows)
+    if isinstance(dst, Struct):
+        for field in srcs[0].keys():
+            if field in dst:
+                _gather_rows(
+                    [src[field] for src in srcs], n_rows, dst[field], dst_start, copies
+                )
+        if isinstance(dst, Table):
+            dst.resize()
+    elif isinstance(dst, VectorOfVectors):
+        cl_buf = dst.cumulative_length
+        if len(cl_buf) < dst_start + n_rows_tot:
+            cl_buf.resize(dst_start + n_rows_tot)
+        fd_start = int(cl_buf.nda[dst_start - 1]) if dst_start > 0 else 0
+
+        fd_n_rows = []
+        start = dst_start
+        fd_offset = fd_start
+        for src, n in zip(srcs, n_rows):
+            cl = src.cumulative_length.nda[:n]
+            cl_buf.nda[start : start + n] = cl + fd_offset
+            fd_n_rows.append(int(cl[-1]) if n > 0 else 0)
+            start += n
+            fd_offset += fd_n_rows[-1]
+
+        _gather_rows(
+            [src.flattened_data for src in srcs],
+            fd_n_rows,
+            dst.flattened_data,
+            fd_start,
+            copies,
+        )
+    elif isinstance(dst, Array):
+        if len(dst) < dst_start + n_rows_tot:
+            dst.resize(dst_start + n_rows_tot)
+        start = dst_start
+        for src, n in zip(srcs, n_rows):
+            copies.append(partial(np.copyto, dst.nda[start : start + n], src.nda[:n]))
+            start += n
+    else:
+        raise RuntimeError(f"don't know how to gather {type(dst).__name__}")
+
+
+def _read_rows(ds: h5py.Dataset, idx: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """Read the rows `idx` (sorted in increasing order) of an array-like
+    dataset into `out` (or a new array).
+
+    Indices are coalesced into runs of rows falling in the same or in adjacent
+    storage chunks (blocks of about :data:`SPARSE_READ_BLOCK_SIZE` bytes for
+    contiguous datasets). If the runs cover more than
+    :data:`SPARSE_READ_MAX_DENSITY` of the index range, the whole range is read
+    at once. Otherwise, only the runs are read, in batches of at most
+    :data:`SPARSE_READ_MAX_RUNS` selected with a union of hyperslabs. The
+    requested rows are then gathered from the read data, such that memory
+    usage is bounded by the size of the touched chunks rather than by the size
+    of the dataset.
+    """
+    idx = np.asarray(idx, dtype="int64")
+    row_shape = ds.shape[1:]
+    if out is None:
+        out = np.empty((len(idx),) + row_shape, dtype=ds.dtype)
+    if len(idx) == 0:
+        return out
+
+    # dense selections are read in one go
+    lo, hi = int(idx[0]), int(idx[-1]) + 1
+    if len(idx) > SPARSE_READ_MAX_DENSITY * (hi - lo):
+        buf = ds[lo:hi]
+        out[...] = buf[idx - lo if lo > 0 else idx]
+        return out
+
+    # coalesce indices into runs of touched chunks
+    if ds.chunks is not None:
+        block_rows = ds.chunks[0]
+    else:
+        row_nbytes = ds.dtype.itemsize * int(np.prod(row_shape, dtype="int64"))
+        block_rows = max(SPARSE_READ_BLOCK_SIZE // max(row_nbytes, 1), 1)
+    blocks = idx // block_rows
+    breaks = np.nonzero(np.diff(blocks) > 1)[0] + 1
+    run_first = np.concatenate(([0], breaks))
+    run_last = np.concatenate((breaks, [len(idx)])) - 1
+    starts = idx[run_first]
+    stops = idx[run_last] + 1
+
+    # the runs might still be dense
+    if np.sum(stops - starts) > SPARSE_READ_MAX_DENSITY * (hi - lo):
+        run_first, run_last = run_first[:1], run_last[-1:]
+        starts, stops = starts[:1], stops[-1:]
+
+    lengths = stops - starts
+    batches = range(0, len(starts), SPARSE_READ_MAX_RUNS)
+    buf_rows = max(int(np.sum(lengths[b : b + SPARSE_READ_MAX_RUNS])) for b in batches)
+    buf = np.empty((buf_rows,) + row_shape, dtype=ds.dtype)
+
+    for b in batches:
+        b_starts = starts[b : b + SPARSE_READ_MAX_RUNS]
+        b_lengths = lengths[b : b + SPARSE_READ_MAX_RUNS]
+        _read_runs(ds, b_starts, b_lengths, buf)
+
+        # gather the requested rows from the runs
+        first = run_first[b]
+        last = run_last[min(b + SPARSE_READ_MAX_RUNS, len(starts)) - 1] + 1
+        b_idx = idx[first:last]
+        if len(b_starts) == 1:
+            out[first:last] = buf[b_idx - b_starts[0]]
+        else:
+            run = np.searchsorted(b_starts, b_idx, "right") - 1
+            offsets = np.cumsum(b_lengths) - b_lengths
+            out[first:last] = buf[offsets[run] + b_idx - b_starts[run]]
+
+    return out
+
+
+def _read_runs(
+    ds: h5py.Dataset, starts: np.ndarray, lengths: np.ndarray, buf: np.ndarray
+) -> None:
+    """Read the runs of rows ``[starts[i], starts[i] + lengths[i])`` of an
+    array-like dataset, one after the other, into the beginning of `buf`.
+    The runs are selected at once with a union of hyperslabs."""
+    n_buf = int(np.sum(lengths))
+    row_shape = ds.shape[1:]
+    if len(starts) == 1:
+        ds.read_direct(buf, np.s_[starts[0] : starts[0] + n_buf], np.s_[0:n_buf])
+        return
+
+    fspace = ds.id.get_space()
+    fspace.select_none()
+    for start, length in zip(starts, lengths):
+        fspace.select_hyperslab(
+            (int(start),) + (0,) * len(row_shape),
+            (int(length),) + row_shape,
+            op=h5py.h5s.SELECT_OR,
+        )
+    mspace = h5py.h5s.create_simple((n_buf,) + row_shape)
+    ds.id.read(mspace, fspace, buf[:n_buf])
+
+
+def _read_segments(
+    ds: h5py.Dataset, starts: np.ndarray, stops: np.ndarray, out: np.ndarray
+) -> None:
+    """Read the segments of rows ``[starts[i], stops[i])`` (sorted in
+    increasing order and not empty) of a 1D dataset, one after the other,
+    into `out`.
+
+    Segments are coalesced and read like the rows in :func:`_read_rows`, then
+    copied into `out` with :func:`.vovutils.copy_segments`. Unlike an
+    index with one entry per row, the memory needed to describe the selection
+    scales with the number of segments, not of rows.
+    """
+    if len(starts) == 0:
+        return
+    if len(starts) == 1:
+        ds.read_direct(out, np.s_[starts[0] : stops[0]], np.s_[0 : len(out)])
+        return
+
+    # dense selections are read in one go
+    lo, hi = int(starts[0]), int(stops[-1])
+    if len(out) > SPARSE_READ_MAX_DENSITY * (hi - lo):
+        copy_segments(ds[lo:hi], starts - lo, stops - lo, out)
+        return
+
+    # coalesce segments into runs of touched chunks
+    if ds.chunks is not None:
+        block_rows = ds.chunks[0]
+    else:
+        block_rows = max(SPARSE_READ_BLOCK_SIZE // ds.dtype.itemsize, 1)
+    breaks = np.nonzero(starts[1:] // block_rows - (stops[:-1] - 1) // block_rows > 1)
+    breaks = breaks[0] + 1
+    run_first = np.concatenate(([0], breaks))
+    run_last = np.concatenate((breaks, [len(starts)])) - 1
+    run_starts = starts[run_first]
+    run_lengths = stops[run_last] - run_starts
+
+    # the runs might still be dense
+    if np.sum(run_lengths) > SPARSE_READ_MAX_DENSITY * (hi - lo):
+        copy_segments(ds[lo:hi], starts - lo, stops - lo, out)
+        return
+
+    batches = range(0, len(run_starts), SPARSE_READ_MAX_RUNS)
+    buf_rows = max(
+        int(np.sum(run_lengths[b : b + SPARSE_READ_MAX_RUNS])) for b in batches
+    )
+    buf = np.empty(buf_rows, dtype=ds.dtype)
+
+    out_start = 0
+    for b in batches:
+        b_starts = run_starts[b : b + SPARSE_READ_MAX_RUNS]
+        b_lengths = run_lengths[b : b + SPARSE_READ_MAX_RUNS]
+        _read_runs(ds, b_starts, b_lengths, buf)
+
+        # locate the segments in the read runs and copy them out
+        first = run_first[b]
+        last = run_last[min(b + SPARSE_READ_MAX_RUNS, len(run_starts)) - 1] + 1
+        seg_starts = starts[first:last]
+        seg_lengths = stops[first:last] - seg_starts
+        run = np.searchsorted(b_starts, seg_starts, "right") - 1
+        buf_starts = np.cumsum(b_lengths)[run] - b_lengths[run]
+        buf_starts += seg_starts - b_starts[run]
+        n_out = int(np.sum(seg_lengths))
+        copy_segments(
+            buf,
+            buf_starts,
+            buf_starts + seg_lengths,
+            out[out_start : out_start + n_out],
+        )
+        out_start += n_out
+
+
+def _memmap_dataset(ds: h5py.Dataset) -> np.memmap | None:
+    """Memory-map an array-like HDF5 dataset.
+
+    Returns ``None`` if the dataset can't be mapped, i.e. if its data is not
+    stored contiguously and unfiltered in the file (chunked, compact, external
+    or not yet allocated storage), if the file is not opened with the default
+    driver or if the data type is not numeric.
+    """
+    if ds.chunks is not None or ds.file.driver != "sec2":
+        return None
+    if ds.dtype.kind not in "biufc" or ds.dtype.hasobject:
+        return None
+
+    dcpl = ds.id.get_create_plist()
+    if dcpl.get_layout() != h5py.h5d.CONTIGUOUS or dcpl.get_external_count() > 0:
+        return None
+    offset = ds.id.get_offset()
+    if offset is None:
+        return None
+
+    return np.memmap(
+        ds.file.filename,
+        dtype=ds.dtype,
+        mode="r",
+        offset=offset,
+        shape=(_get_dataset_n_rows(ds),) + ds.shape[1:],
+    )
+
+
+def _get_dataset_n_rows(ds: h5py.Dataset) -> int:
+    """Number of rows (logical length) of an array-like HDF5 dataset."""
+    if LOGICAL_LENGTH_ATTR in ds.attrs:
+        return int(ds.attrs[LOGICAL_LENGTH_ATTR])
+    return ds.shape[0]
+
+
+def _split_hdf5_settings(
+    hdf5_settings: dict[str, Any] | None,
+) -> tuple[dict[str, Any], dict[str, dict]]:
+    """Split `hdf5_settings` into dataset settings and per-field settings.
+
+    See :meth:`LH5Store.write_object` for the format of `hdf5_settings`.
+    """
+    ds_settings = {}
+    field_settings = {}
+    if hdf5_settings is None:
+        return ds_settings, field_settings
+
+    for key, value in hdf5_settings.items():
+        if key in HDF5_SETTINGS_KEYS or key == "zone_map":
+            ds_settings[key] = value
+        elif isinstance(value, dict):
+            field_settings[key] = value
+        else:
+            raise ValueError(
+                f"'{key}' is neither an HDF5 dataset setting "
+                f"({', '.join(HDF5_SETTINGS_KEYS)}) nor a field name"
+            )
+
+    return ds_settings, field_settings
+
+
+def _make_create_dataset_kwargs(
+    ds_settings: dict[str, Any], shape: tuple[int, ...]
+) -> dict[str, Any]:
+    """Translate dataset settings into :meth:`h5py.Group.create_dataset`
+    keyword arguments for a dataset of shape `shape`."""
+    kwargs = dict(ds_settings)
+    kwargs.pop("zone_map", None)
+
+    chunks = kwargs.get("chunks", None)
+    # chunk shapes coming from JSON configs are lists
+    if isinstance(chunks, (list, tuple)):
+        chunks = tuple(chunks)
+        # chunk shapes specified for less dimensions than the dataset has are
+        # completed with the full extent of the remaining dimensions
+        if len(chunks) < len(shape):
+            chunks += tuple(max(n, 1) for n in shape[len(chunks) :])
+        kwargs["chunks"] = chunks
+    # h5py uses a contiguous layout if chunks are not given at all
+    elif chunks is False:
+        del kwargs["chunks"]
+
+    return kwargs
+
+
+def _get_hdf5_settings(ds: h5py.Dataset) -> dict[str, Any]:
+    """Get the storage filter settings of an HDF5 dataset.
+
+    Returns an empty dictionary if the dataset is not filtered, otherwise
+    settings in the format accepted by :meth:`LH5Store.write_object`.
+    """
+    settings = {}
+    if ds.compression is not None:
+        settings["compression"] = ds.compression
+        if ds.compression_opts is not None:
+            settings["compression_opts"] = ds.compression_opts
+    if ds.shuffle:
+        settings["shuffle"] = True
+    if ds.fletcher32:
+        settings["fletcher32"] = True
+    if ds.scaleoffset is not None:
+        settings["scaleoffset"] = ds.scaleoffset
+
+    if settings and ds.chunks is not None:
+        settings["chunks"] = ds.chunks
+
+    return settings
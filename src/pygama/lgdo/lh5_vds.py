@@ -0,0 +1,205 @@
+"""
+This module implements *run views*: LH5 files made of HDF5 virtual datasets
+that concatenate an LGDO (typically a table) stored in many LH5 files, such
+that it can be read from a single file with :meth:`.LH5Store.read_object` or
+:class:`.LH5Iterator`.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any
+
+import h5py
+import numpy as np
+
+from pygama.lgdo.lgdo_utils import expand_path
+from pygama.lgdo.lh5_layout import LOGICAL_LENGTH_ATTR
+from pygama.lgdo.lh5_zonemap import ZONE_MAP_SUFFIX
+
+log = logging.getLogger(__name__)
+
+
+def build_run_view(
+    lh5_files: str | list[str],
+    name: str,
+    out_file: str,
+    out_name: str | None = None,
+    overwrite: bool = False,
+) -> None:
+    """Write a run view of object `name` in `lh5_files` to `out_file`.
+
+    Array datasets are written as HDF5 virtual datasets mapping, one after
+    the other, the rows of the corresponding datasets in `lh5_files` (see
+    :meth:`h5py.Group.create_virtual_dataset`). The data is not copied, the
+    source files are referenced by absolute path and must stay in place. The
+    cumulative lengths of :class:`.VectorOfVectors` need to be shifted by
+    the number of elements in the previous files and are therefore written as
+    regular datasets. :class:`.Scalar` objects are copied from the first
+    file.
+
+    Examples
+    --------
+    >>> build_run_view("cycles/*.lh5", "ch000/raw", "run_view.lh5")
+    >>> tbl, n_rows = LH5Store().read_object("ch000/raw", "run_view.lh5")
+
+    Parameters
+    ----------
+    lh5_files
+        the files containing the object, in the order in which rows are
+        concatenated. May include wildcards and environment variables.
+    name
+        name of the object (including its group path).
+    out_file
+        the output file. It is created if it does not exist.
+    out_name
+        name of the object in `out_file`. Defaults to `name`.
+    overwrite
+        if ``True``, replace `out_name` if it exists in `out_file`. Otherwise
+        raise a :class:`RuntimeError`.
+    """
+    if isinstance(lh5_files, str):
+        lh5_files = [lh5_files]
+    lh5_files = [
+        os.path.abspath(f) for f_wc in lh5_files for f in expand_path(f_wc, True)
+    ]
+    if len(lh5_files) == 0:
+        raise ValueError("no input files")
+    name = name.strip("/")
+    out_name = name if out_name is None else out_name.strip("/")
+
+    # walk the object in each file first, such that only one file is open at
+    # a time
+    scans = []
+    for f in lh5_files:
+        with h5py.File(f, "r") as h5f:
+            if name not in h5f:
+                raise KeyError(f"'{name}' not in {f}")
+            scans.append(_scan(h5f[name]))
+
+    with h5py.File(out_file, "a") as out:
+        if out_name in out:
+            if not overwrite:
+                raise RuntimeError(f"'{out_name}' already exists in {out_file}")
+            del out[out_name]
+
+        parent_name, key = os.path.split(out_name)
+        parent = out.require_group(parent_name) if parent_name else out
+        _write(parent, key, scans, lh5_files, [f"/{name}"] * len(lh5_files), None)
+        _update_struct_datatype(parent)
+
+
+def _scan(obj: h5py.HLObject) -> dict[str, Any]:
+    """Collect what is needed to build a run view of `obj`."""
+    info = {"attrs": dict(obj.attrs)}
+    if isinstance(obj, h5py.Group):
+        info["children"] = {
+            k: _scan(v) for k, v in obj.items() if not k.endswith(ZONE_MAP_SUFFIX)
+        }
+        return info
+
+    info["shape"] = obj.shape
+    info["dtype"] = obj.dtype
+    info["n_rows"] = int(obj.attrs.get(LOGICAL_LENGTH_ATTR, (obj.shape or [0])[0]))
+    if obj.shape == () or obj.name.endswith("/cumulative_length"):
+        info["data"] = obj[()] if obj.shape == () else obj[: info["n_rows"]]
+    return info
+
+
+def _write(
+    group: h5py.Group,
+    key: str,
+    scans: list[dict[str, Any]],
+    files: list[str],
+    paths: list[str],
+    n_rows: list[int] | None,
+) -> None:
+    """Write the run view of objects described by `scans` (from `paths` in
+    `files`) as `key` in `group`, taking `n_rows` rows from each file."""
+    ref = scans[0]
+    attrs = {k: v for k, v in ref["attrs"].items() if k != LOGICAL_LENGTH_ATTR}
+
+    if "children" in ref:
+        for scan, file in zip(scans[1:], files[1:]):
+            if scan.get("children", {}).keys() != ref["children"].keys():
+                raise ValueError(f"structure of {paths[0]} differs in {file}")
+        grp = group.create_group(key)
+        grp.attrs.update(attrs)
+        children = ref["children"]
+
+        # vector of vectors: shift the cumulative lengths
+        if "cumulative_length" in children and "flattened_data" in children:
+            cls = [s["children"]["cumulative_length"]["data"] for s in scans]
+            if n_rows is not None:
+                cls = [cl[:n] for cl, n in zip(cls, n_rows)]
+            fd_rows = [int(cl[-1]) if len(cl) > 0 else 0 for cl in cls]
+            offsets = np.cumsum([0] + fd_rows[:-1])
+            cl_out = np.concatenate(
+                [cl + np.asarray(o, dtype=cl.dtype) for cl, o in zip(cls, offsets)]
+            )
+            ds = grp.create_dataset("cumulative_length", data=cl_out, maxshape=(None,))
+            ds.attrs.update(
+                {
+                    k: v
+                    for k, v in children["cumulative_length"]["attrs"].items()
+                    if k != LOGICAL_LENGTH_ATTR
+                }
+            )
+            _write(
+                grp,
+                "flattened_data",
+                [s["children"]["flattened_data"] for s in scans],
+                files,
+                [f"{p}/flattened_data" for p in paths],
+                fd_rows,
+            )
+            return
+
+        # the fields of a struct don't share rows
+        if attrs.get("datatype", "struct").startswith("struct"):
+            n_rows = None
+        for k in children:
+            _write(
+                grp,
+                k,
+                [s["children"][k] for s in scans],
+                files,
+                [f"{p}/{k}" for p in paths],
+                n_rows,
+            )
+        return
+
+    # scalar
+    if ref["shape"] == ():
+        ds = group.create_dataset(key, data=ref["data"])
+        ds.attrs.update(attrs)
+        return
+
+    if n_rows is None:
+        n_rows = [s["n_rows"] for s in scans]
+    for scan, file in zip(scans[1:], files[1:]):
+        if scan["dtype"] != ref["dtype"] or scan["shape"][1:] != ref["shape"][1:]:
+            raise ValueError(f"type or shape of {paths[0]} differs in {file}")
+
+    layout = h5py.VirtualLayout(
+        shape=(sum(n_rows),) + ref["shape"][1:], dtype=ref["dtype"]
+    )
+    start = 0
+    for scan, file, path, n in zip(scans, files, paths, n_rows):
+        if n == 0:
+            continue
+        source = h5py.VirtualSource(file, path, shape=scan["shape"])
+        layout[start : start + n] = source[:n]
+        start += n
+    ds = group.create_virtual_dataset(key, layout)
+    ds.attrs.update(attrs)
+
+
+def _update_struct_datatype(group: h5py.Group) -> None:
+    """Make the datatype of struct `group` (and of its parents) list the
+    fields actually present. Groups without datatype become structs."""
+    while group.name != "/":
+        if not group.attrs.get("datatype", "struct").startswith("struct"):
+            break
+        group.attrs["datatype"] = "struct{" + ",".join(group.keys()) + "}"
+        group = group.parent
@@ -0,0 +1,404 @@
+"""
+This module implements zone maps of LH5 columns: summaries (minimum, maximum
+and number of NaNs) of each block of a fixed number of rows of a numeric
+:class:`.Array`, stored in a dataset next to the column. They are used to
+skip blocks of rows that cannot pass a selection, without reading them. The
+time range of each file of a dataset can be indexed in a sidecar file as well,
+to skip whole files (see :func:`build_time_index`).
+"""
+from __future__ import annotations
+
+import ast
+import logging
+import operator
+import os
+
+import h5py
+import numba as nb
+import numpy as np
+
+from pygama.lgdo.lgdo_utils import expand_path
+from pygama.lgdo.lh5_layout import LOGICAL_LENGTH_ATTR
+from pygama.lgdo.utils import numba_defaults_kwargs as nb_kwargs
+
+log = logging.getLogger(__name__)
+
+#: Suffix of the name of the dataset holding the zone map of a column.
+ZONE_MAP_SUFFIX = "_zonemap"
+
+#: Default number of rows summarized by each entry of a zone map.
+DEFAULT_BLOCK_SIZE = 4096
+
+# maximum number of rows read at once when building zone maps
+_READ_ROWS = 2**20
+
+
+def zone_map_dtype(dtype: np.dtype) -> np.dtype:
+    """Data type of the zone map of a column of type `dtype`."""
+    return np.dtype([("min", dtype), ("max", dtype), ("n_nan", "uint64")])
+
+
+def has_zone_map(ds: h5py.Dataset) -> bool:
+    """Whether dataset `ds` can have a zone map, i.e. is a numeric 1D column
+    of a table."""
+    return (
+        isinstance(ds, h5py.Dataset)
+        and ds.ndim == 1
+        and ds.dtype.kind in "iuf"
+        and not ds.name.endswith(ZONE_MAP_SUFFIX)
+        and ds.parent.attrs.get("datatype", "").startswith("table")
+    )
+
+
+def compute_zone_map(nda: np.ndarray, block_size: int) -> np.ndarray:
+    """Compute the zone map of the 1D array `nda`.
+
+    Returns a structured array with fields ``min``, ``max`` and ``n_nan``
+    holding, for each block of `block_size` rows (the last one being possibly
+    shorter), the minimum and maximum values (ignoring NaNs, NaN if all values
+    are NaNs) and the number of NaNs.
+    """
+    n_blocks = -(-len(nda) // block_size)
+    zm = np.empty(n_blocks, dtype=zone_map_dtype(nda.dtype))
+    mins = np.empty(n_blocks, dtype=nda.dtype)
+    maxs = np.empty(n_blocks, dtype=nda.dtype)
+    n_nans = np.zeros(n_blocks, dtype="uint64")
+    _nb_zone_map(nda, block_size, mins, maxs, n_nans)
+    zm["min"] = mins
+    zm["max"] = maxs
+    zm["n_nan"] = n_nans
+    return zm
+
+
+@nb.njit(**nb_kwargs)
+def _nb_zone_map(data, block_size, mins, maxs, n_nans):
+    for ib in range(len(mins)):
+        start = ib * block_size
+        stop = min(start + block_size, len(data))
+        # stays NaN if all values are NaNs
+        lo = hi = data[start]
+        first = True
+        for i in range(start, stop):
+            v = data[i]
+            if v != v:
+                n_nans[ib] += 1
+            elif first:
+                lo = hi = v
+                first = False
+            elif v < lo:
+                lo = v
+            elif v > hi:
+                hi = v
+        mins[ib] = lo
+        maxs[ib] = hi
+
+
+def update_zone_map(
+    ds: h5py.Dataset, block_size: int | None = None, start_row: int = 0
+) -> None:
+    """Write or update the zone map of column `ds`.
+
+    The zone map is stored in the dataset named like `ds` followed by
+    :data:`ZONE_MAP_SUFFIX`, in the same group. Only the blocks from the one
+    containing `start_row` on are recomputed (e.g. after appending rows). If
+    `block_size` is ``None``, the block size of the existing zone map (or
+    :data:`DEFAULT_BLOCK_SIZE`) is used. A zone map with a different block
+    size is rebuilt.
+    """
+    if not has_zone_map(ds):
+        raise ValueError(f"cannot make a zone map of {ds.name}")
+
+    group = ds.parent
+    name = ds.name.split("/")[-1] + ZONE_MAP_SUFFIX
+    zm_ds = group.get(name)
+    if zm_ds is not None:
+        if block_size is None:
+            block_size = int(zm_ds.attrs["block_size"])
+        same_dtype = zm_ds.dtype == zone_map_dtype(ds.dtype)
+        if block_size != zm_ds.attrs["block_size"] or not same_dtype:
+            del group[name]
+            zm_ds = None
+    if block_size is None:
+        block_size = DEFAULT_BLOCK_SIZE
+    if block_size < 1:
+        raise ValueError("block_size must be positive")
+
+    n_rows = int(ds.attrs.get(LOGICAL_LENGTH_ATTR, ds.shape[0]))
+    n_blocks = -(-n_rows // block_size)
+    first_block = 0
+    if zm_ds is None:
+        zm_ds = group.create_dataset(
+            name,
+            shape=(n_blocks,),
+            maxshape=(None,),
+            dtype=zone_map_dtype(ds.dtype),
+            chunks=True,
+        )
+        zm_ds.attrs["block_size"] = block_size
+    else:
+        first_block = min(start_row // block_size, zm_ds.shape[0])
+        zm_ds.resize((n_blocks,))
+
+    step = max(1, _READ_ROWS // block_size)
+    for b in range(first_block, n_blocks, step):
+        b_stop = min(b + step, n_blocks)
+        data = ds[b * block_size : min(b_stop * block_size, n_rows)]
+        zm_ds[b:b_stop] = compute_zone_map(data, block_size)
+
+
+def remove_zone_map(group: h5py.Group, name: str) -> None:
+    """Delete the zone map of column `name` in `group`, if any."""
+    if name + ZONE_MAP_SUFFIX in group:
+        del group[name + ZONE_MAP_SUFFIX]
+
+
+def read_zone_map(ds: h5py.Dataset) -> tuple[np.ndarray, int] | None:
+    """Read the zone map of column `ds` and its block size.
+
+    Returns ``None`` if `ds` has no zone map.
+    """
+    zm_ds = ds.parent.get(ds.name.split("/")[-1] + ZONE_MAP_SUFFIX)
+    if not isinstance(zm_ds, h5py.Dataset):
+        return None
+    return zm_ds[()], int(zm_ds.attrs["block_size"])
+
+
+def build_zone_maps(
+    lh5_file: str | h5py.File, name: str, block_size: int = DEFAULT_BLOCK_SIZE
+) -> None:
+    """Build the zone maps of all numeric columns of LH5 table `name`.
+
+    Nested tables are visited as well. Meant to be used on already written
+    files, see also the ``zone_map`` setting of
+    :meth:`.LH5Store.write_object`.
+    """
+    if not isinstance(lh5_file, h5py.File):
+        with h5py.File(lh5_file, "a") as f:
+            return build_zone_maps(f, name, block_size)
+
+    # the file can't be modified while visiting it
+    columns = []
+
+    def visit(_, obj: h5py.HLObject) -> None:
+        if has_zone_map(obj):
+            columns.append(obj)
+
+    lh5_file[name].visititems(visit)
+    for ds in columns:
+        log.debug(f"building zone map of {ds.name}")
+        update_zone_map(ds, block_size)
+
+
+def file_time_range(
+    lh5_file: str | h5py.File, name: str, time_col: str = "timestamp"
+) -> tuple[float, float]:
+    """Minimum and maximum (ignoring NaNs) of column `time_col` of LH5 table
+    `name`, NaNs if it has no rows.
+
+    They are taken from the zone map of the column if it covers all rows, else
+    the column is read.
+    """
+    if not isinstance(lh5_file, h5py.File):
+        with h5py.File(lh5_file, "r") as f:
+            return file_time_range(f, name, time_col)
+
+    ds = lh5_file[f"{name}/{time_col}"]
+    n_rows = int(ds.attrs.get(LOGICAL_LENGTH_ATTR, ds.shape[0]))
+    zm = read_zone_map(ds)
+    if zm is not None and len(zm[0]) == -(-n_rows // zm[1]):
+        mins, maxs = zm[0]["min"], zm[0]["max"]
+    else:
+        mins = maxs = ds[:n_rows]
+    mins = mins[~np.isnan(mins)] if mins.dtype.kind == "f" else mins
+    maxs = maxs[~np.isnan(maxs)] if maxs.dtype.kind == "f" else maxs
+    if len(mins) == 0:
+        return np.nan, np.nan
+    return float(mins.min()), float(maxs.max())
+
+
+def build_time_index(
+    index_file: str,
+    lh5_files: str | list[str],
+    name: str,
+    time_col: str = "timestamp",
+) -> None:
+    """Write the time range of each of `lh5_files` to the sidecar HDF5 file
+    `index_file`.
+
+    The minimum and maximum of column `time_col` of LH5 table `name` in each
+    file (see :func:`file_time_range`) are stored in group
+    ``{name}/{time_col}`` of `index_file`, sorted by minimum, replacing any
+    previous index of the same column. :meth:`.LH5Store.read_time_range` then
+    only opens the files overlapping the requested time range. The index must
+    be rebuilt if the files change. Files missing from it are always opened.
+    """
+    if isinstance(lh5_files, str):
+        lh5_files = [lh5_files]
+    paths = [os.path.realpath(f) for f_wc in lh5_files for f in expand_path(f_wc, True)]
+    ranges = np.array([file_time_range(f, name, time_col) for f in paths], "float64")
+    ranges = ranges.reshape(-1, 2)
+    # NaNs (files without rows) are sorted last
+    order = np.argsort(ranges[:, 0], kind="stable")
+
+    with h5py.File(index_file, "a") as f:
+        group_name = f"{name}/{time_col}"
+        if group_name in f:
+            del f[group_name]
+        group = f.create_group(group_name)
+        group.create_dataset(
+            "file", data=[paths[i] for i in order], dtype=h5py.string_dtype()
+        )
+        group.create_dataset("min", data=ranges[order, 0])
+        group.create_dataset("max", data=ranges[order, 1])
+    log.debug(f"indexed the time range of {len(paths)} files in {index_file}")
+
+
+def read_time_index(
+    index_file: str, name: str, time_col: str = "timestamp"
+) -> tuple[list[str], np.ndarray, np.ndarray] | None:
+    """Read the files, minimum and maximum times written by
+    :func:`build_time_index`, sorted by minimum.
+
+    Returns ``None`` if `index_file` has no index of column `time_col` of
+    table `name`.
+    """
+    if not os.path.exists(index_file):
+        return None
+    with h5py.File(index_file, "r") as f:
+        group = f.get(f"{name}/{time_col}")
+        if not isinstance(group, h5py.Group):
+            return None
+        files = [p.decode() if isinstance(p, bytes) else p for p in group["file"][()]]
+        return files, group["min"][()], group["max"][()]
+
+
+def time_index_files(
+    index: tuple[list[str], np.ndarray, np.ndarray], t0: float, t1: float
+) -> set[str]:
+    """Files of time index `index` (see :func:`read_time_index`) that may
+    hold times in the range [`t0`, `t1`)."""
+    files, mins, maxs = index
+    # files starting before t1, by binary search on the sorted minima
+    n = np.searchsorted(mins, t1, "left")
+    return {files[i] for i in np.nonzero(maxs[:n] >= t0)[0]}
+
+
+_COMPARE_OPS = {
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+_FLIPPED_OPS = {
+    ast.Gt: ast.Lt,
+    ast.GtE: ast.LtE,
+    ast.Lt: ast.Gt,
+    ast.LtE: ast.GtE,
+    ast.Eq: ast.Eq,
+    ast.NotEq: ast.NotEq,
+}
+
+
+def rows_may_match(expr: str, group: h5py.Group, rows: np.ndarray) -> np.ndarray | None:
+    """Find the `rows` of the table in `group` that might pass selection
+    `expr`, according to the zone maps of its columns.
+
+    Comparisons between a column and a constant (e.g. ``energy > 1000``),
+    combined with ``and``/``&`` and ``or``/``|``, are taken into account.
+    Nested columns are written as ``table__column``, as in
+    :meth:`.Table.eval`. Any other term, or columns without zone map, are
+    assumed to be passed by all rows.
+
+    Returns a boolean mask over `rows`, ``None`` if nothing can be excluded
+    from the zone maps.
+    """
+    try:
+        tree = ast.parse(expr.strip(), mode="eval").body
+    except SyntaxError:
+        return None
+
+    rows = np.asarray(rows)
+    zone_maps = {}
+
+    def get_zone_map(col: str) -> tuple[np.ndarray, int] | None:
+        if col not in zone_maps:
+            zone_maps[col] = None
+            for path in (col, col.replace("__", "/")):
+                ds = group.get(path)
+                if isinstance(ds, h5py.Dataset) and has_zone_map(ds):
+                    zone_maps[col] = read_zone_map(ds)
+                    break
+        return zone_maps[col]
+
+    def compare(left: ast.AST, op: ast.cmpop, right: ast.AST) -> np.ndarray | None:
+        if not isinstance(left, ast.Name):
+            if not isinstance(right, ast.Name):
+                return None
+            if type(op) not in _FLIPPED_OPS:
+                return None
+            left, right = right, left
+            op = _FLIPPED_OPS[type(op)]()
+        if type(op) not in _COMPARE_OPS:
+            return None
+        try:
+            value = ast.literal_eval(right)
+        except (ValueError, TypeError):
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+
+        zm = get_zone_map(left.id)
+        if zm is None:
+            return None
+        zm, block_size = zm
+
+        if isinstance(op, ast.Eq):
+            blocks = (zm["min"] <= value) & (zm["max"] >= value)
+        elif isinstance(op, ast.NotEq):
+            blocks = (zm["min"] != value) | (zm["max"] != value) | (zm["n_nan"] > 0)
+        elif isinstance(op, (ast.Gt, ast.GtE)):
+            blocks = _COMPARE_OPS[type(op)](zm["max"], value)
+        else:
+            blocks = _COMPARE_OPS[type(op)](zm["min"], value)
+
+        # rows not covered by the zone map might match
+        i_block = rows // block_size
+        covered = i_block < len(blocks)
+        mask = np.ones(len(rows), dtype=bool)
+        mask[covered] = blocks[i_block[covered]]
+        return mask
+
+    def combine(masks: list[np.ndarray | None], is_and: bool) -> np.ndarray | None:
+        if is_and:
+            masks = [m for m in masks if m is not None]
+            if len(masks) == 0:
+                return None
+            return np.logical_and.reduce(masks)
+        if any(m is None for m in masks):
+            return None
+        return np.logical_or.reduce(masks)
+
+    def visit(node: ast.AST) -> np.ndarray | None:
+        if isinstance(node, ast.BoolOp):
+            return combine(
+                [visit(v) for v in node.values], isinstance(node.op, ast.And)
+            )
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+            return combine(
+                [visit(node.left), visit(node.right)], isinstance(node.op, ast.BitAnd)
+            )
+        if isinstance(node, ast.Compare):
+            operands = [node.left] + node.comparators
+            return combine(
+                [
+                    compare(operands[i], op, operands[i + 1])
+                    for i, op in enumerate(node.ops)
+                ],
+                True,
+            )
+        return None
+
+    return visit(tree)
@@ -60,6 +60,10 @@ class Struct(LGDO, dict):
     def __setitem__(self, name: str, obj: LGDO) -> None:
         return self.add_field(name, obj)
 
+    def __reduce__(self) -> tuple:
+        # the attributes must be restored before the fields, see add_field()
+        return (_restore_struct, (type(self), self.__dict__, dict(self)))
+
     def __getattr__(self, name: str) -> LGDO:
         if hasattr(super(), name):
             return super().__getattr__(name)
@@ -138,4 +142,14 @@ class Struct(LGDO, dict):
             "converting to a NumPy, Pandas or Awkward is generally "
             "not possible. Call view_as() on the fields instead."
         )
-        raise NotImplementedError(msg)
\ No newline at end of file
+        raise NotImplementedError(msg)
+
+
+def _restore_struct(
+    cls: type, state: dict[str, Any], fields: dict[str, LGDO]
+) -> Struct:
+    """Unpickle a :class:`Struct` (or subclass) instance."""
+    obj = cls.__new__(cls)
+    obj.__dict__.update(state)
+    dict.update(obj, fields)
+    return obj
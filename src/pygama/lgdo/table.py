@@ -6,7 +6,9 @@ equal length and corresponding utilities.
 from __future__ import annotations
 
 import logging
-from collections.abc import Mapping
+from collections.abc import Callable, Mapping
+from functools import lru_cache
+from types import CodeType
 from typing import Any
 from warnings import warn
 
@@ -255,7 +257,7 @@ class Table(Struct):
 
     def eval(
         self,
-        expr: str,
+        expr: str | Mapping[str, Mapping[str, Any]],
         parameters: Mapping[str, str] | None = None,
     ) -> LGDO:
         """Apply column operations to the table and return a new LGDO.
@@ -286,6 +288,11 @@ class Table(Struct):
             :func:`eval` is used and :class:`ak.Array` transforms can be used
             through the ``ak.`` prefix. (NumPy functions are analogously
             accessible through ``np.``). See also examples below.
+
+            Can also be an ordered mapping of operations, in the format
+            accepted by :class:`TableEvaluator`. A :class:`Table` holding the
+            results is returned in this case. Use :class:`TableEvaluator`
+            directly to evaluate the same operations on many tables.
         parameters
             a dictionary of function parameters. Passed to
             :func:`numexpr.evaluate`` as `local_dict` argument or to
@@ -308,24 +315,24 @@ class Table(Struct):
         >>> print(tbl.eval("np.sum(a) + ak.sum(b)"))
         41
         """
+        if isinstance(expr, Mapping):
+            return TableEvaluator(expr, parameters=parameters).eval(self)
+
         if parameters is None:
             parameters = {}
 
         # get the valid python variable names in the expression
-        c = compile(expr, "0vbb is real!", "eval")
+        c = _compile_expr(expr)
 
         # make a dictionary of low-level objects (numpy or awkward)
         # for later computation
-        flat_self = self.flatten()
         self_unwrap = {}
         has_ak = False
         for obj in c.co_names:
-            if obj in flat_self:
-                if isinstance(flat_self[obj], VectorOfVectors):
-                    self_unwrap[obj] = flat_self[obj].view_as("ak", with_units=False)
-                    has_ak = True
-                else:
-                    self_unwrap[obj] = flat_self[obj].view_as("np", with_units=False)
+            col = _get_column(self, obj)
+            if col is not None:
+                self_unwrap[obj] = _view_column(col)
+                has_ak = has_ak or isinstance(col, VectorOfVectors)
 
         msg = f"evaluating {expr!r} with locals={(self_unwrap | parameters)} and {has_ak=}"
         log.debug(msg)
@@ -342,40 +349,17 @@ class Table(Struct):
 
             # need to convert back to LGDO
             # np.evaluate should always return a numpy thing?
-            if out_data.ndim == 0:
-                return Scalar(out_data.item())
-            if out_data.ndim == 1:
-                return Array(out_data)
-            if out_data.ndim == 2:
-                return ArrayOfEqualSizedArrays(nda=out_data)
-
-            msg = (
-                f"evaluation resulted in {out_data.ndim}-dimensional data, "
-                "I don't know which LGDO this corresponds to"
-            )
-            raise RuntimeError(msg)
+            return _to_lgdo(out_data)
 
         # resort to good ol' eval()
         globs = {"ak": ak, "np": np}
-        out_data = eval(expr, globs, (self_unwrap | parameters))
+        out_data = eval(c, globs, (self_unwrap | parameters))
 
         msg = f"...the result is {out_data!r}"
         log.debug(msg)
 
         # need to convert back to LGDO
-        if isinstance(out_data, ak.Array):
-            if out_data.ndim == 1:
-                return Array(out_data.to_numpy())
-            return VectorOfVectors(out_data)
-
-        if np.isscalar(out_data):
-            return Scalar(out_data)
-
-        msg = (
-            f"evaluation resulted in a {type(out_data)} object, "
-            "I don't know which LGDO this corresponds to"
-        )
-        raise RuntimeError(msg)
+        return _to_lgdo(out_data)
 
     def __str__(self):
         opts = fmt.get_dataframe_repr_params()
@@ -414,6 +398,11 @@ class Table(Struct):
 
         - ``pd``: returns a :class:`pandas.DataFrame`
         - ``ak``: returns an :class:`ak.Array` (record type)
+        - ``arrow``: returns a :class:`pyarrow.Table` (requires the
+          :mod:`pyarrow` package), sharing the memory of the columns (see
+          the ``view_as()`` methods of the column types). Nested tables are
+          viewed as struct columns. With `with_units`, units are stored in
+          the ``units`` metadata field of the columns.
 
         Notes
         -----
@@ -477,5 +466,318 @@ class Table(Struct):
             # to extra LGDO fields (like "attrs")
             return ak.Array({col: self[col].view_as("ak") for col in cols})
 
+        if library == "arrow":
+            # optional dependency
+            import pyarrow as pa
+
+            arrays = []
+            fields = []
+            for col in cols:
+                data = self[col]
+                if isinstance(data, Table):
+                    sub = data.view_as("arrow", with_units=with_units)
+                    array = pa.StructArray.from_arrays(
+                        [c.chunk(0) for c in sub.columns], fields=list(sub.schema)
+                    )
+                else:
+                    array = data.view_as("arrow")
+
+                metadata = None
+                if with_units and "units" in data.attrs:
+                    metadata = {"units": data.attrs["units"]}
+                arrays.append(array)
+                fields.append(pa.field(col, array.type, metadata=metadata))
+
+            return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
         msg = f"{library!r} is not a supported third-party format."
-        raise TypeError(msg)
\ No newline at end of file
+        raise TypeError(msg)
+
+
+class LazyTable(Table):
+    """A :class:`Table` whose columns are loaded on first access.
+
+    Columns are given as functions (taking no arguments) that return the
+    column LGDO. A function is called when its column is first accessed,
+    e.g. through ``tbl[name]``, :meth:`~Table.view_as` with `cols` or
+    :meth:`~Table.eval`, and its result is memoized. :meth:`flatten` does not
+    load any column. Operations involving all columns (:meth:`~Table.resize`,
+    writing to disk, etc.) load all of them.
+
+    See Also
+    --------
+    .LH5Store.read_object
+    """
+
+    def __init__(
+        self,
+        size: int,
+        col_dict: Mapping[str, LGDO | Callable[[], LGDO]],
+        attrs: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        size
+            the number of rows of the table (and of the loaded columns).
+        col_dict
+            named columns or functions returning them.
+        attrs
+            A set of user attributes to be carried along with this LGDO.
+        """
+        Struct.__init__(self, obj_dict=col_dict, attrs=attrs)
+        self.size = size
+        self.loc = 0
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether column `name` has been loaded already."""
+        return not callable(dict.__getitem__(self, name))
+
+    def __getitem__(self, name: str) -> LGDO:
+        obj = super().__getitem__(name)
+        if callable(obj):
+            log.debug(f"loading column {name!r}")
+            obj = obj()
+            dict.__setitem__(self, name, obj)
+        return obj
+
+    def __getattr__(self, name: str) -> LGDO:
+        if name in self.keys():
+            return self[name]
+        return super().__getattr__(name)
+
+    def get(self, name: str, default: Any = None) -> LGDO:
+        return self[name] if name in self else default
+
+    def values(self) -> list[LGDO]:
+        return [self[name] for name in self.keys()]
+
+    def items(self) -> list[tuple[str, LGDO]]:
+        return [(name, self[name]) for name in self.keys()]
+
+    def flatten(self, _prefix="") -> LazyTable:
+        """Flatten the table, if nested, without loading any column.
+
+        Nested tables that are not loaded yet (e.g. waveform tables read
+        lazily by :meth:`.LH5Store.read_object`) are kept as single columns.
+        """
+        col_dict = {}
+        for key in self.keys():
+            obj = dict.__getitem__(self, key)
+            if isinstance(obj, Table):
+                flat = obj.flatten(_prefix=f"{_prefix}{key}__")
+                col_dict |= {k: dict.__getitem__(flat, k) for k in flat.keys()}
+            else:
+                col_dict[_prefix + key] = obj
+
+        return LazyTable(size=self.size, col_dict=col_dict)
+
+
+class TableEvaluator:
+    """Evaluate an ordered mapping of column operations on tables.
+
+    The operations are parsed once and can then be evaluated on many tables
+    with the same columns, typically the chunks of a file read with an
+    :class:`.LH5Iterator`. Each operation can use the table columns and the
+    results of the previous operations, which are shared and not recomputed.
+    Results are written into output buffers that are allocated at the first
+    evaluation and reused (and grown, if needed) afterwards, such that
+    repeated evaluations do not allocate memory, except for results that are
+    :class:`.VectorOfVectors` with a growing number of elements.
+
+    See :meth:`Table.eval` for the expression syntax.
+
+    Examples
+    --------
+    >>> from pygama.lgdo import LH5Iterator, TableEvaluator
+    >>> ev = TableEvaluator(
+    ...     {
+    ...         "calE": {
+    ...             "expression": "a + b * trapEmax",
+    ...             "parameters": {"a": 1.23, "b": 0.42},
+    ...         },
+    ...         "AoE": {"expression": "A_max / calE"},
+    ...     }
+    ... )
+    >>> for tbl, _, n_rows in LH5Iterator("dsp.lh5", "geds/dsp"):
+    ...     out = ev.eval(tbl)
+    ...     print(out.AoE.nda)
+    """
+
+    def __init__(
+        self,
+        operations: Mapping[str, Mapping[str, Any]],
+        parameters: Mapping[str, Any] | None = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        operations
+            ordered mapping of output column names to operations. Each
+            operation is a dictionary holding an ``expression`` and optionally
+            ``parameters`` (see `parameters` in :meth:`Table.eval`).
+        parameters
+            parameters shared by all operations. Parameters of an operation
+            take precedence.
+        """
+        if parameters is None:
+            parameters = {}
+
+        self.operations = {}
+        for name, op in operations.items():
+            self.operations[name] = (
+                op["expression"],
+                _compile_expr(op["expression"]),
+                dict(parameters) | dict(op.get("parameters", {})),
+            )
+
+        # output table, its columns are the output buffers
+        self._out = None
+
+    def eval(self, tbl: Table) -> Table:
+        """Evaluate the operations on `tbl`.
+
+        Returns a table with one column for each operation, in order. The
+        table and its columns are reused by the next call, copy them if they
+        need to persist.
+        """
+        if self._out is None:
+            self._out = Table(size=len(tbl))
+        self._out.resize(len(tbl))
+
+        # low-level views of the results, for the next operations
+        results = {}
+        for name, (expr, code, parameters) in self.operations.items():
+            local_dict = dict(parameters)
+            has_ak = False
+            for var in code.co_names:
+                if var in local_dict:
+                    continue
+                if var in results:
+                    local_dict[var] = results[var]
+                else:
+                    col = _get_column(tbl, var)
+                    if col is None:
+                        # e.g. a function name
+                        continue
+                    local_dict[var] = _view_column(col)
+                has_ak = has_ak or isinstance(local_dict[var], ak.Array)
+
+            log.debug(f"evaluating {name} = {expr!r} with {has_ak=}")
+            buf = self._out.get(name)
+            if has_ak:
+                obj = self._eval_ak(code, local_dict, buf)
+            else:
+                obj = self._eval_numexpr(expr, local_dict, buf, len(tbl))
+
+            if obj is not buf:
+                log.debug(f"allocated new output buffer for {name}")
+                self._out.add_column(name, obj)
+            results[name] = _view_column(obj)
+
+        return self._out
+
+    def _eval_numexpr(
+        self,
+        expr: str,
+        local_dict: dict[str, Any],
+        buf: LGDO | None,
+        n_rows: int,
+    ) -> LGDO:
+        if isinstance(buf, Array):
+            buf.resize(n_rows)
+            try:
+                ne.evaluate(expr, local_dict=local_dict, out=buf.nda)
+                return buf
+            except (TypeError, ValueError):
+                # the type or shape of the result changed
+                pass
+
+        return _to_lgdo(ne.evaluate(expr, local_dict=local_dict))
+
+    def _eval_ak(
+        self, code: CodeType, local_dict: dict[str, Any], buf: LGDO | None
+    ) -> LGDO:
+        out_data = eval(code, {"ak": ak, "np": np}, local_dict)
+
+        if isinstance(out_data, ak.Array) and out_data.ndim <= 2:
+            if out_data.ndim == 1:
+                data = out_data.to_numpy()
+                if (
+                    type(buf) is Array
+                    and buf.dtype == data.dtype
+                    and buf.nda.shape[1:] == data.shape[1:]
+                ):
+                    buf.resize(len(data))
+                    buf.nda[:] = data
+                    return buf
+            else:
+                data = ak.flatten(out_data).to_numpy()
+                if (
+                    isinstance(buf, VectorOfVectors)
+                    and buf.ndim == 2
+                    and buf.dtype == data.dtype
+                ):
+                    buf.resize(0)
+                    buf.append_many(data, ak.num(out_data).to_numpy())
+                    return buf
+
+        return _to_lgdo(out_data)
+
+
+@lru_cache(maxsize=1024)
+def _compile_expr(expr: str) -> CodeType:
+    """Compile `expr`, to get the variable names it uses and evaluate it."""
+    return compile(expr, "0vbb is real!", "eval")
+
+
+def _get_column(tbl: Table, name: str) -> LGDO | None:
+    """Get a column from `tbl`, where `name` can refer to a column in a
+    subtable (see :meth:`Table.flatten`). Return ``None`` if not found."""
+    if name in tbl:
+        obj = tbl[name]
+        return None if isinstance(obj, Table) else obj
+    for key in tbl.keys():
+        if name.startswith(f"{key}__") and isinstance(tbl[key], Table):
+            col = _get_column(tbl[key], name[len(key) + 2 :])
+            if col is not None:
+                return col
+    return None
+
+
+def _view_column(obj: LGDO) -> np.ndarray | ak.Array:
+    """View a column as NumPy array, or as Awkward array if needed."""
+    if isinstance(obj, VectorOfVectors):
+        return obj.view_as("ak", with_units=False)
+    return obj.view_as("np", with_units=False)
+
+
+def _to_lgdo(out_data: Any) -> LGDO:
+    """Convert the result of an evaluation back to LGDO."""
+    if isinstance(out_data, ak.Array):
+        if out_data.ndim == 1:
+            return Array(out_data.to_numpy())
+        return VectorOfVectors(out_data)
+
+    if isinstance(out_data, np.ndarray):
+        if out_data.ndim == 0:
+            return Scalar(out_data.item())
+        if out_data.ndim == 1:
+            return Array(out_data)
+        if out_data.ndim == 2:
+            return ArrayOfEqualSizedArrays(nda=out_data)
+
+        msg = (
+            f"evaluation resulted in {out_data.ndim}-dimensional data, "
+            "I don't know which LGDO this corresponds to"
+        )
+        raise RuntimeError(msg)
+
+    if np.isscalar(out_data):
+        return Scalar(out_data)
+
+    msg = (
+        f"evaluation resulted in a {type(out_data)} object, "
+        "I don't know which LGDO this corresponds to"
+    )
+    raise RuntimeError(msg)
@@ -18,12 +18,60 @@ from numpy.typing import ArrayLike, DTypeLike, NDArray
 import pygama.lgdo.lgdo_utils as utils
 import pygama.lgdo.arrayofequalsizedarrays as aoesa
 import pygama.lgdo.vovutils as vovutils
-from pygama.lgdo.array import Array
+from pygama.lgdo.array import Array, _nda_to_arrow
 from pygama.lgdo.lgdo import LGDO
 
 log = logging.getLogger(__name__)
 
 
+class CumulativeLengthArray(Array):
+    """An :class:`.Array` of cumulative vector lengths, stored right after a
+    leading zero.
+
+    The buffer holding the leading zero is the *offsets* array of the vector
+    of vectors (as defined by Awkward Array), which is therefore available
+    without copy through :attr:`offsets`. Used internally by
+    :class:`VectorOfVectors`.
+    """
+
+    def _set_nda(self, value: np.ndarray) -> None:
+        value = np.asarray(value)
+        offsets = np.empty(len(value) + 1, dtype=value.dtype)
+        offsets[0] = 0
+        offsets[1:] = value
+        self._set_offsets(offsets)
+
+    nda = property(Array.nda.fget, _set_nda, doc=Array.nda.__doc__)
+
+    def _set_offsets(self, offsets: np.ndarray) -> None:
+        self._offsets = offsets
+        Array.nda.fset(self, offsets[1:])
+
+    @classmethod
+    def from_offsets(
+        cls, offsets: NDArray, attrs: Mapping[str, Any] | None = None
+    ) -> CumulativeLengthArray:
+        """Build from an offsets array (starting with 0), without copy."""
+        cl = cls.__new__(cls)
+        cl._set_offsets(offsets)
+        LGDO.__init__(cl, attrs)
+        return cl
+
+    @property
+    def offsets(self) -> NDArray:
+        """View of the cumulative lengths, prepended with a 0."""
+        if self._nda.base is not self._offsets:
+            # e.g. the buffer was replaced by a copy
+            self._set_nda(self.nda)
+        return self._offsets[: len(self) + 1]
+
+    def _alloc(self, capacity: int) -> np.ndarray:
+        offsets = np.empty(capacity + 1, dtype=self._nda.dtype)
+        offsets[0] = 0
+        self._offsets = offsets
+        return offsets[1:]
+
+
 class VectorOfVectors(LGDO):
     """A n-dimensional variable-length 1D array of variable-length 1D arrays.
 
@@ -99,9 +147,16 @@ class VectorOfVectors(LGDO):
         attrs
             a set of user attributes to be carried along with this LGDO.
         """
-        # sanitize
-        if cumulative_length is not None and not isinstance(cumulative_length, Array):
-            cumulative_length = Array(cumulative_length)
+        # sanitize. cumulative_length is stored after a leading zero, such that
+        # the offsets needed by Awkward are available without copy
+        if isinstance(cumulative_length, Array) and not isinstance(
+            cumulative_length, CumulativeLengthArray
+        ):
+            cumulative_length = CumulativeLengthArray(
+                cumulative_length.nda, attrs=cumulative_length.getattrs()
+            )
+        elif cumulative_length is not None and not isinstance(cumulative_length, Array):
+            cumulative_length = CumulativeLengthArray(cumulative_length)
         if flattened_data is not None and not isinstance(
             flattened_data, (Array, VectorOfVectors)
         ):
@@ -146,8 +201,11 @@ class VectorOfVectors(LGDO):
 
             # start from innermost VoV and build nested structure
             for i in range(data.ndim - 2, -1, -1):
-                # NOTE: remember, omit the leading 0 from ak.Array offsets
-                cumulative_length = np.copy(container[f"node{i}-offsets"][1:])
+                # NOTE: the leading 0 of the ak.Array offsets is kept in front
+                # of cumulative_length
+                cumulative_length = CumulativeLengthArray.from_offsets(
+                    np.copy(container[f"node{i}-offsets"])
+                )
 
                 if i != 0:
                     # at the beginning of the loop: initialize innermost
@@ -302,26 +360,23 @@ class VectorOfVectors(LGDO):
          [3],
         ]
         """
-        if self.ndim == 2:
-            vidx = self.cumulative_length
-            old_s = len(self)
-            dlen = new_size - old_s
-            csum = vidx[-1] if len(self) > 0 else 0
-
-            # first resize the cumulative length
-            self.cumulative_length.resize(new_size)
-
-            # if new_size > size, new elements are filled with zeros, let's fix
-            # that
-            if dlen > 0:
-                self.cumulative_length[old_s:] = csum
-
-            # then resize the data array
-            # if dlen > 0 this has no effect
-            if len(self.cumulative_length) > 0:
-                self.flattened_data.resize(self.cumulative_length[-1])
-        else:
-            raise NotImplementedError
+        vidx = self.cumulative_length
+        old_s = len(self)
+        dlen = new_size - old_s
+        csum = vidx[-1] if len(self) > 0 else 0
+
+        # first resize the cumulative length
+        self.cumulative_length.resize(new_size)
+
+        # if new_size > size, new elements are filled with zeros, let's fix
+        # that
+        if dlen > 0:
+            self.cumulative_length[old_s:] = csum
+
+        # then resize the data array
+        # if dlen > 0 this has no effect
+        if len(self.cumulative_length) > 0:
+            self.flattened_data.resize(self.cumulative_length[-1])
 
     def append(self, new: NDArray) -> None:
         """Append a 1D vector `new` at the end.
@@ -337,17 +392,64 @@ class VectorOfVectors(LGDO):
         ]
         """
         if self.ndim == 2:
-            # first extend cumulative_length by +1
-            self.cumulative_length.resize(len(self) + 1)
-            # set it at the right value
-            newlen = (
-                self.cumulative_length[-2] + len(new) if len(self) > 1 else len(new)
-            )
-            self.cumulative_length[-1] = newlen
-            # then resize flattened_data to accommodate the new vector
-            self.flattened_data.resize(len(self.flattened_data) + len(new))
-            # finally set it
-            self[-1] = new
+            new = np.asarray(new)
+            self.append_many(new, np.array([len(new)]))
+        else:
+            raise NotImplementedError
+
+    def append_many(self, flattened_data: NDArray, lengths: ArrayLike) -> None:
+        """Append many vectors at once.
+
+        The internal buffers grow geometrically (see :class:`.Array`), such
+        that repeated calls have an amortized cost proportional to the size of
+        the appended data.
+
+        Parameters
+        ----------
+        flattened_data
+            the concatenated vectors.
+        lengths
+            the length of each vector.
+
+        Examples
+        --------
+        >>> vov = VectorOfVectors([[1, 2, 3], [4, 5]])
+        >>> vov.append_many([8, 9, 10], [1, 0, 2])
+        >>> print(vov)
+        [[1 2 3],
+         [4 5],
+         [8],
+         [],
+         [9 10],
+        ]
+        """
+        if self.ndim == 2:
+            lengths = np.asarray(lengths)
+            n = len(self)
+            start = self.cumulative_length.nda[-1] if n > 0 else 0
+            stop = start + lengths.sum()
+            if len(flattened_data) != stop - start:
+                msg = (
+                    f"flattened_data has length {len(flattened_data)}, "
+                    f"{stop - start} was expected from lengths"
+                )
+                raise ValueError(msg)
+
+            self.cumulative_length.resize(n + len(lengths))
+            np.cumsum(lengths, out=self.cumulative_length.nda[n:])
+            self.cumulative_length.nda[n:] += start
+
+            self.flattened_data.resize(stop)
+            self.flattened_data.nda[start:stop] = flattened_data
+        else:
+            raise NotImplementedError
+
+    def extend(self, other: VectorOfVectors) -> None:
+        """Append the vectors of `other` at the end."""
+        if self.ndim == 2 and other.ndim == 2:
+            cl = other.cumulative_length.nda
+            stop = cl[-1] if len(cl) > 0 else 0
+            self.append_many(other.flattened_data.nda[:stop], np.diff(cl, prepend=0))
         else:
             raise NotImplementedError
 
@@ -369,21 +471,29 @@ class VectorOfVectors(LGDO):
 
         Warning
         -------
-        This method involves a significant amount of memory re-allocation and
-        is expected to perform poorly on large vectors.
+        The data stored after index `i` has to be moved, this method is
+        expected to perform poorly if called repeatedly on large vectors.
         """
         if self.ndim == 2:
             if i >= len(self):
                 msg = f"index {i} is out of bounds for vector owith size {len(self)}"
                 raise IndexError(msg)
 
-            self.flattened_data = Array(
-                np.insert(self.flattened_data, self.cumulative_length[i - 1], new)
-            )
-            self.cumulative_length = Array(
-                np.insert(self.cumulative_length, i, self.cumulative_length[i - 1])
-            )
-            self.cumulative_length[i:] += np.uint32(len(new))
+            n = len(self)
+            n_new = len(new)
+            cl = self.cumulative_length.nda
+            start = cl[i - 1] if i > 0 else 0
+            end = cl[-1]
+
+            self.flattened_data.resize(max(len(self.flattened_data), end + n_new))
+            fd = self.flattened_data.nda
+            fd[start + n_new : end + n_new] = fd[start:end]
+            fd[start : start + n_new] = new
+
+            self.cumulative_length.resize(n + 1)
+            cl = self.cumulative_length.nda
+            cl[i + 1 :] = cl[i:n] + n_new
+            cl[i] = start + n_new
         else:
             raise NotImplementedError
 
@@ -405,38 +515,34 @@ class VectorOfVectors(LGDO):
 
         Warning
         -------
-        This method involves a significant amount of memory re-allocation and
-        is expected to perform poorly on large vectors.
+        If the length of the vector changes, the data stored after index `i`
+        has to be moved, this method is expected to perform poorly if called
+        repeatedly on large vectors.
         """
         if self.ndim == 2:
             if i >= len(self):
                 msg = f"index {i} is out of bounds for vector with size {len(self)}"
                 raise IndexError(msg)
 
-            vidx = self.cumulative_length
-            dlen = len(new) - len(self[i])
-
-            if dlen == 0:
-                # don't waste resources
-                self[i] = new
-            elif dlen < 0:
-                start = vidx[i - 1]
-                stop = start + len(new)
-                # set the already allocated indices
-                self.flattened_data[start:stop] = new
-                # then delete the extra indices
-                self.flattened_data = Array(
-                    np.delete(self.flattened_data, np.s_[stop : vidx[i]])
-                )
-            else:
-                # set the already allocated indices
-                self.flattened_data[vidx[i - 1] : vidx[i]] = new[: len(self[i])]
-                # then insert the remaining
-                self.flattened_data = Array(
-                    np.insert(self.flattened_data, vidx[i], new[len(self[i]) :])
-                )
+            vidx = self.cumulative_length.nda
+            start = vidx[i - 1] if i != 0 and i != -len(self) else 0
+            stop = vidx[i]
+            end = vidx[-1]
+            dlen = len(new) - (stop - start)
+
+            if dlen != 0:
+                # move the following vectors
+                if dlen > 0:
+                    self.flattened_data.resize(
+                        max(len(self.flattened_data), end + dlen)
+                    )
+                fd = self.flattened_data.nda
+                fd[stop + dlen : end + dlen] = fd[stop:end]
+                if dlen < 0:
+                    self.flattened_data.resize(len(self.flattened_data) + dlen)
+                vidx[i:] = vidx[i:] + dlen
 
-            vidx[i:] = vidx[i:] + dlen
+            self.flattened_data.nda[start : start + len(new)] = new
         else:
             raise NotImplementedError
 
@@ -579,6 +685,28 @@ class VectorOfVectors(LGDO):
 
         raise NotImplementedError
 
+    def _view_offsets(self) -> NDArray:
+        """Offsets of the vectors, for views in third-party formats.
+
+        The rows of a partially filled buffer past the last one read (e.g. in
+        the last block of an :class:`.LH5Iterator`) hold stale cumulative
+        lengths. If the offsets are not monotonically increasing or point past
+        the flattened data, these rows are made empty vectors (or truncated) in
+        a copy of the offsets, such that the views are always valid.
+        """
+        if isinstance(self.cumulative_length, CumulativeLengthArray):
+            offsets = self.cumulative_length.offsets
+        else:
+            offsets = CumulativeLengthArray(self.cumulative_length.nda).offsets
+
+        n_data = len(self.flattened_data)
+        if len(offsets) > 1 and (
+            offsets[-1] > n_data or np.any(offsets[1:] < offsets[:-1])
+        ):
+            offsets = np.maximum.accumulate(offsets)
+            np.minimum(offsets, n_data, out=offsets)
+        return offsets
+
     def view_as(
         self,
         library: str,
@@ -596,14 +724,18 @@ class VectorOfVectors(LGDO):
           ``awkward-pandas`` package)
         - ``np``: returns a :class:`numpy.ndarray`, padded with zeros to make
           it rectangular. This implies memory re-allocation.
-        - ``ak``: returns an :class:`ak.Array`. ``self.cumulative_length`` is
-          currently re-allocated for technical reasons.
+        - ``ak``: returns an :class:`ak.Array` sharing the memory of the
+          vector. The offsets are obtained from ``self.cumulative_length``
+          (see :class:`CumulativeLengthArray`).
+        - ``arrow``: returns a :class:`pyarrow.ListArray` (or
+          :class:`pyarrow.LargeListArray` for 64-bit cumulative lengths)
+          sharing the memory of the vector, in the same way (requires the
+          :mod:`pyarrow` package).
 
         Notes
         -----
-        Awkward array views partially involve memory re-allocation (the
-        `cumulative_length`\ s), while NumPy "exploded" views clearly imply a
-        full copy.
+        Awkward array views are zero-copy, while NumPy "exploded" views clearly
+        imply a full copy.
 
         Parameters
         ----------
@@ -628,18 +760,10 @@ class VectorOfVectors(LGDO):
                 raise ValueError(msg)
 
             # see https://github.com/scikit-hep/awkward/discussions/2848
-
-            # cannot avoid making a copy here. we should add the leading 0 to
-            # cumulative_length inside VectorOfVectors at some point in the
-            # future
-            offsets = np.empty(
-                len(self.cumulative_length) + 1, dtype=self.cumulative_length.dtype
-            )
-            offsets[1:] = self.cumulative_length
-            offsets[0] = 0
+            offsets = self._view_offsets()
 
             content = (
-                ak.contents.NumpyArray(self.flattened_data.nda)
+                ak.contents.NumpyArray(self.flattened_data.nda[: offsets[-1]])
                 if self.ndim == 2
                 else self.flattened_data.view_as(library, with_units=with_units).layout
             )
@@ -665,5 +789,35 @@ class VectorOfVectors(LGDO):
 
             return akpd.from_awkward(self.view_as("ak"))
 
+        if library == "arrow":
+            if attach_units:
+                msg = "Arrow arrays can't hold units, you must view the data with_units=False"
+                raise ValueError(msg)
+
+            # optional dependency
+            import pyarrow as pa
+
+            offsets = self._view_offsets()
+
+            values = (
+                _nda_to_arrow(self.flattened_data.nda[: offsets[-1]])
+                if self.ndim == 2
+                else self.flattened_data.view_as(library)
+            )
+
+            # Arrow offsets are signed
+            if offsets.dtype.kind not in "iu":
+                offsets = offsets.astype(np.int64)
+            if offsets.dtype.itemsize <= 4:
+                offsets = (
+                    offsets.view(np.int32)
+                    if offsets.dtype.itemsize == 4
+                    else offsets.astype(np.int32)
+                )
+                return pa.ListArray.from_arrays(_nda_to_arrow(offsets), values)
+
+            offsets = offsets.view(np.int64)
+            return pa.LargeListArray.from_arrays(_nda_to_arrow(offsets), values)
+
         msg = f"{library} is not a supported third-party format."
         raise ValueError(msg)
\ No newline at end of file
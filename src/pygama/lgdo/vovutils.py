@@ -128,6 +128,77 @@ def _nb_fill(aoa_in: NDArray, len_in: NDArray, flattened_array_out: NDArray):
         start = stop
 
 
+@numba.njit(**nb_kwargs)
+def _nb_shift_cl(
+    cumulative_length_in: NDArray, offset: int, cumulative_length_out: NDArray
+) -> None:
+    """Copy `cumulative_length_in` into `cumulative_length_out`, adding
+    `offset`. Used to concatenate vectors of vectors."""
+    for ii in range(len(cumulative_length_in)):
+        cumulative_length_out[ii] = cumulative_length_in[ii] + offset
+
+
+def merge_segments(starts: NDArray, stops: NDArray) -> tuple[NDArray, NDArray]:
+    """Merge the segments ``[starts[i], stops[i])`` that follow each other.
+
+    Empty segments are dropped.
+
+    Examples
+    --------
+    >>> merge_segments(np.array([0, 2, 5, 7]), np.array([2, 4, 5, 9]))
+    (array([0, 7]), array([4, 9]))
+    """
+    starts = np.asarray(starts, dtype="int64")
+    stops = np.asarray(stops, dtype="int64")
+    merged_starts = np.empty_like(starts)
+    merged_stops = np.empty_like(stops)
+    n = _nb_merge_segments(starts, stops, merged_starts, merged_stops)
+    return merged_starts[:n], merged_stops[:n]
+
+
+@numba.njit(**nb_kwargs)
+def _nb_merge_segments(
+    starts: NDArray, stops: NDArray, merged_starts: NDArray, merged_stops: NDArray
+) -> int:
+    n = 0
+    for ii in range(len(starts)):
+        if stops[ii] <= starts[ii]:
+            continue
+        if n > 0 and starts[ii] == merged_stops[n - 1]:
+            merged_stops[n - 1] = stops[ii]
+        else:
+            merged_starts[n] = starts[ii]
+            merged_stops[n] = stops[ii]
+            n += 1
+    return n
+
+
+def copy_segments(
+    array_in: NDArray, starts: NDArray, stops: NDArray, array_out: NDArray
+) -> None:
+    """Copy the segments ``array_in[starts[i]:stops[i]]``, one after the
+    other, into `array_out`."""
+    if array_in.dtype.kind in "biuf" and array_out.dtype.kind in "biuf":
+        _nb_copy_segments(array_in, starts, stops, array_out)
+        return
+
+    start = 0
+    for a, b in zip(starts, stops):
+        array_out[start : start + b - a] = array_in[a:b]
+        start += b - a
+
+
+@numba.njit(**nb_kwargs)
+def _nb_copy_segments(
+    array_in: NDArray, starts: NDArray, stops: NDArray, array_out: NDArray
+) -> None:
+    start = 0
+    for ii in range(len(starts)):
+        n = stops[ii] - starts[ii]
+        array_out[start : start + n] = array_in[starts[ii] : stops[ii]]
+        start += n
+
+
 def explode_cl(cumulative_length: NDArray, array_out: NDArray | None = None) -> NDArray:
     """Explode a `cumulative_length` array.
 
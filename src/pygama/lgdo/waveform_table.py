@@ -215,6 +215,8 @@ class WaveformTable(Table):
             return
         shape = self.values.nda.shape
         shape = (shape[0], wf_len)
+        # the buffer can only be resized in place if it is not a view
+        self.values.trim_capacity()
         self.values.nda.resize(shape, refcheck=True)
 
     def resize_wf_len(self, new_len: int) -> None:
@@ -26,6 +26,8 @@ def build_raw(
     buffer_size: int = 8192,
     n_max: int = np.inf,
     overwrite: bool = False,
+    hdf5_settings: dict = None,
+    growth_factor: float = None,
     **kwargs,
 ) -> None:
     """Convert data into LEGEND HDF5 raw-tier format.
@@ -65,6 +67,19 @@ def build_raw(
     overwrite
         sets whether to overwrite the output file(s) if it (they) already exist.
 
+    hdf5_settings
+        default HDF5 dataset storage settings (chunk shape, compression
+        filters, etc.) for the output data, see
+        :meth:`~.lgdo.lh5_store.LH5Store.write_object`. Buffer-specific
+        settings can be specified with the ``hdf5_settings`` key in
+        `out_spec` (see :mod:`.raw_buffer`) and take precedence.
+
+    growth_factor
+        if not ``None``, over-allocate the output datasets by this factor
+        whenever they need to grow while appending chunks of data, and trim
+        them at the end (see :class:`~.lgdo.lh5_store.LH5Store`). Useful if
+        `buffer_size` is small.
+
     **kwargs
         sent to :class:`.RawBufferLibrary` generation as `kw_dict`.
     """
@@ -204,31 +219,35 @@ def build_raw(
         os.remove(out_file_glob[0])
 
     # Write header data
-    lh5_store = lgdo.LH5Store(keep_open=True)
-    write_to_lh5_and_clear(header_data, lh5_store)
-
-    # Now loop through the data
-    n_bytes_last = streamer.n_bytes_read
-    while True:
-        chunk_list = streamer.read_chunk()
-        if log.getEffectiveLevel() <= logging.INFO and n_max == np.inf:
-            progress_bar.update(streamer.n_bytes_read - n_bytes_last)
-            n_bytes_last = streamer.n_bytes_read
-        if len(chunk_list) == 0:
-            break
-        n_read = 0
-        for rb in chunk_list:
-            if rb.loc > n_max:
-                rb.loc = n_max
-            n_max -= rb.loc
-            n_read += rb.loc
-        if log.getEffectiveLevel() <= logging.INFO and n_max < np.inf:
-            progress_bar.update(n_read)
-        write_to_lh5_and_clear(chunk_list, lh5_store)
-        if n_max <= 0:
-            break
-
-    streamer.close_stream()
+    lh5_store = lgdo.LH5Store(keep_open=True, growth_factor=growth_factor)
+    try:
+        write_to_lh5_and_clear(header_data, lh5_store)
+
+        # Now loop through the data
+        n_bytes_last = streamer.n_bytes_read
+        while True:
+            chunk_list = streamer.read_chunk()
+            if log.getEffectiveLevel() <= logging.INFO and n_max == np.inf:
+                progress_bar.update(streamer.n_bytes_read - n_bytes_last)
+                n_bytes_last = streamer.n_bytes_read
+            if len(chunk_list) == 0:
+                break
+            n_read = 0
+            for rb in chunk_list:
+                if rb.loc > n_max:
+                    rb.loc = n_max
+                n_max -= rb.loc
+                n_read += rb.loc
+            if log.getEffectiveLevel() <= logging.INFO and n_max < np.inf:
+                progress_bar.update(n_read)
+            write_to_lh5_and_clear(chunk_list, lh5_store, hdf5_settings=hdf5_settings)
+            if n_max <= 0:
+                break
+
+        streamer.close_stream()
+    finally:
+        # trims the over-allocated datasets, if any
+        lh5_store.close()
     progress_bar.close()
 
     out_files = rb_lib.get_list_of("out_stream")
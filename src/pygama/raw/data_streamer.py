@@ -108,7 +108,11 @@ class DataStreamer(ABC):
                 out_stream = rb_lib["*"][0].out_stream.format(name=dec_key)
                 key_list = decoder.get_key_list()
                 rb = RawBuffer(
-                    key_list=key_list, out_stream=out_stream, out_name=out_name
+                    key_list=key_list,
+                    out_stream=out_stream,
+                    out_name=out_name,
+                    hdf5_settings=rb_lib["*"][0].hdf5_settings,
+                    compression=rb_lib["*"][0].compression,
                 )
                 rb_lib[dec_name].append(rb)
 
@@ -130,7 +134,11 @@ class DataStreamer(ABC):
                 for key in rb.key_list:
                     expanded_name = rb.out_name.format(key=key)
                     new_rb = RawBuffer(
-                        key_list=[key], out_stream=rb.out_stream, out_name=expanded_name
+                        key_list=[key],
+                        out_stream=rb.out_stream,
+                        out_name=expanded_name,
+                        hdf5_settings=rb.hdf5_settings,
+                        compression=rb.compression,
                     )
                     rb_lib[dec_name].append(new_rb)
 
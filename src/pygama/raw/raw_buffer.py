@@ -36,7 +36,15 @@ keys.
       "FCEventDecoder" : {
         "g{key:0>3d}" : {
           "key_list" : [ [24,64] ],
-          "out_stream" : "$DATADIR/{file_key}_geds.lh5:/geds"
+          "out_stream" : "$DATADIR/{file_key}_geds.lh5:/geds",
+          "hdf5_settings" : {
+            "compression" : "gzip",
+            "shuffle" : true,
+            "waveform" : { "values" : { "chunks" : [ 100 ] } }
+          },
+          "compression" : {
+            "waveform/values" : "RadwareSigcompress(codec_shift=-32768)"
+          }
         },
         "spms" : {
           "key_list" : [ [6,23] ],
@@ -62,9 +70,10 @@ keys.
 from __future__ import annotations
 
 import os
-from typing import Union
+from typing import Any, Union
 
 from pygama import lgdo
+from pygama.lgdo.compression import WaveformCodec, str2wfcodec
 from pygama.lgdo.lh5_store import LH5Store
 
 LGDO = Union[lgdo.Scalar, lgdo.Struct, lgdo.Array, lgdo.VectorOfVectors]
@@ -99,6 +108,14 @@ class RawBuffer:
         - socket example: ``198.0.0.100:8000``
     out_name
         the name or identifier of the object in the output stream.
+    hdf5_settings
+        HDF5 dataset storage settings (chunking, compression, etc.) used when
+        writing the LGDO to an LH5 file. See
+        :meth:`~.lgdo.lh5_store.LH5Store.write_object` for the format.
+    compression
+        waveform codecs (see :mod:`.lgdo.compression`) to be used when writing
+        the LGDO to an LH5 file, keyed by the path of the field to be encoded
+        (e.g. ``waveform/values``).
     """
 
     def __init__(
@@ -107,11 +124,15 @@ class RawBuffer:
         key_list: list[int | str] = None,
         out_stream: str = "",
         out_name: str = "",
+        hdf5_settings: dict[str, Any] = None,
+        compression: dict[str, WaveformCodec] = None,
     ) -> None:
         self.lgdo = lgdo
         self.key_list = [] if key_list is None else key_list
         self.out_stream = out_stream
         self.out_name = out_name
+        self.hdf5_settings = hdf5_settings
+        self.compression = compression
         self.loc = 0
         self.fill_safety = 1
 
@@ -138,6 +159,10 @@ class RawBuffer:
             + repr(self.out_stream)
             + ", out_name="
             + repr(self.out_name)
+            + ", hdf5_settings="
+            + repr(self.hdf5_settings)
+            + ", compression="
+            + repr(self.compression)
             + ", loc="
             + repr(self.loc)
             + ", fill_safety="
@@ -189,6 +214,13 @@ class RawBufferList(list):
                 rb.out_name = json_dict[name]["out_name"]
             else:
                 rb.out_name = name
+            if "hdf5_settings" in json_dict[name]:
+                rb.hdf5_settings = json_dict[name]["hdf5_settings"]
+            if "compression" in json_dict[name]:
+                rb.compression = {
+                    field: str2wfcodec(codec) if isinstance(codec, str) else codec
+                    for field, codec in json_dict[name]["compression"].items()
+                }
             self.append(rb)
 
     def get_list_of(self, attribute: str) -> list:
@@ -248,13 +280,21 @@ class RawBufferLibrary(dict):
               "name" : {
                   "key_list" : [ "key1", "key2", "..." ],
                   "out_stream" : "out_stream_str",
-                  "out_name" : "out_name_str" // (optional)
+                  "out_name" : "out_name_str", // (optional)
+                  "hdf5_settings" : { "compression" : "gzip" }, // (optional)
+                  "compression" : { "field/path" : "Codec(param=val)" } // (optional)
               }
             }
 
         By default ``name`` is used for the :class:`RawBuffer`\ 's ``out_name``
         attribute, but this can be overridden if desired by providing an
-        explicit ``out_name``.
+        explicit ``out_name``. The optional ``hdf5_settings`` set the storage
+        layout (chunk shape, compression filters) of the datasets written to
+        disk, globally or per field. See
+        :meth:`~.lgdo.lh5_store.LH5Store.write_object` for the format. The
+        optional ``compression`` maps the path of fields (e.g.
+        ``waveform/values``) to the waveform codec used to encode them, given
+        as a string parsed by :func:`~.lgdo.compression.utils.str2wfcodec`.
 
         Allowed shorthands, in order of expansion:
 
@@ -390,7 +430,10 @@ def expand_rblist_json_dict(json_dict: dict, kw_dict: dict[str, str]) -> None:
 
 
 def write_to_lh5_and_clear(
-    raw_buffers: list[RawBuffer], lh5_store: LH5Store = None, wo_mode: str = "append"
+    raw_buffers: list[RawBuffer],
+    lh5_store: LH5Store = None,
+    wo_mode: str = "append",
+    hdf5_settings: dict[str, Any] = None,
 ) -> None:
     r"""Write a list of :class:`.RawBuffer`\ s to LH5 files and then clears
     them.
@@ -405,6 +448,10 @@ def write_to_lh5_and_clear(
         files (saves some time opening / closing files)
     wo_mode : str
         write mode, see also :meth:`.lgdo.lh5_store.LH5Store.write_object`
+    hdf5_settings : dict or None
+        default HDF5 dataset storage settings, see also
+        :meth:`.lgdo.lh5_store.LH5Store.write_object`. Updated with the
+        buffer-specific settings in :attr:`RawBuffer.hdf5_settings`.
     """
     if lh5_store is None:
         lh5_store = lgdo.LH5Store()
@@ -422,6 +469,13 @@ def write_to_lh5_and_clear(
                 group = "/"  # in case out_stream ends with :
         # write if requested...
         if filename != "":
+            # waveform codecs are applied on write through the "compression"
+            # attribute of the fields
+            for field, codec in (rb.compression or {}).items():
+                obj = rb.lgdo
+                for key in field.strip("/").split("/"):
+                    obj = obj[key]
+                obj.attrs["compression"] = codec
             lh5_store.write_object(
                 rb.lgdo,
                 rb.out_name,
@@ -429,6 +483,10 @@ def write_to_lh5_and_clear(
                 group=group,
                 n_rows=rb.loc,
                 wo_mode=wo_mode,
+                hdf5_settings={
+                    **({} if hdf5_settings is None else hdf5_settings),
+                    **({} if rb.hdf5_settings is None else rb.hdf5_settings),
+                },
             )
         # and clear
         rb.loc = 0
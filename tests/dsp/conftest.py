@@ -12,6 +12,7 @@ import numpy as np
 import pytest
 from legendtestdata import LegendTestData
 import pygama.dsp.processors  # noqa: F401
+from pygama import lgdo
 from pygama.lgdo import LH5Store
 from pygama.raw.build_raw import build_raw
 
@@ -62,6 +63,59 @@ def spms_raw_tbl(lgnd_test_data):
     return obj
 
 
+@pytest.fixture
+def synth_raw_tbl():
+    rng = np.random.default_rng(0)
+
+    def make_raw_tbl(n_rows, wf_len, dtype="uint16"):
+        """Build a raw table with random waveforms of shape (n_rows, wf_len)."""
+        wfs = lgdo.WaveformTable(
+            values=rng.integers(0, 1000, size=(n_rows, wf_len)).astype(dtype),
+            dt=16,
+            dt_units="ns",
+            t0=0,
+            t0_units="ns",
+        )
+        return lgdo.Table(col_dict={"waveform": wfs})
+
+    return make_raw_tbl
+
+
+@pytest.fixture
+def bl_pz_dsp_config():
+    return {
+        "outputs": ["bl_mean", "wf_pz", "wf_max"],
+        "processors": {
+            "bl_mean, bl_std, bl_slope, bl_intercept": {
+                "function": "linear_slope_fit",
+                "module": "pygama.dsp.processors",
+                "args": [
+                    "waveform[0:100]",
+                    "bl_mean",
+                    "bl_std",
+                    "bl_slope",
+                    "bl_intercept",
+                ],
+            },
+            "wf_blsub": {
+                "function": "bl_subtract",
+                "module": "pygama.dsp.processors",
+                "args": ["waveform", "bl_mean", "wf_blsub"],
+            },
+            "wf_pz": {
+                "function": "pole_zero",
+                "module": "pygama.dsp.processors",
+                "args": ["wf_blsub", 125, "wf_pz"],
+            },
+            "tp_min, tp_max, wf_min, wf_max": {
+                "function": "min_max",
+                "module": "pygama.dsp.processors",
+                "args": ["wf_pz", "tp_min", "tp_max", "wf_min", "wf_max"],
+            },
+        },
+    }
+
+
 @pytest.fixture(scope="session")
 def compare_numba_vs_python():
     def numba_vs_python(func, *inputs):
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from pygama import lgdo
@@ -75,4 +76,45 @@ def test_build_dsp_spms_channelwise(dsp_test_file_spm):
     store = LH5Store()
     lh5_obj, n_rows = store.read_object("/ch0/dsp/energies", dsp_test_file_spm)
     assert isinstance(lh5_obj, lgdo.VectorOfVectors)
-    assert len(lh5_obj) == 5
\ No newline at end of file
+    assert len(lh5_obj) == 5
+
+
+def test_build_dsp_n_processes(synth_raw_tbl, bl_pz_dsp_config):
+    store = LH5Store()
+    f_raw = "/tmp/tmp-pygama-dsp-procs-raw.lh5"
+    for wo_mode, ch, n_rows in [("of", "ch0", 1000), ("a", "ch1", 250)]:
+        tbl = synth_raw_tbl(n_rows, 200)
+        store.write_object(tbl, "raw", f_raw, group=ch, wo_mode=wo_mode)
+
+    dsp_config = bl_pz_dsp_config
+    chan_config = {"ch0/raw": dsp_config, "ch1/raw": dsp_config, "ch2/raw": {}}
+
+    outs = []
+    for i, kwargs in enumerate(
+        [
+            {},
+            {"prefetch": 2},
+            {"growth_factor": 2},
+            {"n_processes": 2},
+            {"n_processes": 2, "share_buffers": False},
+        ]
+    ):
+        f_dsp = f"/tmp/tmp-pygama-dsp-procs-{i}.lh5"
+        build_dsp(
+            f_raw,
+            f_dsp,
+            chan_config=chan_config,
+            buffer_len=300,
+            write_mode="r",
+            **kwargs,
+        )
+        assert ls(f_dsp) == ["ch0", "ch1", "dsp_info"]
+        outs.append([store.read_object(f"{ch}/dsp", f_dsp)[0] for ch in ["ch0", "ch1"]])
+
+    for out in outs[1:]:
+        for tb1, tb2 in zip(outs[0], out):
+            for name in ["bl_mean", "wf_max"]:
+                assert np.array_equal(tb1[name].nda, tb2[name].nda)
+            assert np.array_equal(tb1["wf_pz"].values.nda, tb2["wf_pz"].values.nda)
+        assert len(out[0]) == 1000
+        assert len(out[1]) == 250
@@ -1,7 +1,8 @@
 import pytest
 
 from pygama import lgdo
-from pygama.dsp.processing_chain import build_processing_chain
+from pygama.dsp.errors import ProcessingChainError
+from pygama.dsp.processing_chain import ProcessingChain, build_processing_chain
 import numpy as np
 
 
@@ -298,4 +299,186 @@ def test_output_attrs(geds_raw_tbl):
     }
     proc_chain, _, lh5_out = build_processing_chain(geds_raw_tbl, dsp_config)
     proc_chain.execute(0, 1)
-    assert lh5_out["wf_blsub"].attrs["test_attr"] == "This is a test"
\ No newline at end of file
+    assert lh5_out["wf_blsub"].attrs["test_attr"] == "This is a test"
+
+
+def test_proc_chain_n_threads(synth_raw_tbl, bl_pz_dsp_config):
+    tbl_in = synth_raw_tbl(1000, 500)
+    dsp_config = bl_pz_dsp_config
+    dsp_config["outputs"].append("wf_psd")
+    dsp_config["processors"]["wf_psd"] = {
+        "function": "psd",
+        "module": "pygama.dsp.processors",
+        "args": ["wf_blsub[:100]", "wf_psd"],
+        "init_args": ["wf_blsub[:100]", "wf_psd"],
+    }
+
+    outputs = []
+    for n_threads in [1, 3]:
+        proc_chain, _, tbl_out = build_processing_chain(
+            tbl_in, dsp_config, n_threads=n_threads
+        )
+        proc_chain.execute(0, 990)
+        outputs.append(tbl_out)
+
+    for name in dsp_config["outputs"]:
+        obj = outputs[0][name]
+        nda = obj.values.nda if isinstance(obj, lgdo.WaveformTable) else obj.nda
+        obj_threads = outputs[1][name]
+        nda_threads = (
+            obj_threads.values.nda
+            if isinstance(obj_threads, lgdo.WaveformTable)
+            else obj_threads.nda
+        )
+        assert nda[:990].tobytes() == nda_threads[:990].tobytes()
+
+
+def test_proc_chain_share_buffers(synth_raw_tbl, bl_pz_dsp_config):
+    tbl_in = synth_raw_tbl(100, 300)
+    dsp_config = bl_pz_dsp_config
+    dsp_config["outputs"] = ["bl_mean", "wf_max"]
+    dsp_config["processors"]["wf_trap"] = {
+        "function": "trap_norm",
+        "module": "pygama.dsp.processors",
+        "args": ["wf_pz", 20, 10, "wf_trap"],
+    }
+    dsp_config["processors"]["tp_min, tp_max, wf_min, wf_max"]["args"][0] = "wf_trap"
+
+    proc_chain, _, tbl_out = build_processing_chain(tbl_in, dsp_config)
+    proc_chain.execute()
+    # wf_trap reuses the buffer of wf_blsub
+    n_shared = len(proc_chain._block_buffers)
+    with pytest.raises(ProcessingChainError):
+        proc_chain.link_output_buffer("wf_pz")
+
+    proc_chain, _, tbl_ref = build_processing_chain(
+        tbl_in, dsp_config, share_buffers=False
+    )
+    proc_chain.execute()
+    assert n_shared < len(proc_chain._block_buffers)
+    # the chain can still be extended
+    proc_chain.link_output_buffer("wf_pz")
+    wf_blsub = proc_chain.get_variable("wf_blsub").buffer
+
+    for name in dsp_config["outputs"]:
+        assert np.array_equal(tbl_out[name].nda, tbl_ref[name].nda)
+
+    # variables in keep hold their values
+    proc_chain, _, _ = build_processing_chain(tbl_in, dsp_config, keep=["wf_blsub"])
+    proc_chain.execute()
+    assert np.array_equal(proc_chain.get_variable("wf_blsub").buffer, wf_blsub)
+
+
+def test_proc_chain_hoist_constants(synth_raw_tbl):
+    tbl_in = synth_raw_tbl(50, 300)
+    dsp_config = {
+        "outputs": ["wf_t0", "wf_t0_neg", "wf_t0_neg2"],
+        "processors": {
+            "t0_kernel": {
+                "function": "t0_filter",
+                "module": "pygama.dsp.processors",
+                "args": [8, 16, "t0_kernel(shape=24, dtype='f')"],
+            },
+            "t0_kernel_neg": {
+                "function": "multiply",
+                "module": "numpy",
+                "args": ["t0_kernel", -1, "t0_kernel_neg"],
+            },
+            "wf_t0": {
+                "function": "convolve_wf",
+                "module": "pygama.dsp.processors",
+                "args": [
+                    "waveform",
+                    "t0_kernel",
+                    "'s'",
+                    "wf_t0(shape=300, dtype='f')",
+                ],
+            },
+            "wf_t0_neg": {
+                "function": "convolve_wf",
+                "module": "pygama.dsp.processors",
+                "args": [
+                    "waveform",
+                    "-t0_kernel",
+                    "'s'",
+                    "wf_t0_neg(shape=300, dtype='f')",
+                ],
+            },
+            "wf_t0_neg2": {
+                "function": "convolve_wf",
+                "module": "pygama.dsp.processors",
+                "args": [
+                    "waveform",
+                    "t0_kernel_neg",
+                    "'s'",
+                    "wf_t0_neg2(shape=300, dtype='f')",
+                ],
+            },
+        },
+    }
+
+    proc_chain, _, tbl_out = build_processing_chain(tbl_in, dsp_config)
+    # the kernels are computed once while building the chain
+    assert proc_chain.get_variable("t0_kernel_neg").is_const
+    assert [pm.processor.__name__ for pm in proc_chain._proc_managers] == [
+        "convolve_wf"
+    ] * 3
+    proc_chain.execute()
+
+    wf_t0 = tbl_out["wf_t0"].nda
+    assert np.array_equal(tbl_out["wf_t0_neg"].nda, -wf_t0)
+    assert np.array_equal(tbl_out["wf_t0_neg2"].nda, -wf_t0)
+
+
+def test_proc_chain_zero_copy(monkeypatch, synth_raw_tbl, bl_pz_dsp_config):
+    tbl_in = synth_raw_tbl(100, 300, dtype="float32")
+    wfs = tbl_in["waveform"]
+    wf_in = wfs.values.nda.copy()
+    dsp_config = bl_pz_dsp_config
+
+    # the last block of entries is partial and copied
+    proc_chain, _, tbl_out = build_processing_chain(tbl_in, dsp_config, block_width=16)
+    bound = {
+        name
+        for io_man in proc_chain._input_managers + proc_chain._output_managers
+        for name in io_man.bindings
+    }
+    assert bound == set()
+    proc_chain.execute()
+    bound = {
+        io_man.var.name: name
+        for io_man in proc_chain._input_managers + proc_chain._output_managers
+        for name in io_man.bindings
+    }
+    assert bound["waveform"] == "wf_var"
+    assert bound["bl_mean"] == "raw_var"
+    assert np.array_equal(wfs.values.nda, wf_in)
+
+    with monkeypatch.context() as m:
+        m.setattr(ProcessingChain, "_get_io_bindings", lambda self: [])
+        proc_chain, _, tbl_ref = build_processing_chain(
+            tbl_in, dsp_config, block_width=16
+        )
+        proc_chain.execute()
+
+    for name in ["bl_mean", "wf_max"]:
+        assert np.array_equal(tbl_out[name].nda, tbl_ref[name].nda)
+    assert np.array_equal(tbl_out["wf_pz"].values.nda, tbl_ref["wf_pz"].values.nda)
+
+
+def test_proc_chain_zero_copy_written_input():
+    # an input written in place by a processor is copied, such that the input
+    # buffer is left untouched
+    x = np.arange(32, dtype="float64")
+    y = np.zeros(32)
+    proc_chain = ProcessingChain(block_width=16, buffer_len=32)
+    proc_chain.link_input_buffer("x", x)
+    proc_chain.add_processor(np.multiply, "x", 2.0, "x")
+    proc_chain.add_variable("y", dtype="float64", shape=())
+    proc_chain.add_processor(np.add, "x", 1.0, "y")
+    proc_chain.link_output_buffer("y", y)
+    proc_chain.execute()
+
+    assert proc_chain._input_managers[0].bindings == {}
+    assert np.array_equal(x, np.arange(32))
+    assert np.array_equal(y, 2 * np.arange(32) + 1)
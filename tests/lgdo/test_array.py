@@ -24,3 +24,32 @@ def test_resize():
     array = lgdo.Array(nda=np.array([1, 2, 3, 4]))
     array.resize(3)
     assert (array.nda == np.array([1, 2, 3])).all()
+
+    # new rows are zeros, also within the capacity
+    array.resize(10)
+    assert (array.nda == np.array([1, 2, 3] + [0] * 7)).all()
+
+
+def test_capacity():
+    array = lgdo.Array(nda=np.array([1, 2, 3, 4]))
+    array.resize(3)
+    assert array.get_capacity() == 4
+    assert len(array) == 3
+
+    for i in range(100):
+        array.append(i)
+    assert len(array) == 103
+    assert array.get_capacity() == 128
+    assert (array.nda[3:] == np.arange(100)).all()
+    assert len(array.view_as("np")) == 103
+
+    array.extend(np.arange(5))
+    array.insert(0, [7, 8])
+    assert (array.nda[:5] == [7, 8, 1, 2, 3]).all()
+    assert (array.nda[-5:] == np.arange(5)).all()
+
+    array.trim_capacity()
+    assert array.get_capacity() == len(array) == 110
+    array.resize(2, trim=True)
+    assert array.get_capacity() == 2
+    assert (array.nda == [7, 8]).all()
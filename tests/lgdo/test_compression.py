@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+import pygama.lgdo as lgdo
+from pygama.lgdo import compression
+from pygama.lgdo.compression import RadwareSigcompress, ULEB128ZigZagDiff
+
+
+def _random_walk(shape, dtype, offset=0):
+    rng = np.random.default_rng(42)
+    return (np.cumsum(rng.integers(-20, 21, size=shape), axis=-1) + offset).astype(
+        dtype
+    )
+
+
+@pytest.mark.parametrize(
+    "codec", [RadwareSigcompress(codec_shift=-32768), ULEB128ZigZagDiff()]
+)
+def test_encode_decode_aoesa(codec):
+    wfs = lgdo.ArrayOfEqualSizedArrays(
+        nda=_random_walk((50, 1000), "uint16", offset=15000), attrs={"units": "ADC"}
+    )
+    enc = compression.encode(wfs, codec)
+
+    assert isinstance(enc, lgdo.ArrayOfEncodedEqualSizedArrays)
+    assert len(enc) == 50
+    assert enc.decoded_size.value == 1000
+    assert enc.attrs["codec"] == codec.codec_name()
+    assert enc.attrs["units"] == "ADC"
+    assert len(enc.encoded_data.flattened_data) < wfs.nda.nbytes
+
+    dec = compression.decode(enc)
+    assert isinstance(dec, lgdo.ArrayOfEqualSizedArrays)
+    assert dec.nda.dtype == wfs.nda.dtype
+    assert (dec.nda == wfs.nda).all()
+    assert dec.attrs == wfs.attrs
+
+
+@pytest.mark.parametrize("codec", [RadwareSigcompress(), ULEB128ZigZagDiff()])
+def test_encode_decode_vov(codec):
+    rng = np.random.default_rng(42)
+    # cover empty arrays and the section boundaries of radware-sigcompress
+    vecs = [
+        rng.integers(-32768, 32767, size=n, dtype="int16")
+        for n in [0, 1, 2, 47, 48, 49, 128, 129, 1000, 3]
+    ]
+    vov = lgdo.VectorOfVectors(vecs, dtype="int16")
+    enc = compression.encode(vov, codec)
+
+    assert isinstance(enc, lgdo.VectorOfEncodedVectors)
+    assert list(enc.decoded_size.nda) == [len(v) for v in vecs]
+
+    dec = compression.decode(enc)
+    assert len(dec) == len(vecs)
+    for v, d in zip(vecs, dec):
+        assert (v == d).all()
+
+
+def test_radware_sigcompress_range():
+    wfs = lgdo.ArrayOfEqualSizedArrays(nda=np.full((2, 10), 40000, dtype="uint16"))
+    with pytest.raises(ValueError):
+        compression.encode(wfs, RadwareSigcompress())
+
+
+def test_decode_out_buf():
+    wfs = lgdo.ArrayOfEqualSizedArrays(nda=_random_walk((10, 100), "int16"))
+    enc = compression.encode(wfs, "ULEB128ZigZagDiff")
+    out = lgdo.ArrayOfEqualSizedArrays(shape=(3, 100), dtype="int16")
+    compression.decode(enc, out)
+    assert len(out) == 10
+    assert (out.nda == wfs.nda).all()
+
+    with pytest.raises(ValueError):
+        compression.decode(
+            enc, lgdo.ArrayOfEqualSizedArrays(shape=(10, 99), dtype="int16")
+        )
+
+    # decode after the first rows of the buffer
+    vecs = [np.arange(n, dtype="int16") for n in [3, 0, 5]]
+    enc = compression.encode(
+        lgdo.VectorOfVectors(vecs, dtype="int16"), "ULEB128ZigZagDiff"
+    )
+    out = lgdo.VectorOfVectors([[7, 7]], dtype="int16")
+    compression.decode(enc, out, out_start=1)
+    assert len(out) == 4
+    assert (out[0] == [7, 7]).all()
+    assert all((v == d).all() for v, d in zip(vecs, list(out)[1:]))
+
+
+def test_str2wfcodec():
+    assert compression.str2wfcodec(
+        "RadwareSigcompress(codec_shift=-32768)"
+    ) == RadwareSigcompress(codec_shift=-32768)
+    assert compression.str2wfcodec("ULEB128ZigZagDiff()") == ULEB128ZigZagDiff()
+    with pytest.raises(ValueError):
+        compression.str2wfcodec("Zstd(level=3)")
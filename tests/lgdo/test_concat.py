@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import pygama.lgdo as lgdo
+from pygama.lgdo import concat
+from pygama.lgdo.lh5_store import LH5Store
+
+
+def test_concat_array():
+    arrays = [lgdo.Array(np.arange(3)), lgdo.Array(np.arange(4) + 10.5)]
+    out = concat(arrays)
+    assert out.nda.dtype == np.float64
+    assert (out.nda == [0, 1, 2, 10.5, 11.5, 12.5, 13.5]).all()
+
+    aoesa = concat([lgdo.ArrayOfEqualSizedArrays(nda=np.ones((2, 3)))] * 3)
+    assert isinstance(aoesa, lgdo.ArrayOfEqualSizedArrays)
+    assert aoesa.nda.shape == (6, 3)
+
+    with pytest.raises(TypeError):
+        concat([lgdo.Array(np.arange(3)), aoesa])
+
+
+def test_concat_vov():
+    v1 = lgdo.VectorOfVectors([[1, 2], [], [3]])
+    v2 = lgdo.VectorOfVectors([[4], [5, 6, 7]])
+    v2.resize(1)  # flattened_data longer than the used part
+    out = concat([v1, v2, v1])
+    assert out.view_as("ak").tolist() == [[1, 2], [], [3], [4], [1, 2], [], [3]]
+    assert len(out.flattened_data) == 7
+
+    nested = lgdo.VectorOfVectors([[[1], [2, 3]], [[4]]])
+    out = concat([nested, nested])
+    assert out.view_as("ak").tolist() == [[[1], [2, 3]], [[4]]] * 2
+
+
+def test_concat_table():
+    tbl = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(np.arange(3)),
+            "vov": lgdo.VectorOfVectors([[1], [2, 3], []]),
+            "wf": lgdo.WaveformTable(values=np.ones((3, 5)), dt=1, t0=0),
+            "sub": lgdo.Table(col_dict={"b": lgdo.Array(np.arange(3) * 2)}),
+        }
+    )
+    out = concat([tbl, tbl])
+    assert len(out) == out.loc == 6
+    assert isinstance(out.wf, lgdo.WaveformTable)
+    assert out.wf.values.nda.shape == (6, 5)
+    assert (out.sub.b.nda == [0, 2, 4, 0, 2, 4]).all()
+    assert out.vov.view_as("ak").tolist() == [[1], [2, 3], []] * 2
+
+    # reuse the output buffer
+    a_buf = out.a.nda
+    out2 = concat([tbl], out=out)
+    assert out2 is out
+    assert len(out) == len(out.a) == len(out.vov) == 3
+    assert np.shares_memory(out.a.nda, a_buf)
+    assert out.vov.view_as("ak").tolist() == [[1], [2, 3], []]
+
+    with pytest.raises(ValueError):
+        concat([tbl, lgdo.Table(col_dict={"a": lgdo.Array(np.arange(3))})])
+
+
+def test_concat_lh5():
+    tbl = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(np.arange(3)),
+            "vov": lgdo.VectorOfVectors([[1], [2, 3], []]),
+        }
+    )
+    file = "/tmp/tmp-pygama-concat.lh5"
+    assert concat([tbl] * 3, lh5_file=file, name="tbl", wo_mode="of") is None
+
+    obj, n_rows = LH5Store().read_object("tbl", file)
+    assert n_rows == 9
+    assert (obj.a.nda == np.tile(np.arange(3), 3)).all()
+    assert obj.vov.view_as("ak").tolist() == [[1], [2, 3], []] * 3
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+import pygama.lgdo as lgdo
+from pygama.lgdo.lh5_store import LH5Iterator, LH5Store
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_view_as_arrow():
+    array = lgdo.Array(np.arange(5, dtype="float32"))
+    view = array.view_as("arrow")
+    assert view.type == pa.float32()
+    assert np.shares_memory(np.frombuffer(view.buffers()[1], "float32"), array.nda)
+
+    vov = lgdo.VectorOfVectors([[1, 2], [], [3]], dtype="int16")
+    view = vov.view_as("arrow")
+    assert view.to_pylist() == [[1, 2], [], [3]]
+    assert view.type.value_type == pa.int16()
+    assert np.shares_memory(
+        np.frombuffer(view.values.buffers()[1], "int16"), vov.flattened_data.nda
+    )
+
+    nested = lgdo.VectorOfVectors([[[1], [2, 3]], [[4]]])
+    assert nested.view_as("arrow").to_pylist() == [[[1], [2, 3]], [[4]]]
+
+    aoesa = lgdo.ArrayOfEqualSizedArrays(nda=np.ones((3, 2)))
+    assert aoesa.view_as("arrow").type == pa.list_(pa.float64(), 2)
+
+    tbl = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(np.arange(3), attrs={"units": "keV"}),
+            "vov": lgdo.VectorOfVectors([[1], [2, 3], []]),
+            "wf": lgdo.WaveformTable(values=np.ones((3, 2)), dt=1, t0=0),
+        }
+    )
+    view = tbl.view_as("arrow", with_units=True)
+    assert view.column_names == ["a", "vov", "wf"]
+    assert view.schema.field("a").metadata == {b"units": b"keV"}
+    assert view.to_pylist()[1] == {
+        "a": 1,
+        "vov": [2, 3],
+        "wf": {"t0": 0.0, "dt": 1.0, "values": [1.0, 1.0]},
+    }
+
+    with pytest.raises(ValueError):
+        tbl.a.view_as("arrow", with_units=True)
+
+
+def test_view_as_arrow_partial_buffer():
+    vovs = [[i] * (i % 5) for i in range(20)]
+    tbl = lgdo.Table(col_dict={"vov": lgdo.VectorOfVectors(vovs)})
+    LH5Store().write_object(
+        tbl, "tbl", "/tmp/tmp-pygama-arrow-partial.lh5", wo_mode="of"
+    )
+
+    lh5_it = LH5Iterator("/tmp/tmp-pygama-arrow-partial.lh5", "tbl", buffer_len=32)
+    for lh5_obj, _, n_rows in lh5_it:
+        assert n_rows < len(lh5_obj)
+        view = lh5_obj.vov.view_as("arrow")
+        view.validate(full=True)
+        assert view.slice(0, n_rows).to_pylist() == vovs
+        assert lh5_obj.view_as("arrow").slice(0, n_rows)["vov"].to_pylist() == vovs
+
+
+def test_lh5_to_arrow():
+    import pyarrow.parquet as pq
+
+    from pygama.lgdo.lh5_arrow import lh5_to_arrow
+
+    tbl = lgdo.Table(
+        col_dict={
+            "energy": lgdo.Array(np.arange(100, dtype="float64")),
+            "vov": lgdo.VectorOfVectors([[i] * (i % 3) for i in range(100)]),
+        }
+    )
+    LH5Store().write_object(tbl, "tbl", "/tmp/tmp-pygama-arrow.lh5", wo_mode="of")
+
+    n_rows = lh5_to_arrow(
+        "/tmp/tmp-pygama-arrow.lh5",
+        "tbl",
+        "/tmp/tmp-pygama-arrow.parquet",
+        buffer_len=30,
+        where="energy >= 10",
+    )
+    assert n_rows == 90
+    out = pq.read_table("/tmp/tmp-pygama-arrow.parquet")
+    assert out["energy"].to_pylist() == list(range(10, 100))
+    assert out["vov"].to_pylist() == [[i] * (i % 3) for i in range(10, 100)]
+
+    lh5_to_arrow(
+        "/tmp/tmp-pygama-arrow.lh5",
+        "tbl",
+        "/tmp/tmp-pygama-arrow.arrow",
+        buffer_len=30,
+        field_mask=["vov"],
+    )
+    with pa.ipc.open_file("/tmp/tmp-pygama-arrow.arrow") as f:
+        out = f.read_all()
+    assert out.column_names == ["vov"]
+    assert out["vov"].to_pylist() == [[i] * (i % 3) for i in range(100)]
@@ -72,3 +72,133 @@ def test_lgnd_waveform_table_fancy_idx(lgnd_file):
     lh5_obj, n_rows = lh5_it.read(0)
     assert isinstance(lh5_obj, lgdo.WaveformTable)
     assert len(lh5_obj) == 5
+
+
+def test_prefetch(tmp_path_factory):
+    fname = str(tmp_path_factory.mktemp("lh5") / "prefetch.lh5")
+    tb = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(np.arange(1000)),
+            "b": lgdo.VectorOfVectors(
+                [np.arange(i % 7, dtype="int32") for i in range(1000)], dtype="int32"
+            ),
+        }
+    )
+    lgdo.LH5Store().write_object(tb, "tb", fname, wo_mode="of")
+
+    objs = set()
+
+    def iterate(**kwargs):
+        lh5_it = LH5Iterator([fname, fname], "tb", buffer_len=128, **kwargs)
+        blocks = []
+        for lh5_obj, entry, n_rows in lh5_it:
+            blocks.append(
+                (
+                    entry,
+                    n_rows,
+                    lh5_obj["a"].nda[:n_rows].copy(),
+                    [list(lh5_obj["b"][i]) for i in range(n_rows)],
+                )
+            )
+            objs.add(id(lh5_obj))
+        return blocks
+
+    ref = iterate()
+    for kwargs in ({"prefetch": 1}, {"prefetch": 3}):
+        objs.clear()
+        blocks = iterate(**kwargs)
+        assert len(objs) == 1
+        assert len(blocks) == len(ref) == 16
+        for b, r in zip(blocks, ref):
+            assert b[:2] == r[:2]
+            assert (b[2] == r[2]).all()
+            assert b[3] == r[3]
+
+    # early exit stops the reader thread
+    lh5_it = LH5Iterator(fname, "tb", buffer_len=100, prefetch=2, field_mask=["a"])
+    for lh5_obj, entry, _ in lh5_it:
+        assert list(lh5_obj.keys()) == ["a"]
+        if entry >= 200:
+            break
+    assert lh5_it.current_entry == 200
+
+
+def test_where(tmp_path_factory):
+    store = lgdo.LH5Store()
+    rng = np.random.default_rng(42)
+    files = []
+    energies = []
+    for i in range(2):
+        n_rows = 1000 + 500 * i
+        energies.append(rng.uniform(0, 3000, n_rows))
+        tb = lgdo.Table(
+            col_dict={
+                "energy": lgdo.Array(energies[-1]),
+                "id": lgdo.Array(np.arange(n_rows) + 10000 * i),
+                "hits": lgdo.VectorOfVectors(
+                    [[j] * (j % 4) for j in np.arange(n_rows) + 10000 * i]
+                ),
+                "waveform": lgdo.WaveformTable(
+                    values=np.outer(np.arange(n_rows) + 10000 * i, np.ones(16))
+                ),
+            }
+        )
+        files.append(str(tmp_path_factory.mktemp("lh5") / f"where-{i}.lh5"))
+        store.write_object(tb, "tb", files[-1], wo_mode="of")
+
+    ids = np.concatenate([np.arange(1000), np.arange(1500) + 10000])
+    energies = np.concatenate(energies)
+
+    for kwargs in [{}, {"prefetch": 1}, {"entry_list": list(range(0, 2500, 3))}]:
+        lh5_it = LH5Iterator(
+            files, "tb", buffer_len=300, where="energy > 2700", **kwargs
+        )
+        entries = np.arange(2500)
+        if "entry_list" in kwargs:
+            entries = np.array(kwargs["entry_list"])
+        selected = energies[entries] > 2700
+
+        read_ids = []
+        read_entries = []
+        for lh5_obj, entry, n_rows in lh5_it:
+            assert n_rows > 0
+            assert entry % 300 == 0
+            wf_ids = lh5_obj.waveform.values.nda[:n_rows, 0]
+            assert (wf_ids == lh5_obj.id.nda[:n_rows]).all()
+            # filtered blocks are partially filled
+            hits = lh5_obj.hits.view_as("ak")[:n_rows].tolist()
+            assert hits == [[j] * (j % 4) for j in lh5_obj.id.nda[:n_rows]]
+            read_ids.append(lh5_obj.id.nda[:n_rows].copy())
+            read_entries.append(lh5_it.selected_entries.copy())
+
+        assert (np.concatenate(read_ids) == ids[entries][selected]).all()
+        assert (np.concatenate(read_entries) == np.nonzero(selected)[0]).all()
+
+
+def test_partial_vov_buffer():
+    store = lgdo.LH5Store()
+    vovs = [[i] * (i % 5) for i in range(20)]
+    tbl = lgdo.Table(col_dict={"vov": lgdo.VectorOfVectors(vovs)})
+    store.write_object(tbl, "tbl", "/tmp/tmp-pygama-partial-vov.lh5", wo_mode="of")
+
+    # the buffer is larger than the table
+    lh5_it = LH5Iterator("/tmp/tmp-pygama-partial-vov.lh5", "tbl", buffer_len=32)
+    for lh5_obj, _, n_rows in lh5_it:
+        assert n_rows == 20
+        assert lh5_obj.vov.view_as("ak")[:n_rows].tolist() == vovs
+        assert lh5_obj.vov.view_as("pd")[:n_rows].tolist() == vovs
+
+    # the last block is partial
+    read = []
+    for lh5_obj, _, n_rows in LH5Iterator(
+        "/tmp/tmp-pygama-partial-vov.lh5", "tbl", buffer_len=7
+    ):
+        read += lh5_obj.vov.view_as("ak")[:n_rows].tolist()
+    assert read == vovs
+
+    # idx read into a larger buffer
+    buf = store.get_buffer("tbl", "/tmp/tmp-pygama-partial-vov.lh5", size=32)
+    _, n_rows = store.read_object(
+        "tbl", "/tmp/tmp-pygama-partial-vov.lh5", idx=[3, 4, 9], obj_buf=buf
+    )
+    assert buf.vov.view_as("ak")[:n_rows].tolist() == [vovs[3], vovs[4], vovs[9]]
@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import pygama.lgdo as lgdo
+from pygama.lgdo.lh5_layout import LH5Layout, LH5LayoutCache
+from pygama.lgdo.lh5_store import LH5Store
+
+
+def _write_test_file(fname):
+    store = LH5Store()
+    tb = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(nda=np.arange(10)),
+            "v": lgdo.VectorOfVectors([[1, 2], [3]] * 5),
+        }
+    )
+    store.write_object(tb, "tb", fname, group="ch1", wo_mode="of")
+    store.write_object(lgdo.Scalar(1), "s", fname, group="ch1")
+    store.write_object(tb, "tb", fname, group="ch2")
+    return store
+
+
+def test_layout():
+    fname = "/tmp/tmp-pygama-layout.lh5"
+    _write_test_file(fname)
+
+    layout = LH5Layout.from_file(fname)
+    assert "ch1/tb/a" in layout
+    assert "/ch1/tb/v/flattened_data" in layout
+    assert layout.datatype("ch1/tb/a") == "array<1>{real}"
+    assert layout["ch1/tb/v/flattened_data"]["shape"] == [15]
+    assert layout.n_rows("ch1/tb") == 10
+    assert layout.n_rows("ch1/tb/v") == 10
+    assert layout.n_rows("ch1/s") is None
+
+    assert layout.ls() == ["ch1", "ch2"]
+    assert layout.ls("ch*/tb") == ["ch1/tb", "ch2/tb"]
+    assert layout.ls("/ch1/") == ["ch1/s", "ch1/tb"]
+    assert layout.ls("ch1/tb/") == ["ch1/tb/a", "ch1/tb/v"]
+    assert layout.ls("ch1/tb/a/") == []
+
+
+def test_layout_cache():
+    fname = "/tmp/tmp-pygama-layout-cache.lh5"
+    store = _write_test_file(fname)
+
+    cache = LH5LayoutCache(maxsize=1)
+    layout = cache.get(fname)
+    assert cache.get(fname) is layout
+    assert fname in cache
+
+    # modified files are scanned again
+    store.write_object(lgdo.Array(nda=np.arange(5)), "b", fname, group="ch1/tb")
+    assert cache.get(fname) is not layout
+    assert cache.get(fname).ls("ch1/tb/") == ["ch1/tb/a", "ch1/tb/b", "ch1/tb/v"]
+
+    # least recently used files are evicted
+    _write_test_file("/tmp/tmp-pygama-layout.lh5")
+    cache.get("/tmp/tmp-pygama-layout.lh5")
+    assert len(cache) == 1
+    assert fname not in cache
+
+
+def test_layout_cache_threads():
+    fnames = [f"/tmp/tmp-pygama-layout-threads-{i}.lh5" for i in range(4)]
+    for fname in fnames:
+        _write_test_file(fname)
+
+    cache = LH5LayoutCache(maxsize=2)
+    with ThreadPoolExecutor(4) as executor:
+        n_rows = list(
+            executor.map(lambda f: cache.get(f).n_rows("ch1/tb"), fnames * 50)
+        )
+    assert n_rows == [10] * 200
+    assert len(cache) == 2
+
+
+def test_layout_cache_index():
+    fname = "/tmp/tmp-pygama-layout.lh5"
+    _write_test_file(fname)
+    index_file = "/tmp/tmp-pygama-layout-index.json"
+
+    cache = LH5LayoutCache(index_file=index_file)
+    cache.get(fname)
+    cache.save()
+
+    cache = LH5LayoutCache(index_file=index_file)
+    assert cache.get(fname).n_rows("ch2/tb") == 10
+
+
+def test_read_n_rows_cached():
+    fname = "/tmp/tmp-pygama-layout.lh5"
+    _write_test_file(fname)
+
+    cache = LH5LayoutCache()
+    store = LH5Store(layout_cache=cache)
+    assert store.read_n_rows("ch1/tb", fname) == 10
+    assert fname in cache
+
+    # writing through the store invalidates the layout
+    store.write_object(lgdo.Array(nda=np.arange(5)), "a", fname, group="ch1/tb")
+    assert fname not in cache
+    assert store.read_n_rows("ch1/tb/a", fname) == 15
@@ -6,6 +6,8 @@ import pytest
 import pygama.lgdo as lgdo
 import pygama.lgdo.lh5_store as lh5
 from pygama.lgdo.lh5_store import LH5Store
+from pygama.lgdo.lh5_zonemap import build_time_index, read_time_index
+from pygama.lgdo.vectorofvectors import CumulativeLengthArray
 
 
 @pytest.fixture(scope="module")
@@ -318,3 +320,527 @@ def test_read_lgnd_waveform_table_fancy_idx(lgnd_file):
     )
     assert isinstance(lh5_obj, lgdo.WaveformTable)
     assert len(lh5_obj) == 19
+
+
+def test_write_hdf5_settings():
+    store = LH5Store()
+    tb = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(nda=np.arange(100, dtype="uint16")),
+            "b": lgdo.Array(nda=np.arange(100, dtype="float32")),
+            "c": lgdo.ArrayOfEqualSizedArrays(nda=np.ones((100, 10), dtype="int16")),
+            "d": lgdo.VectorOfVectors(
+                flattened_data=lgdo.Array(nda=np.arange(300, dtype="uint16")),
+                cumulative_length=lgdo.Array(nda=np.arange(3, 301, 3)),
+            ),
+        }
+    )
+    tb["b"].attrs["hdf5_settings"] = {"compression": "lzf", "shuffle": False}
+
+    store.write_object(
+        tb,
+        "tb",
+        "/tmp/tmp-pygama-hdf5-settings.lh5",
+        wo_mode="of",
+        hdf5_settings={
+            "compression": "gzip",
+            "shuffle": True,
+            "chunks": [10],
+            "d": {"cumulative_length": {"fletcher32": True}},
+        },
+    )
+
+    with h5py.File("/tmp/tmp-pygama-hdf5-settings.lh5") as f:
+        assert "hdf5_settings" not in f["tb"].attrs
+        assert "hdf5_settings" not in f["tb/b"].attrs
+        assert f["tb/a"].compression == "gzip"
+        assert f["tb/a"].shuffle
+        assert f["tb/a"].chunks == (10,)
+        assert f["tb/b"].compression == "lzf"
+        assert not f["tb/b"].shuffle
+        assert f["tb/c"].chunks == (10, 10)
+        assert f["tb/d/flattened_data"].compression == "gzip"
+        assert not f["tb/d/flattened_data"].fletcher32
+        assert f["tb/d/cumulative_length"].fletcher32
+
+    # settings round-trip through read_object
+    obj, _ = store.read_object("tb", "/tmp/tmp-pygama-hdf5-settings.lh5")
+    assert (obj["a"].nda == np.arange(100)).all()
+    assert obj["a"].attrs["hdf5_settings"] == {
+        "compression": "gzip",
+        "compression_opts": 4,
+        "shuffle": True,
+        "chunks": (10,),
+    }
+    assert obj["b"].attrs["hdf5_settings"]["compression"] == "lzf"
+
+    store.write_object(obj, "tb2", "/tmp/tmp-pygama-hdf5-settings.lh5")
+    with h5py.File("/tmp/tmp-pygama-hdf5-settings.lh5") as f:
+        assert f["tb2/a"].compression == "gzip"
+        assert f["tb2/b"].compression == "lzf"
+        assert f["tb2/d/cumulative_length"].fletcher32
+
+    # appending to a dataset with different settings is fine
+    store.write_object(obj, "tb2", "/tmp/tmp-pygama-hdf5-settings.lh5")
+    assert store.read_n_rows("tb2", "/tmp/tmp-pygama-hdf5-settings.lh5") == 200
+
+    # an LH5Iterator buffer does not care about the settings
+    for _buf, _, n in lh5.LH5Iterator(
+        "/tmp/tmp-pygama-hdf5-settings.lh5", "tb2", buffer_len=30
+    ):
+        assert n <= 30
+
+    with pytest.raises(ValueError):
+        store.write_object(
+            tb,
+            "tb3",
+            "/tmp/tmp-pygama-hdf5-settings.lh5",
+            hdf5_settings={"a": "gzip"},
+        )
+
+
+def test_write_append_growth_factor():
+    store = LH5Store(growth_factor=2)
+    fname = "/tmp/tmp-pygama-growth-factor.lh5"
+
+    tb = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(nda=np.arange(10)),
+            "vov": lgdo.VectorOfVectors(
+                flattened_data=lgdo.Array(nda=np.arange(20)),
+                cumulative_length=lgdo.Array(nda=np.arange(2, 21, 2)),
+            ),
+        }
+    )
+
+    store.write_object(tb, "tb", fname, wo_mode="of")
+    for _ in range(4):
+        store.write_object(tb, "tb", fname, wo_mode="a")
+
+    with h5py.File(fname) as f:
+        assert f["tb/a"].shape[0] > 50
+        assert f["tb/a"].attrs[lh5.LOGICAL_LENGTH_ATTR] == 50
+        assert f["tb/vov/flattened_data"].attrs[lh5.LOGICAL_LENGTH_ATTR] == 100
+
+    assert store.read_n_rows("tb", fname) == 50
+    obj, n_rows = store.read_object("tb", fname)
+    assert n_rows == 50
+    assert (obj["a"].nda == np.tile(np.arange(10), 5)).all()
+    assert lh5.LOGICAL_LENGTH_ATTR not in obj["a"].attrs
+    assert obj["vov"].cumulative_length.nda[-1] == 100
+    assert (obj["vov"].flattened_data.nda == np.tile(np.arange(20), 5)).all()
+
+    obj, n_rows = store.read_object("tb", fname, start_row=45, n_rows=10)
+    assert n_rows == 5
+    assert (obj["a"].nda == np.arange(5, 10)).all()
+
+    store.finalize()
+    with h5py.File(fname) as f:
+        assert f["tb/a"].shape[0] == 50
+        assert lh5.LOGICAL_LENGTH_ATTR not in f["tb/a"].attrs
+        assert f["tb/vov/cumulative_length"].shape[0] == 50
+
+    # files closed by the store are trimmed too
+    store = LH5Store(keep_open=True, growth_factor=2, max_open_files=1)
+    fname2 = "/tmp/tmp-pygama-growth-factor-2.lh5"
+    for f in [fname, fname2]:
+        store.write_object(tb, "tb", f, wo_mode="of")
+        for _ in range(2):
+            store.write_object(tb, "tb", f, wo_mode="a")
+    with h5py.File(fname) as f:
+        assert f["tb/a"].shape[0] == 30
+        assert lh5.LOGICAL_LENGTH_ATTR not in f["tb/a"].attrs
+
+    store.close()
+    with h5py.File(fname2) as f:
+        assert f["tb/a"].shape[0] == 30
+        assert lh5.LOGICAL_LENGTH_ATTR not in f["tb/a"].attrs
+
+    with pytest.raises(ValueError):
+        LH5Store(growth_factor=0.5)
+
+
+def test_write_read_compressed():
+    store = LH5Store()
+    rng = np.random.default_rng(42)
+    values = (np.cumsum(rng.integers(-5, 6, size=(100, 500)), axis=1) + 15000).astype(
+        "uint16"
+    )
+    wft = lgdo.WaveformTable(values=values, dt=16, dt_units="ns")
+    wft.values.attrs["compression"] = "RadwareSigcompress(codec_shift=-32768)"
+    vov = lgdo.VectorOfVectors(
+        [values[i, : 10 * i] for i in range(100)], dtype="uint16"
+    )
+    vov.attrs["compression"] = lgdo.compression.ULEB128ZigZagDiff()
+    tb = lgdo.Table(col_dict={"waveform": wft, "vov": vov})
+
+    fname = "/tmp/tmp-pygama-compressed.lh5"
+    store.write_object(tb, "tb", fname, n_rows=60, wo_mode="of")
+    store.write_object(tb, "tb", fname, start_row=60, wo_mode="a")
+
+    with h5py.File(fname) as f:
+        assert f["tb/waveform/values"].attrs["codec"] == "radware_sigcompress"
+        assert "compression" not in f["tb/waveform/values"].attrs
+        assert "encoded_data" in f["tb/vov"]
+
+    assert store.read_n_rows("tb/waveform/values", fname) == 100
+
+    obj, n_rows = store.read_object("tb", fname)
+    assert n_rows == 100
+    assert isinstance(obj.waveform.values, lgdo.ArrayOfEqualSizedArrays)
+    assert (obj.waveform.values.nda == values).all()
+    assert all((obj.vov[i] == values[i, : 10 * i]).all() for i in range(100))
+
+    obj, n_rows = store.read_object(
+        "tb/waveform/values", fname, start_row=10, n_rows=20
+    )
+    assert (obj.nda == values[10:30]).all()
+
+    obj, n_rows = store.read_object("tb/vov", fname, idx=[0, 1, 5, 60, 99])
+    for j, i in enumerate([0, 1, 5, 60, 99]):
+        assert (obj[j] == values[i, : 10 * i]).all()
+
+    obj, n_rows = store.read_object("tb/waveform/values", fname, decompress=False)
+    assert isinstance(obj, lgdo.ArrayOfEncodedEqualSizedArrays)
+    assert (lgdo.compression.decode(obj).nda == values).all()
+
+    # read into buffers, in two steps
+    buf = store.get_buffer("tb", fname, size=10)
+    store.read_object("tb", fname, n_rows=50, obj_buf=buf)
+    store.read_object("tb", fname, start_row=50, obj_buf=buf, obj_buf_start=50)
+    assert (buf.waveform.values.nda[:100] == values).all()
+    assert all((buf.vov[i] == values[i, : 10 * i]).all() for i in range(100))
+
+    # the buffer of the encoded data is reused for a smaller block
+    store.read_object("tb", fname, start_row=90, obj_buf=buf)
+    assert (buf.waveform.values.nda[:10] == values[90:]).all()
+    assert all((buf.vov[i] == values[90 + i, : 10 * (90 + i)]).all() for i in range(10))
+
+
+def test_read_multiple_files_parallel():
+    store = LH5Store()
+    files = []
+    for i in range(3):
+        n_rows = 50 + 10 * i
+        wft = lgdo.WaveformTable(
+            values=np.arange(n_rows * 20, dtype="uint16").reshape(n_rows, 20) + i
+        )
+        wft.values.attrs["compression"] = "RadwareSigcompress()"
+        tb = lgdo.Table(
+            col_dict={
+                "a": lgdo.Array(np.arange(n_rows) + 1000 * i),
+                "vov": lgdo.VectorOfVectors(
+                    [np.arange(j % 4 + 1, dtype="int32") + i for j in range(n_rows)],
+                    dtype="int32",
+                ),
+                "waveform": wft,
+            }
+        )
+        files.append(f"/tmp/tmp-pygama-parallel-{i}.lh5")
+        store.write_object(tb, "tb", files[-1], wo_mode="of")
+
+    def check(obj, ref):
+        assert obj.loc == ref.loc
+        assert list(obj.keys()) == list(ref.keys())
+        if "a" in ref:
+            assert (obj.a.nda[: len(ref)] == ref.a.nda).all()
+        if "vov" in ref:
+            for j in range(len(ref)):
+                assert (obj.vov[j] == ref.vov[j]).all()
+        if "waveform" in ref:
+            values = obj.waveform.values.nda[: len(ref)]
+            assert (values == ref.waveform.values.nda).all()
+
+    for kwargs in [
+        {},
+        {"start_row": 10, "n_rows": 100},
+        {"idx": np.array([0, 3, 49, 50, 109, 110, 169])},
+        {"idx": [[1, 2], [], [0, 5]]},
+        {"field_mask": ["a", "waveform"]},
+        {"field_mask": ["vov"], "n_rows": 70},
+    ]:
+        ref, n_rows = store.read_object("tb", files, **kwargs)
+        obj, n_rows_par = store.read_object("tb", files, n_threads=3, **kwargs)
+        assert n_rows_par == n_rows
+        check(obj, ref)
+
+    # into an existing buffer
+    buf = store.get_buffer("tb", files[0], size=10)
+    buf, n_rows = store.read_object("tb", files, obj_buf=buf, n_threads=2)
+    assert n_rows == 180
+    check(buf, store.read_object("tb", files)[0])
+
+
+@pytest.mark.parametrize("hdf5_settings", [None, {"chunks": [100]}])
+def test_read_sparse_idx(hdf5_settings, monkeypatch):
+    store = LH5Store()
+    values = np.arange(30000, dtype="float32").reshape(10000, 3)
+    tb = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(np.arange(10000)),
+            "b": lgdo.ArrayOfEqualSizedArrays(nda=values),
+            "vov": lgdo.VectorOfVectors(
+                [np.arange(i % 3 + 1) for i in range(10000)], dtype="int64"
+            ),
+        }
+    )
+    fname = "/tmp/tmp-pygama-sparse-idx.lh5"
+    store.write_object(tb, "tb", fname, wo_mode="of", hdf5_settings=hdf5_settings)
+
+    # force batching of the runs
+    monkeypatch.setattr(lh5, "SPARSE_READ_MAX_RUNS", 3)
+
+    for idx in [[5, 5000, 5001, 9999], list(range(0, 10000, 97)), [2, 3, 4]]:
+        obj, n_rows = store.read_object("tb", fname, idx=idx)
+        assert n_rows == len(idx)
+        assert (obj.a.nda == idx).all()
+        assert (obj.b.nda == values[idx]).all()
+        for j, i in enumerate(idx):
+            assert (obj.vov[j] == np.arange(i % 3 + 1)).all()
+
+
+def test_read_vov_idx_segments():
+    store = LH5Store()
+    data = [[], [], [1, 2], [3], [], [4, 5, 6], [7], [8, 9]]
+    tb = lgdo.Table(
+        col_dict={
+            "vov": lgdo.VectorOfVectors(data, dtype="float32"),
+            "bools": lgdo.VectorOfVectors(
+                [[x % 2 == 0 for x in v] for v in data], dtype=bool
+            ),
+            "nested": lgdo.VectorOfVectors([[v, [0]] for v in data]),
+        }
+    )
+    fname = "/tmp/tmp-pygama-vov-segments.lh5"
+    store.write_object(tb, "tb", fname, wo_mode="of")
+
+    for idx in [[1, 2, 3], [0, 4, 7], [1, 5, 6, 7], [4], []]:
+        obj, n_rows = store.read_object("tb", fname, idx=idx)
+        assert n_rows == len(idx)
+        assert obj.vov.view_as("ak").tolist() == [data[i] for i in idx]
+        assert obj.bools.view_as("ak").tolist() == [
+            [x % 2 == 0 for x in data[i]] for i in idx
+        ]
+        assert obj.nested.view_as("ak").tolist() == [[data[i], [0]] for i in idx]
+
+    # into a partially filled buffer
+    buf = store.get_buffer("tb", fname, size=2)
+    buf, _ = store.read_object("tb", fname, idx=[2, 3], obj_buf=buf)
+    buf, n_rows = store.read_object(
+        "tb", fname, idx=[0, 5, 7], obj_buf=buf, obj_buf_start=2
+    )
+    assert n_rows == 3
+    assert buf.vov.view_as("ak").tolist() == [data[i] for i in [2, 3, 0, 5, 7]]
+
+
+def test_read_memmap():
+    store = LH5Store()
+    values = np.arange(1000, dtype="int32").reshape(100, 10)
+    tb = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(np.arange(100, dtype="float32")),
+            "b": lgdo.ArrayOfEqualSizedArrays(nda=values),
+            "c": lgdo.Array(np.arange(100)),
+        }
+    )
+    fname = "/tmp/tmp-pygama-memmap.lh5"
+    store.write_object(
+        tb,
+        "tb",
+        fname,
+        wo_mode="of",
+        hdf5_settings={"chunks": False, "c": {"compression": "gzip"}},
+    )
+
+    obj, n_rows = store.read_object("tb", fname, memmap=True)
+    assert n_rows == 100
+    assert isinstance(obj.a.nda, np.memmap)
+    assert isinstance(obj.b, lgdo.ArrayOfEqualSizedArrays)
+    assert isinstance(obj.b.nda, np.memmap)
+    assert (obj.b.nda == values).all()
+    # compressed datasets are read as usual
+    assert not isinstance(obj.c.nda, np.memmap)
+    assert (obj.c.nda == np.arange(100)).all()
+
+    obj, _ = store.read_object("tb/b", fname, start_row=20, n_rows=5, memmap=True)
+    assert isinstance(obj.nda, np.memmap)
+    assert (obj.nda == values[20:25]).all()
+
+    obj, _ = store.read_object("tb/b", fname, idx=[1, 50, 99], memmap=True)
+    assert (obj.nda == values[[1, 50, 99]]).all()
+
+    data = lh5.load_nda(fname, ["a", "b"], "tb", memmap=True)
+    assert isinstance(data["b"], np.memmap)
+    assert (data["a"] == np.arange(100)).all()
+
+
+def test_max_open_files():
+    store = LH5Store(keep_open=True, max_open_files=2)
+    files = [f"/tmp/tmp-pygama-max-open-{i}.lh5" for i in range(4)]
+    for i, f in enumerate(files):
+        store.write_object(lgdo.Array(np.arange(10) + i), "a", f, wo_mode="of")
+        assert len(store.files) <= 2
+
+    # the least recently used files were flushed and closed
+    assert list(store.files.keys()) == files[2:]
+    for i, f in enumerate(files):
+        obj, _ = store.read_object("a", f)
+        assert (obj.nda == np.arange(10) + i).all()
+        assert len(store.files) <= 2
+
+    # a file open for reading is reopened for writing
+    h5f = store.gimme_file(files[3], "r")
+    assert h5f.mode == "r"
+    store.write_object(lgdo.Array(np.arange(5)), "b", files[3])
+    assert store.gimme_file(files[3], "r").mode == "r+"
+    assert not h5f
+    assert len(store.read_object("b", files[3])[0]) == 5
+
+    # files in use by the parallel reader are not closed
+    obj, n_rows = store.read_object("a", files, n_threads=4)
+    assert n_rows == 40
+    assert (obj.nda == np.concatenate([np.arange(10) + i for i in range(4)])).all()
+
+    with pytest.raises(ValueError):
+        LH5Store(max_open_files=0)
+
+
+def test_read_vov_offsets():
+    store = LH5Store()
+    vov = lgdo.VectorOfVectors([[1, 2], [], [3, 4, 5], [6]], dtype="int32")
+    store.write_object(vov, "vov", "/tmp/tmp-pygama-vov-offsets.lh5", wo_mode="of")
+
+    for kwargs in [{}, {"start_row": 1}, {"idx": [0, 2]}]:
+        obj, _ = store.read_object("vov", "/tmp/tmp-pygama-vov-offsets.lh5", **kwargs)
+        # cumulative_length was read into the offsets buffer
+        assert isinstance(obj.cumulative_length, CumulativeLengthArray)
+        assert obj.cumulative_length.offsets[0] == 0
+        layout = obj.view_as("ak").layout
+        assert np.shares_memory(layout.offsets.data, obj.cumulative_length.nda)
+
+    assert obj.view_as("ak").tolist() == [[1, 2], [3, 4, 5]]
+
+
+def test_read_lazy():
+    store = LH5Store()
+    tbl = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(np.arange(10)),
+            "b": lgdo.Array(np.arange(10) * 2.0),
+            "vov": lgdo.VectorOfVectors([[i] * (i % 3) for i in range(10)]),
+            "sub": lgdo.Table(col_dict={"c": lgdo.Array(np.arange(10) + 100)}),
+            "wf": lgdo.WaveformTable(values=np.ones((10, 5)), dt=1, t0=0),
+        }
+    )
+    files = ["/tmp/tmp-pygama-lazy-1.lh5", "/tmp/tmp-pygama-lazy-2.lh5"]
+    for file in files:
+        store.write_object(tbl, "tbl", file, wo_mode="of")
+
+    for file, kwargs in [
+        (files[0], {}),
+        (files[0], {"start_row": 2, "n_rows": 5}),
+        (files[0], {"idx": np.array([1, 4, 8])}),
+        (files, {"start_row": 7}),
+        (files, {"idx": np.array([3, 12, 19]), "n_threads": 2}),
+    ]:
+        lazy, n_rows = store.read_object("tbl", file, lazy=True, **kwargs)
+        eager, n_rows_eager = store.read_object("tbl", file, **kwargs)
+        assert isinstance(lazy, lgdo.LazyTable)
+        assert n_rows == n_rows_eager == len(lazy)
+        assert not any(lazy.is_loaded(c) for c in ["a", "b", "vov", "wf"])
+
+        # flatten does not read anything
+        flat = lazy.flatten()
+        assert sorted(flat.keys()) == ["a", "b", "sub__c", "vov", "wf"]
+        assert not lazy["sub"].is_loaded("c")
+
+        # eval reads only the columns in the expression
+        res = lazy.eval("a + sub__c")
+        assert (res.nda == eager.a.nda + eager.sub.c.nda).all()
+        assert lazy.is_loaded("a") and lazy["sub"].is_loaded("c")
+        assert not lazy.is_loaded("b")
+
+        df = lazy.view_as("pd", cols=["b"])
+        assert (df["b"] == eager.b.nda).all()
+        assert not lazy.is_loaded("vov")
+
+        assert lazy.vov.view_as("ak").tolist() == eager.vov.view_as("ak").tolist()
+        assert isinstance(lazy.wf, lgdo.WaveformTable)
+        assert (lazy.wf.values.nda == eager.wf.values.nda).all()
+
+    lazy, _ = store.read_object("tbl", files[0], lazy=True, field_mask=["a", "sub"])
+    assert list(lazy.keys()) == ["a", "sub"]
+    assert lazy.attrs["datatype"] == "table{a,sub}"
+
+    # non-table objects are read as usual
+    obj, _ = store.read_object("tbl/a", files[0], lazy=True)
+    assert isinstance(obj, lgdo.Array)
+
+
+def test_read_time_range(monkeypatch):
+    store = LH5Store()
+    rng = np.random.default_rng(42)
+    files = [f"/tmp/tmp-pygama-time-range-{i}.lh5" for i in range(4)]
+    timestamps = [
+        np.arange(1000, dtype="float64"),
+        np.arange(1000, 2000, dtype="float64"),
+        rng.uniform(500, 1500, 1000),  # not sorted
+        np.arange(3000, 3500, dtype="float64"),
+    ]
+    all_ts = np.concatenate(timestamps)
+    for file, ts in zip(files, timestamps):
+        tbl = lgdo.Table(
+            col_dict={
+                "timestamp": lgdo.Array(ts),
+                "vov": lgdo.VectorOfVectors([[t] * (int(t) % 3) for t in ts]),
+            }
+        )
+        store.write_object(
+            tbl, "tbl", file, wo_mode="of", hdf5_settings={"zone_map": 64}
+        )
+    # no zone map
+    store.write_object(tbl, "tbl", "/tmp/tmp-pygama-time-range-nozm.lh5", wo_mode="of")
+
+    for t0, t1 in [(100, 900), (950, 1800.5), (None, 10), (1500, None), (2500, 2600)]:
+        obj, n_rows = store.read_time_range("tbl", files, t0, t1)
+        lo = -np.inf if t0 is None else t0
+        hi = np.inf if t1 is None else t1
+        sel = all_ts[(all_ts >= lo) & (all_ts < hi)]
+        assert n_rows == len(sel)
+        assert (obj.timestamp.nda[:n_rows] == sel).all()
+        vov = obj.vov.view_as("ak").tolist()[:n_rows]
+        assert vov == [[t] * (int(t) % 3) for t in sel]
+
+    obj, n_rows = store.read_time_range(
+        "tbl", "/tmp/tmp-pygama-time-range-nozm.lh5", 3100, 3110, field_mask=["vov"]
+    )
+    assert n_rows == 10
+    assert list(obj.keys()) == ["vov"]
+
+    # with a time index, only the files that may overlap the range are opened
+    index_file = "/tmp/tmp-pygama-time-index.h5"
+    build_time_index(index_file, files[:3], "tbl")
+    paths, mins, maxs = read_time_index(index_file, "tbl")
+    assert list(mins) == [0, timestamps[2].min(), 1000]
+    assert list(maxs) == [999, timestamps[2].max(), 1999]
+    assert read_time_index(index_file, "tbl", "energy") is None
+
+    opened = []
+    time_range_rows = LH5Store._time_range_rows
+
+    def spy(self, name, lh5_file, t0, t1):
+        opened.append(lh5_file)
+        return time_range_rows(self, name, lh5_file, t0, t1)
+
+    monkeypatch.setattr(LH5Store, "_time_range_rows", spy)
+    for (t0, t1), expected in [
+        ((100, 400), [files[0], files[3]]),
+        ((1600, 1700), [files[1], files[3]]),
+        ((2500, 2600), [files[3]]),
+    ]:
+        opened.clear()
+        obj, n_rows = store.read_time_range("tbl", files, t0, t1, time_index=index_file)
+        assert opened == expected
+        assert (
+            obj.timestamp.nda[:n_rows] == all_ts[(all_ts >= t0) & (all_ts < t1)]
+        ).all()
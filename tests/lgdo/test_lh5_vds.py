@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import pygama.lgdo as lgdo
+from pygama.lgdo.lh5_store import LH5Iterator, LH5Store
+from pygama.lgdo.lh5_vds import build_run_view
+
+
+def test_build_run_view():
+    store = LH5Store()
+    files = [f"/tmp/tmp-pygama-vds-{i}.lh5" for i in range(3)]
+    for i, file in enumerate(files):
+        n = 10 * (i + 1)
+        tbl = lgdo.Table(
+            col_dict={
+                "a": lgdo.Array(np.arange(n) + 100 * i),
+                "vov": lgdo.VectorOfVectors([[i] * (j % 3) for j in range(n)]),
+                "vvov": lgdo.VectorOfVectors([[[j], [i, j]] for j in range(n)]),
+                "wf": lgdo.WaveformTable(values=np.full((n, 4), i), dt=1, t0=0),
+            }
+        )
+        store.write_object(tbl, "tbl", file, group="ch000", wo_mode="of")
+        store.write_object(lgdo.Scalar(42), "info", file)
+        # grow the datasets past the number of rows actually written
+        store.growth_factor = 2
+        store.write_object(tbl, "tbl", file, group="ch000", n_rows=1)
+        store.growth_factor = None
+
+    build_run_view(files, "ch000/tbl", "/tmp/tmp-pygama-vds-view.lh5", overwrite=True)
+    build_run_view(files, "info", "/tmp/tmp-pygama-vds-view.lh5", overwrite=True)
+    with pytest.raises(RuntimeError):
+        build_run_view(files, "info", "/tmp/tmp-pygama-vds-view.lh5")
+
+    ref, n_ref = store.read_object("ch000/tbl", files)
+    view, n_view = store.read_object("ch000/tbl", "/tmp/tmp-pygama-vds-view.lh5")
+    assert n_ref == n_view == 63
+    assert (view.a.nda == ref.a.nda).all()
+    assert view.vov.view_as("ak").tolist() == ref.vov.view_as("ak").tolist()
+    assert view.vvov.view_as("ak").tolist() == ref.vvov.view_as("ak").tolist()
+    assert (view.wf.values.nda == ref.wf.values.nda).all()
+
+    info, _ = store.read_object("info", "/tmp/tmp-pygama-vds-view.lh5")
+    assert info.value == 42
+
+    it = LH5Iterator("/tmp/tmp-pygama-vds-view.lh5", "ch000/tbl", buffer_len=7)
+    a = np.concatenate([buf.a.nda[:n].copy() for buf, _, n in it])
+    assert (a == ref.a.nda).all()
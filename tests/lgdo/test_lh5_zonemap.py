@@ -0,0 +1,108 @@
+import h5py
+import numpy as np
+
+import pygama.lgdo as lgdo
+from pygama.lgdo.lh5_store import LH5Iterator, LH5Store
+from pygama.lgdo.lh5_zonemap import (
+    ZONE_MAP_SUFFIX,
+    build_zone_maps,
+    compute_zone_map,
+    read_zone_map,
+    rows_may_match,
+)
+
+
+def test_compute_zone_map():
+    data = np.array([3.0, np.nan, np.nan, np.nan, 5.0, 1.0, -2.0])
+    zm = compute_zone_map(data, 2)
+    assert list(zm["min"][[0, 2, 3]]) == [3.0, 1.0, -2.0]
+    assert list(zm["max"][[0, 2, 3]]) == [3.0, 5.0, -2.0]
+    assert np.isnan(zm["min"][1]) and np.isnan(zm["max"][1])
+    assert list(zm["n_nan"]) == [1, 2, 0, 0]
+
+    zm = compute_zone_map(np.arange(10, dtype="uint32"), 4)
+    assert zm["min"].dtype == np.uint32
+    assert list(zm["min"]) == [0, 4, 8]
+    assert list(zm["max"]) == [3, 7, 9]
+
+
+def test_write_zone_map():
+    store = LH5Store()
+    file = "/tmp/tmp-pygama-zonemap.lh5"
+    tbl = lgdo.Table(
+        col_dict={
+            "energy": lgdo.Array(np.arange(100, dtype="float64")),
+            "vov": lgdo.VectorOfVectors([[1]] * 100),
+        }
+    )
+    store.write_object(tbl, "tbl", file, wo_mode="of", hdf5_settings={"zone_map": 16})
+    store.write_object(tbl, "tbl", file)
+
+    obj, _ = store.read_object("tbl", file)
+    assert list(obj.keys()) == ["energy", "vov"]
+
+    with h5py.File(file) as f:
+        assert "energy" + ZONE_MAP_SUFFIX in f["tbl"]
+        # only table columns get zone maps
+        assert "flattened_data" + ZONE_MAP_SUFFIX not in f["tbl/vov"]
+        zm, block_size = read_zone_map(f["tbl/energy"])
+        assert block_size == 16
+        assert len(zm) == 13
+        assert (zm["min"] == compute_zone_map(obj.energy.nda, 16)["min"]).all()
+        assert zm["max"][6] == 99 and zm["min"][6] == 0
+
+        rows = np.arange(200)
+        mask = rows_may_match("energy > 90", f["tbl"], rows)
+        assert mask.sum() == 56
+        mask = rows_may_match("(energy < 10) | (100 == energy)", f["tbl"], rows)
+        assert mask.sum() == 32
+        mask = rows_may_match("(energy < 10) and unknown > 3", f["tbl"], rows)
+        assert mask.sum() == 32
+        assert rows_may_match("(energy < 10) or unknown > 3", f["tbl"], rows) is None
+        assert rows_may_match("abs(energy) > 3", f["tbl"], rows) is None
+
+    # overwriting without the setting drops the zone map
+    store.write_object(tbl, "tbl", file, wo_mode="o")
+    with h5py.File(file) as f:
+        assert "energy" + ZONE_MAP_SUFFIX not in f["tbl"]
+
+    build_zone_maps(file, "tbl", block_size=10)
+    with h5py.File(file) as f:
+        assert read_zone_map(f["tbl/energy"])[1] == 10
+
+
+def test_iterator_zone_map():
+    store = LH5Store()
+    tbl = lgdo.Table(
+        col_dict={
+            "energy": lgdo.Array(np.arange(1000, dtype="float64")),
+            "idx": lgdo.Array(np.arange(1000)),
+        }
+    )
+    files = {}
+    for zm in [False, 32]:
+        files[zm] = [f"/tmp/tmp-pygama-zonemap-{zm}-{i}.lh5" for i in range(2)]
+        for file in files[zm]:
+            store.write_object(
+                tbl, "tbl", file, wo_mode="of", hdf5_settings={"zone_map": zm}
+            )
+
+    for where in ["(energy > 480) & (energy < 530)", "energy == 999"]:
+        for entry_list in [None, list(range(0, 2000, 3))]:
+            results = []
+            for zm in [False, 32]:
+                it = LH5Iterator(
+                    files[zm],
+                    "tbl",
+                    buffer_len=128,
+                    where=where,
+                    entry_list=entry_list,
+                )
+                results.append(
+                    [
+                        (entry, list(buf.idx.nda[:n]), list(it.selected_entries))
+                        for buf, entry, n in it
+                    ]
+                )
+            assert len(results[0]) > 0
+            assert results[0] == results[1]
@@ -1,3 +1,5 @@
+import pickle
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -114,3 +116,19 @@ def test_remove_column():
 
     tbl.remove_column("c")
     assert list(tbl.keys()) == ["b"]
+
+
+def test_pickle():
+    tbl = lgdo.Table(
+        col_dict={
+            "a": lgdo.Array(nda=np.array([1, 2, 3])),
+            "b": lgdo.Table(col_dict={"c": lgdo.Array(nda=np.array([4, 5, 6]))}),
+        },
+        attrs={"units": "ns"},
+    )
+    tbl2 = pickle.loads(pickle.dumps(tbl))
+    assert isinstance(tbl2, lgdo.Table)
+    assert tbl2.size == 3
+    assert tbl2.attrs == tbl.attrs
+    assert tbl2.b.attrs["datatype"] == "table{c}"
+    assert np.array_equal(tbl2.b.c.nda, [4, 5, 6])
@@ -1,6 +1,12 @@
 import numpy as np
 
-from pygama.lgdo import Array, ArrayOfEqualSizedArrays, Table
+from pygama.lgdo import (
+    Array,
+    ArrayOfEqualSizedArrays,
+    Table,
+    TableEvaluator,
+    VectorOfVectors,
+)
 
 
 def test_eval_dependency():
@@ -94,3 +100,43 @@ def test_eval_math_functions():
         out_tbl["O2"].nda
         == np.array([[1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4]])
     ).all()
+
+
+def test_evaluator_reuse():
+    evaluator = TableEvaluator(
+        {
+            "O1": {"expression": "p1 + a", "parameters": {"p1": 2}},
+            "O2": {"expression": "O1 * sub__b"},
+            "O3": {"expression": "ak.sum(v, axis=-1) + O2"},
+            "O4": {"expression": "v * p1"},
+        },
+        parameters={"p1": 1},
+    )
+
+    def make_table(n, offset):
+        return Table(
+            col_dict={
+                "a": Array(nda=np.arange(n, dtype=np.float32) + offset),
+                "sub": Table(col_dict={"b": Array(nda=np.full(n, 2.0))}),
+                "v": VectorOfVectors([[1, 2, 3][: i % 3] for i in range(n)]),
+            }
+        )
+
+    out = evaluator.eval(make_table(10, 0))
+    assert list(out.keys()) == ["O1", "O2", "O3", "O4"]
+    assert (out["O2"].nda == (np.arange(10) + 2) * 2).all()
+    buffers = dict(out)
+    o1_data = out["O1"].nda.ctypes.data
+
+    # output buffers are reused on the next chunks
+    for n, offset in [(10, 1), (5, 2)]:
+        out = evaluator.eval(make_table(n, offset))
+        assert len(out) == n
+        for k, v in out.items():
+            assert v is buffers[k]
+            assert len(v) == n
+        assert out["O1"].nda.ctypes.data == o1_data
+        o2 = (np.arange(n) + 2 + offset) * 2
+        assert (out["O1"].nda == np.arange(n) + 2 + offset).all()
+        assert (out["O3"].nda == np.array([0, 1, 3] * 4)[:n] + o2).all()
+        assert out["O4"].view_as("ak").tolist()[:3] == [[], [1], [1, 2]]
@@ -2,6 +2,8 @@ import numpy as np
 import pytest
 
 import pygama.lgdo as lgdo
+from pygama.lgdo import vovutils
+from pygama.lgdo.vectorofvectors import CumulativeLengthArray
 
 
 @pytest.fixture()
@@ -122,3 +124,93 @@ def test_build_cl_and_explodes():
     assert len(out_arrays) == 2
     assert (out_arrays[0] == array_exp).all()
     assert (out_arrays[1] == exp).all()
+
+
+def test_segments():
+    starts, stops = vovutils.merge_segments([0, 2, 5, 5, 7, 9], [2, 4, 5, 7, 9, 12])
+    assert (starts == [0, 5]).all()
+    assert (stops == [4, 12]).all()
+
+    out = np.empty(6, dtype="float32")
+    vovutils.copy_segments(np.arange(12), np.array([1, 8]), np.array([3, 12]), out)
+    assert (out == [1, 2, 8, 9, 10, 11]).all()
+
+
+def test_append_many(lgdo_vov):
+    lgdo_vov.append_many(np.array([6, 7, 8]), [1, 0, 2])
+    lgdo_vov.append([9])
+    assert len(lgdo_vov) == 9
+    assert lgdo_vov.view_as("ak").tolist()[4:] == [[5, 3, 1], [6], [], [7, 8], [9]]
+
+    lgdo_vov.extend(lgdo.VectorOfVectors([[1], [2, 3]]))
+    assert lgdo_vov.view_as("ak").tolist()[-2:] == [[1], [2, 3]]
+
+    with pytest.raises(ValueError):
+        lgdo_vov.append_many(np.array([1, 2]), [3])
+
+    # buffers grow geometrically, only the logical extent is exposed
+    vov = lgdo.VectorOfVectors(dtype="int32")
+    for i in range(1000):
+        vov.append(np.arange(i % 4, dtype="int32"))
+    assert len(vov) == 1000
+    assert vov.cumulative_length.get_capacity() == 1024
+    assert len(vov.flattened_data) == vov.cumulative_length[-1] == 1500
+    assert len(vov.view_as("ak").layout.content) == 1500
+
+
+def test_insert_replace(lgdo_vov):
+    lgdo_vov.insert(0, [0, 0])
+    lgdo_vov.insert(2, [])
+    lgdo_vov.replace(1, [1])
+    lgdo_vov.replace(3, [3, 4, 5, 6])
+    lgdo_vov.replace(-1, [])
+    assert lgdo_vov.view_as("ak").tolist() == [
+        [0, 0],
+        [1],
+        [],
+        [3, 4, 5, 6],
+        [2],
+        [4, 8, 9, 7],
+        [],
+    ]
+
+
+def test_ak_view_no_copy(lgdo_vov):
+    cl = lgdo_vov.cumulative_length
+    assert isinstance(cl, CumulativeLengthArray)
+    assert (cl.offsets == [0, 2, 5, 6, 10, 13]).all()
+
+    layout = lgdo_vov.view_as("ak").layout
+    assert np.shares_memory(layout.offsets.data, cl.nda)
+    assert np.shares_memory(layout.content.data, lgdo_vov.flattened_data.nda)
+
+    # the offsets follow reallocations of the cumulative lengths
+    for _ in range(10):
+        lgdo_vov.append([1, 2])
+    assert lgdo_vov.view_as("ak").tolist()[-1] == [1, 2]
+    assert np.shares_memory(lgdo_vov.view_as("ak").layout.offsets.data, cl.nda)
+
+    nested = lgdo.VectorOfVectors([[[1], [2, 3]], [[4]]])
+    assert nested.view_as("ak").tolist() == [[[1], [2, 3]], [[4]]]
+    assert np.shares_memory(
+        nested.view_as("ak").layout.content.offsets.data,
+        nested.flattened_data.cumulative_length.nda,
+    )
+
+
+def test_view_stale_cumulative_length():
+    # a partially filled buffer: the last rows were not read
+    vov = lgdo.VectorOfVectors([[1, 2], [3], [4, 5, 6], [7], [8]])
+    vov.cumulative_length.nda[3:] = 0
+    assert isinstance(vov.cumulative_length, CumulativeLengthArray)
+    assert vov.view_as("ak")[:3].tolist() == [[1, 2], [3], [4, 5, 6]]
+    assert vov.view_as("ak").tolist()[3:] == [[], []]
+    assert vov.view_as("pd")[:3].tolist() == [[1, 2], [3], [4, 5, 6]]
+
+    # same through a plain Array of cumulative lengths
+    vov.cumulative_length = lgdo.Array(np.array([2, 3, 6, 0, 0]))
+    assert vov.view_as("ak").tolist() == [[1, 2], [3], [4, 5, 6], [], []]
+
+    # cumulative lengths past the end of the flattened data
+    vov.cumulative_length = lgdo.Array(np.array([2, 3, 6, 20, 30]))
+    assert vov.view_as("ak").tolist() == [[1, 2], [3], [4, 5, 6], [7, 8], []]
@@ -1,6 +1,10 @@
 import json
 
+import numpy as np
+
+import pygama.lgdo as lgdo
 import pygama.raw.raw_buffer as prb
+from pygama.lgdo.compression import RadwareSigcompress
 
 
 def test_raw_buffer_list():
@@ -69,3 +73,54 @@ def test_raw_buffer_lib_json_load():
     rb_keyed = rblib["FCEventDecoder"].get_keyed_dict()
     name = rb_keyed[41].out_name
     assert name == "g041"
+
+
+def test_raw_buffer_hdf5_settings():
+    rbl = prb.RawBufferList()
+    rbl.set_from_json_dict(
+        {
+            "g{key:0>3d}": {
+                "key_list": [[3, 4]],
+                "out_stream": "$DATADIR/{file_key}_geds.lh5",
+                "hdf5_settings": {"compression": "gzip", "shuffle": True},
+            },
+            "spms": {
+                "key_list": [5],
+                "out_stream": "$DATADIR/{file_key}_spms.lh5",
+            },
+        },
+        kw_dict={"file_key": "run0"},
+    )
+    rb_keyed = rbl.get_keyed_dict()
+    assert rb_keyed[3].hdf5_settings == {"compression": "gzip", "shuffle": True}
+    assert rb_keyed[4].hdf5_settings == {"compression": "gzip", "shuffle": True}
+    assert rb_keyed[5].hdf5_settings is None
+
+
+def test_raw_buffer_compression():
+    rbl = prb.RawBufferList()
+    rbl.set_from_json_dict(
+        {
+            "geds": {
+                "key_list": [3],
+                "out_stream": "/tmp/tmp-pygama-rb-compression.lh5",
+                "compression": {
+                    "waveform/values": "RadwareSigcompress(codec_shift=-32768)"
+                },
+            }
+        }
+    )
+    rb = rbl[0]
+    assert rb.compression == {"waveform/values": RadwareSigcompress(codec_shift=-32768)}
+
+    values = np.arange(1000, dtype="uint16").reshape(10, 100)
+    rb.lgdo = lgdo.Table(col_dict={"waveform": lgdo.WaveformTable(values=values)})
+    rb.loc = 10
+    prb.write_to_lh5_and_clear([rb], wo_mode="of")
+
+    store = lgdo.LH5Store()
+    fname = "/tmp/tmp-pygama-rb-compression.lh5"
+    obj, _ = store.read_object("geds/waveform/values", fname, decompress=False)
+    assert obj.attrs["codec"] == "radware_sigcompress"
+    obj, _ = store.read_object("geds/waveform/values", fname)
+    assert (obj.nda == values).all()